@@ -0,0 +1,66 @@
+"""Сравнение поэлементных и пакетных булевых операций в build_holder_half.
+
+Для каждой четверти/половины строит деталь в обоих режимах, проверяет, что
+геометрия совпадает (топология, площадь, объем, координаты вершин с точностью
+до погрешности OCCT), и печатает ускорение.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_batched_booleans [--repeat 3]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from projects.tablet_holder import ProjectAssembly
+from projects.tablet_holder.holder_half import build_holder_half
+from src.project import load_project_params
+
+
+def _vertices(shape) -> np.ndarray:
+    points = np.array([tuple(v) for v in shape.vertices()])
+    return points[np.lexsort(np.round(points, 4).T)]
+
+
+def same_geometry(a, b, tol: float = 1e-6) -> bool:
+    """Совпадение формы: число граней/ребер/вершин, объем, площадь и вершины."""
+    counts = lambda s: (len(s.faces()), len(s.edges()), len(s.vertices()))
+    if counts(a) != counts(b):
+        return False
+    if abs(a.volume - b.volume) > tol * a.volume or abs(a.area - b.area) > tol * a.area:
+        return False
+    return bool(np.abs(_vertices(a) - _vertices(b)).max() < tol)
+
+
+def _best_of(params, repeat, **kwargs):
+    best, part = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        part = build_holder_half(params, **kwargs)
+        best = min(best, time.perf_counter() - t0)
+    return best, part
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    params = load_project_params(ProjectAssembly)
+
+    print(f"{'segment':<16}{'serial, ms':>12}{'batched, ms':>13}{'speedup':>9}  geometry")
+    total_serial = total_batched = 0.0
+    for is_left in (True, False):
+        for segment in ("top", "bottom", "all"):
+            t_serial, serial = _best_of(params, args.repeat, is_left=is_left, segment=segment, batched=False)
+            t_batched, batched = _best_of(params, args.repeat, is_left=is_left, segment=segment, batched=True)
+            assert same_geometry(serial, batched), f"batched geometry differs for {segment} (is_left={is_left})"
+            total_serial += t_serial
+            total_batched += t_batched
+            name = f"{'left' if is_left else 'right'}-{segment}"
+            print(f"{name:<16}{t_serial * 1e3:>12.1f}{t_batched * 1e3:>13.1f}{t_serial / t_batched:>8.2f}x  identical")
+    print(f"{'total':<16}{total_serial * 1e3:>12.1f}{total_batched * 1e3:>13.1f}{total_serial / total_batched:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Сравнение последовательной и параллельной сборки ProjectAssembly (без кэша).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_parallel_build [--workers N] [--repeat 3]
+"""
+import argparse
+import importlib
+import json
+import os
+import time
+
+from projects.tablet_holder import ProjectAssembly
+from src.builder import PartBuilder
+
+
+def _import_kernel(module_name: str) -> int:
+    importlib.import_module(module_name)
+    return os.getpid()
+
+
+def _warm_pool(builder):
+    """Новый пул с уже запущенными процессами и импортированным build123d.
+
+    Запоминание деталей в воркерах (_worker_builder) живет столько же, сколько
+    процесс: без нового пула повторные прогоны мерили бы попадания в память.
+    """
+    builder.shutdown()
+    pool = builder._get_pool()
+    list(pool.map(_import_kernel, [ProjectAssembly.__module__] * builder.workers))
+
+
+def _time_build(builder, params, repeat):
+    best, parts = float("inf"), None
+    for _ in range(repeat):
+        # Новая сборка на каждом прогоне: кэш в памяти не должен влиять на замер
+        builder._memo.clear()
+        if builder.parallel:
+            _warm_pool(builder)
+        t0 = time.perf_counter()
+        parts = ProjectAssembly(params, builder=builder).build()
+        best = min(best, time.perf_counter() - t0)
+    return best, parts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open("projects/tablet_holder/params.json", "r") as f:
+        params = json.load(f)
+
+    serial = PartBuilder()
+    parallel = PartBuilder(parallel=True, workers=args.workers)
+    # Запуск процессов и импорт build123d не входят в замер (см. _warm_pool)
+    t_serial, serial_parts = _time_build(serial, params, args.repeat)
+    t_parallel, parallel_parts = _time_build(parallel, params, args.repeat)
+    parallel.shutdown()
+
+    for a, b in zip(serial_parts, parallel_parts):
+        assert a.label == b.label and abs(a.volume - b.volume) < 1e-6 * a.volume
+        assert set(a.joints) == set(b.joints)
+
+    print(f"serial:   {t_serial:.2f} s")
+    print(f"parallel: {t_parallel:.2f} s ({parallel.workers} workers, {t_serial / t_parallel:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Время кадра при облете камеры: полное качество (SSAO + SSAA) против режима взаимодействия.
+
+Строит сборку, показывает ее offscreen через CADRenderer и дважды облетает
+камерой по одному сценарию: в полном качестве и так, как рисуются кадры во
+время вращения мышью (без тяжелых проходов, быстрые ребра).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_render_quality [--frames 12] [--size 800 500]
+"""
+import argparse
+
+import pyvista as pv
+
+from src.builder import PartBuilder
+from src.project import load_assembly_class, load_config, load_project_params
+from src.quality import QualityManager
+from src.renderer import CADRenderer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--project", default="tablet_holder")
+    parser.add_argument("--frames", type=int, default=12)
+    parser.add_argument("--size", type=int, nargs=2, default=[800, 500], metavar=("W", "H"))
+    args = parser.parse_args()
+
+    assembly_class = load_assembly_class(args.project)
+    parts = assembly_class(load_project_params(assembly_class), builder=PartBuilder()).build()
+
+    render_cfg = load_config().get("render", {})
+    renderer = CADRenderer(pv.Plotter(off_screen=True, window_size=args.size),
+                           lod=render_cfg.get("lod", {}), quality=render_cfg.get("quality", {}))
+    renderer._frame_keys = set()
+    for part in parts:
+        renderer.render_shape(part)
+    renderer.plotter.view_isometric()
+
+    print(f"{'mode':<14}{'frames':>8}{'mean, ms':>11}{'p95, ms':>10}{'fps':>8}")
+    results = {}
+    for mode, interactive in (("full", False), ("interactive", True)):
+        times = renderer.quality.run_camera_path(args.frames, interactive=interactive)
+        stats = results[mode] = QualityManager.frame_stats(times)
+        print(f"{mode:<14}{stats['frames']:>8}{stats['mean_ms']:>11.1f}{stats['p95_ms']:>10.1f}{stats['fps']:>8.1f}")
+    print(f"speedup while orbiting: {results['full']['mean_ms'] / results['interactive']['mean_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Микро-бенчмарк: конвертация тесселяции в PolyData (старый и новый путь).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_tessellation [--tolerance 0.1] [--repeat 5]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pyvista as pv
+
+from projects.tablet_holder import ProjectAssembly
+from src.tessellation import tessellate, to_vtk_faces
+
+
+def legacy_to_pyvista_mesh(shape, tolerance):
+    """Прежняя реализация CADRenderer._to_pyvista_mesh (списки Python)."""
+    verts, triangles = shape.tessellate(tolerance)
+    points = np.array([[v.X, v.Y, v.Z] for v in verts])
+    faces = []
+    for tri in triangles:
+        faces.append(3)
+        faces.extend(tri)
+    return pv.PolyData(points, np.array(faces))
+
+
+def array_to_pyvista_mesh(shape, tolerance):
+    points, triangles = tessellate(shape, tolerance)
+    return pv.PolyData(points, to_vtk_faces(triangles))
+
+
+def _best_of(fn, shape, tolerance, repeat):
+    best, mesh = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        mesh = fn(shape, tolerance)
+        best = min(best, time.perf_counter() - t0)
+    return best, mesh
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open("projects/tablet_holder/params.json", "r") as f:
+        params = json.load(f)
+    parts = ProjectAssembly(params).build()
+
+    print(f"{'part':<16}{'tris':>8}{'legacy, ms':>12}{'arrays, ms':>12}{'speedup':>9}")
+    for part in parts:
+        # Триангуляция OCCT кэшируется в самой форме, поэтому первый прогон
+        # (собственно BRepMesh) исключаем из сравнения.
+        part.mesh(args.tolerance)
+        t_old, m_old = _best_of(legacy_to_pyvista_mesh, part, args.tolerance, args.repeat)
+        t_new, m_new = _best_of(array_to_pyvista_mesh, part, args.tolerance, args.repeat)
+        assert m_old.n_points == m_new.n_points and m_old.n_cells == m_new.n_cells
+        print(f"{part.label:<16}{m_new.n_cells:>8}{t_old * 1e3:>12.2f}{t_new * 1e3:>12.2f}{t_old / t_new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
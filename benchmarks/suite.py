@@ -0,0 +1,195 @@
+"""Набор бенчмарков горячих путей: сборка, тесселяция, ребра, проверка пересечений и мешей, экспорт, раскладка (без GUI).
+
+Запуск из корня репозитория:
+    python -m benchmarks.suite                         # замер + сравнение с базовой линией
+    python -m benchmarks.suite --save-baseline         # сохранить результат как базовую линию
+    python -m benchmarks.suite --filter tessellate --repeat 5
+
+Результаты пишутся в JSON (--out). Если есть базовая линия (--baseline),
+медиана каждого замера сравнивается с ней; при замедлении больше чем
+на --threshold процесс завершается с кодом 1 (для гейта в CI).
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import build123d
+import pyvista as pv
+import vtk
+from build123d import Location, export_stl, export_brep
+
+from src.builder import PartBuilder
+from src.export import MANIFEST_FILE, ExportPipeline, local_mesh
+from src.interference import check_assembly
+from src.mesh_cache import MeshCache
+from src.mesh_writer import write_stl, write_3mf
+from src.packing import pack
+from src.project import load_assembly_class, load_project_params
+from src.renderer import CADRenderer
+from src.tessellation import tessellate
+from src.validation import validate_mesh
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+
+def _measure(fn, setup=None, repeat: int = 3) -> list:
+    """Время fn(state) в секундах для каждого прогона; setup() в замер не входит."""
+    times = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        t0 = time.perf_counter()
+        fn(state)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def _fresh_parts(parts):
+    # Копии без триангуляции OCCT: иначе повторные прогоны не мешируют заново
+    return [copy.deepcopy(p) for p in parts]
+
+
+def _fresh_export(out_dir: str) -> MeshCache:
+    # Без манифеста: иначе повторные прогоны пропускают неизмененные файлы
+    try:
+        os.remove(os.path.join(out_dir, MANIFEST_FILE))
+    except OSError:
+        pass
+    return MeshCache()
+
+
+def _cases(project: str, tolerances):
+    """Список (имя, fn, setup). Детали строятся один раз для всех замеров."""
+    assembly_class = load_assembly_class(project)
+    params = load_project_params(assembly_class)
+    parts = assembly_class(params, builder=PartBuilder()).build()
+
+    cases = []
+    if project == "tablet_holder":
+        from projects.tablet_holder.holder_half import build_holder_half
+        for is_left in (True, False):
+            for segment in ("top", "bottom", "all"):
+                side = "left" if is_left else "right"
+                cases.append((f"build.holder_half[{side}-{segment}]",
+                              lambda _, l=is_left, s=segment: build_holder_half(params, is_left=l, segment=s), None))
+
+    cases.append(("build.assembly",
+                  lambda _: assembly_class(params, builder=PartBuilder()).build(), None))
+
+    renderer = CADRenderer(pv.Plotter(off_screen=True))
+    for tol in tolerances:
+        def tessellate_all(state, tol=tol):
+            renderer.mesh_cache.clear()
+            for part in state:
+                renderer._to_pyvista_mesh(part, tol)
+        cases.append((f"tessellate[tol={tol}]", tessellate_all, lambda: _fresh_parts(parts)))
+
+    meshes = [renderer._to_pyvista_mesh(p, 0.1) for p in _fresh_parts(parts)]
+    cases.append(("extract_feature_edges[tol=0.1]",
+                  lambda _: [m.extract_feature_edges(feature_angle=30) for m in meshes], None))
+    # Меш вместе с ребрами B-rep (так тесселирует рендерер)
+    cases.append(("tessellate+edges[tol=0.1]",
+                  lambda state: [tessellate(p, 0.1, renderer._angular_tolerance(0.1), edges=True) for p in state],
+                  lambda: [p.located(Location()) for p in parts]))
+
+    cases.append(("check_assembly[tol=0.1]", lambda _: check_assembly(parts, 0.1), None))
+
+    out_dir = tempfile.mkdtemp(prefix="bench_export_")
+    for fmt, exporter in (("stl", export_stl), ("brep", export_brep)):
+        def export_all(state, fmt=fmt, exporter=exporter):
+            for i, part in enumerate(state):
+                exporter(part, os.path.join(out_dir, f"part_{i}.{fmt}"))
+        cases.append((f"export.{fmt}", export_all, lambda: _fresh_parts(parts)))
+
+    # Экспорт через ExportPipeline: одна тесселяция на деталь, потоковая запись STL/3MF
+    cases.append(("export.pipeline[stl+3mf]",
+                  lambda cache: ExportPipeline(out_dir, ("stl", "3mf"), mesh_cache=cache).run(parts),
+                  lambda: _fresh_export(out_dir)))
+    buffers = [tessellate(p, 1e-3, 0.1) for p in _fresh_parts(parts)]
+
+    def write_all(_):
+        for i, (points, triangles) in enumerate(buffers):
+            write_stl(os.path.join(out_dir, f"part_{i}.stl"), points, triangles)
+            write_3mf(os.path.join(out_dir, f"part_{i}.3mf"), points, triangles)
+    cases.append(("write.stl+3mf[cached buffers]", write_all, None))
+    # Проверка мешей на дефекты: экспортная тесселяция и грубая (как во вьюере)
+    cases.append(("validate[tol=0.001]", lambda _: [validate_mesh(*mesh) for mesh in buffers], None))
+    coarse = [tessellate(p, 0.5, 0.5) for p in _fresh_parts(parts)]
+    cases.append(("validate[tol=0.5]", lambda _: [validate_mesh(*mesh) for mesh in coarse], None))
+
+    # Раскладка на столы по готовым мешам: ориентация, растр отпечатков, поиск позиций
+    local_meshes = [(p.label, *local_mesh(p)) for p in parts]
+    cases.append(("pack.plates[256x256]", lambda _: pack(local_meshes, (256, 256)), None))
+    return cases
+
+
+def _environment() -> dict:
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count(), "build123d": getattr(build123d, "__version__", ""),
+            "vtk": vtk.vtkVersion.GetVTKVersion(), "date": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """[(имя, базовая медиана, текущая медиана, отношение, регрессия?)] для общих замеров."""
+    rows = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = current["median"] / base["median"] if base["median"] > 0 else float("inf")
+        rows.append((name, base["median"], current["median"], ratio, ratio > 1.0 + threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--project", default="tablet_holder")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--filter", default="", help="запускать только замеры, содержащие подстроку")
+    parser.add_argument("--tolerances", type=float, nargs="+", default=[0.5, 0.1, 0.05])
+    parser.add_argument("--out", default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--baseline", default=os.path.join(RESULTS_DIR, "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="записать результат как базовую линию")
+    parser.add_argument("--threshold", type=float, default=0.25, help="допустимое замедление (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'benchmark':<36}{'best, ms':>12}{'median, ms':>12}")
+    for name, fn, setup in _cases(args.project, args.tolerances):
+        if args.filter not in name:
+            continue
+        times = _measure(fn, setup, args.repeat)
+        results[name] = {"best": min(times), "median": statistics.median(times), "runs": len(times)}
+        print(f"{name:<36}{min(times) * 1e3:>12.1f}{statistics.median(times) * 1e3:>12.1f}")
+
+    report = {"environment": _environment(), "project": args.project, "results": results}
+    for path in [args.out] + ([args.baseline] if args.save_baseline else []):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=1)
+    print(f"\nResults: {args.out}" + (f", baseline: {args.baseline}" if args.save_baseline else ""))
+
+    if args.save_baseline or not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline.get("results", {}), args.threshold)
+    print(f"\nvs baseline ({baseline.get('environment', {}).get('date', '?')}), threshold +{args.threshold:.0%}:")
+    print(f"{'benchmark':<36}{'base, ms':>12}{'now, ms':>12}{'ratio':>8}")
+    for name, base, now, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<36}{base * 1e3:>12.1f}{now * 1e3:>12.1f}{ratio:>8.2f}{flag}")
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,14 @@
 import sys
 import os
-import vtk
 import warnings
-from PySide6.QtWidgets import QApplication
-from src.ui import CADMainWindow
-from projects.tablet_holder import ProjectAssembly
+from src import startup
+
+PROJECT = "tablet_holder"
 
 def setup_environment():
     """Настройка переменных окружения для стабильной работы 3D."""
+    with startup.timed("import vtk"):
+        import vtk
     vtk.vtkObject.GlobalWarningDisplayOff()
     # Игнорируем предупреждения о депрекации в консоли
     warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -23,19 +24,31 @@ def setup_environment():
         os.environ["QT_QPA_PLATFORM"] = "xcb"
 
 def main():
+    # --startup-report: время этапов до первого кадра (см. src/startup.py)
+    startup.requested = "--startup-report" in sys.argv
+    argv = [arg for arg in sys.argv if arg != "--startup-report"]
     setup_environment()
     
+    # Тяжелые модули импортируются по мере надобности: build123d/OCP и проект
+    # загружаются в фоне уже после показа окна (см. CADMainWindow)
+    with startup.timed("import PySide6"):
+        from PySide6.QtCore import Qt, QTimer
+        from PySide6.QtWidgets import QApplication
+
     # Включаем поддержку High DPI до создания QApplication
-    from PySide6.QtCore import Qt
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling)
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
     
-    app = QApplication(sys.argv)
+    app = QApplication(argv)
     
     try:
-        # Теперь CADMainWindow сам позаботится о загрузке параметров для ProjectAssembly
-        window = CADMainWindow(ProjectAssembly)
+        with startup.timed("import src.ui (pyvista, pyvistaqt)"):
+            from src.ui import CADMainWindow
+        # Окно показывается сразу; проект загружается в фоне по имени
+        window = CADMainWindow(PROJECT)
         window.show()
+        startup.mark("window shown")
+        QTimer.singleShot(0, lambda: startup.mark("event loop running"))
     except Exception as e:
         import traceback
         traceback.print_exc()
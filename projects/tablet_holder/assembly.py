@@ -2,23 +2,30 @@ from __future__ import annotations
 import json
 import os
 from build123d import *
+from src.builder import PartBuilder
 from .holder_half import build_holder_half
 from .adapter import build_adapter
 from .slider import build_slider
 
 class ProjectAssembly:
-    def __init__(self, params: dict = None):
+    def __init__(self, params: dict = None, builder: PartBuilder = None):
         self.params = params if params else {}
+        self.builder = builder if builder else PartBuilder()
 
     def build(self) -> list[Shape]:
-        # 1. Создаем детали (4 четверти)
-        lpt = build_holder_half(self.params, is_left=True, segment="top")
-        lpb = build_holder_half(self.params, is_left=True, segment="bottom")
-        rpt = build_holder_half(self.params, is_left=False, segment="top")
-        rpb = build_holder_half(self.params, is_left=False, segment="bottom")
-        
-        ap = build_adapter(self.params)
-        sp = build_slider(self.params)
+        # 1. Создаем детали (4 четверти). builder перестраивает только те детали,
+        # чьи параметры изменились; остальные переиспользуются (меняется лишь location)
+        self.builder.begin()
+        parts = self.builder.build_many(self.params, {
+            "lpt": (build_holder_half, {"is_left": True, "segment": "top"}),
+            "lpb": (build_holder_half, {"is_left": True, "segment": "bottom"}),
+            "rpt": (build_holder_half, {"is_left": False, "segment": "top"}),
+            "rpb": (build_holder_half, {"is_left": False, "segment": "bottom"}),
+            "ap": (build_adapter, {}),
+            "sp": (build_slider, {}),
+        })
+        lpt, lpb, rpt, rpb = parts["lpt"], parts["lpb"], parts["rpt"], parts["rpb"]
+        ap, sp = parts["ap"], parts["sp"]
 
         # 2. Позиционирование (возвращаем в 0,0,0)
         for p in [lpt, lpb, rpt, rpb]:
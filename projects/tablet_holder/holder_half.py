@@ -1,9 +1,39 @@
 from __future__ import annotations
 from build123d import *
 import math
+import warnings
+from src.builder import BuildWarning, build_part
+from src.profiling import stage
 
-def build_holder_half(params: dict, is_left: bool = True, segment: str = "all") -> Part:
-    """Строит половину корпуса или её четверть (Top/Bottom) с шипами для сборки."""
+def _tool_mode(mode: Mode, batched: bool) -> Mode:
+    """В пакетном режиме инструменты только создаются (PRIVATE) и копятся в списках."""
+    return Mode.PRIVATE if batched else mode
+
+
+def _apply_tools(adds: list, cuts: list, batched: bool):
+    """Пакетный режим: одно объединение со всеми добавляемыми инструментами и
+    один вырез со всеми вычитаемыми (вместо булевой операции на каждый элемент).
+
+    Добавляемые и вычитаемые инструменты одного этапа не пересекаются,
+    поэтому порядок "сначала ADD, затем SUBTRACT" дает ту же геометрию.
+    """
+    if not batched:
+        return
+    if adds:
+        insert(adds, mode=Mode.ADD)
+    if cuts:
+        insert(cuts, mode=Mode.SUBTRACT)
+
+
+def build_holder_base(params: dict, is_left: bool = True, batched: bool = True) -> Part:
+    """Строит заготовку половины корпуса: все элементы до горизонтального разреза.
+
+    Заготовка общая для обеих четвертей и целой половины одной стороны.
+
+    batched=True применяет повторяющиеся элементы (отверстия, гнезда гаек, шипы
+    и пазы) пакетами, одной булевой операцией на этап; batched=False - по одному,
+    как эталон для сравнения (геометрия совпадает).
+    """
     
     tw, th, tt = params["tablet_w"], params["tablet_h"], params["tablet_t"]
     wall = params["wall"]
@@ -30,179 +60,235 @@ def build_holder_half(params: dict, is_left: bool = True, segment: str = "all")
         align_x = Align.MAX if is_left else Align.MIN
         
         # 1. Задняя панель
-        Box(hw, th_total, panel_t, align=(align_x, Align.CENTER, Align.MIN))
+        with stage("holder_half.back_panel", obj):
+            Box(hw, th_total, panel_t, align=(align_x, Align.CENTER, Align.MIN))
         
         # 2. Боковая стенка (Ковш)
-        with BuildPart(mode=Mode.ADD):
-            with BuildSketch(Plane.YZ.offset(x_dir * hw)) as s:
-                with BuildLine() as bl:
-                    p1 = (-th_total/2, 0)
-                    p2 = (th_total/2, 0)
-                    p3 = (th_total/2, total_depth)
-                    pb = (th_total/4, total_depth)
-                    p4 = (-th_total/2, panel_t + tt)
-                    Polyline(p1, p2, p3, pb, p4, close=True)
+        with stage("holder_half.side_profile", obj):
+            with BuildPart(mode=Mode.ADD):
+                with BuildSketch(Plane.YZ.offset(x_dir * hw)) as s:
+                    with BuildLine() as bl:
+                        p1 = (-th_total/2, 0)
+                        p2 = (th_total/2, 0)
+                        p3 = (th_total/2, total_depth)
+                        pb = (th_total/4, total_depth)
+                        p4 = (-th_total/2, panel_t + tt)
+                        Polyline(p1, p2, p3, pb, p4, close=True)
                     
-                    # Правильный выбор вершин в 2D эскизе
-                    def get_closest(pts, target):
-                        return sorted(pts, key=lambda p: (p.X - target[0])**2 + (p.Y - target[1])**2)[0]
+                        # Правильный выбор вершин в 2D эскизе
+                        def get_closest(pts, target):
+                            return sorted(pts, key=lambda p: (p.X - target[0])**2 + (p.Y - target[1])**2)[0]
                     
-                    v_middle = get_closest(bl.vertices(), pb)
-                    v_bottom = get_closest(bl.vertices(), p4)
+                        v_middle = get_closest(bl.vertices(), pb)
+                        v_bottom = get_closest(bl.vertices(), p4)
                     
-                    fillet(v_middle, radius=50.0)
-                    fillet(v_bottom, radius=15.0)
-                make_face()
-            extrude(amount=-x_dir * wall)
+                        fillet(v_middle, radius=50.0)
+                        fillet(v_bottom, radius=15.0)
+                    make_face()
+                extrude(amount=-x_dir * wall)
 
         # 2.1 Вырез под провод (только для правой части)
-        if not is_left:
-            cutout_w = params.get("wire_cutout_w", 30.0)
-            cutout_h = tt + 6.0
-            # Центр планшета по Y
-            tablet_center_y = (th_total/2 - wall + tablet_bottom_y) / 2
-            with Locations((x_dir * hw, tablet_center_y, panel_t + tt/2)):
-                Box(wall * 3, cutout_w, cutout_h, mode=Mode.SUBTRACT)
+        with stage("holder_half.wire_cutout", obj):
+            if not is_left:
+                cutout_w = params.get("wire_cutout_w", 30.0)
+                cutout_h = tt + 6.0
+                # Центр планшета по Y
+                tablet_center_y = (th_total/2 - wall + tablet_bottom_y) / 2
+                with Locations((x_dir * hw, tablet_center_y, panel_t + tt/2)):
+                    Box(wall * 3, cutout_w, cutout_h, mode=Mode.SUBTRACT)
             
-            # Скругляем вертикальные ребра выреза
-            cutout_edges = obj.edges().filter_by(Axis.Z).sort_by(Axis.X)[-4:]
-            # Фильтруем те, что близки к нашему вырезу по Y
-            cutout_edges = [e for e in cutout_edges if abs(e.center().Y - tablet_center_y) < cutout_w/2 + 1.0]
-            if cutout_edges:
-                try: fillet(cutout_edges, radius=3.0)
-                except: pass
+                # Скругляем вертикальные ребра выреза
+                cutout_edges = obj.edges().filter_by(Axis.Z).sort_by(Axis.X)[-4:]
+                # Фильтруем те, что близки к нашему вырезу по Y
+                cutout_edges = [e for e in cutout_edges if abs(e.center().Y - tablet_center_y) < cutout_w/2 + 1.0]
+                if cutout_edges:
+                    try: fillet(cutout_edges, radius=3.0)
+                    except Exception as e: warnings.warn(f"holder_half: wire cutout fillet failed ({e})", BuildWarning)
 
         # 3. Верхний козырек (Roof)
-        roof_depth = total_depth - panel_t
-        with BuildPart(mode=Mode.ADD):
-            # Увеличиваем толщину козырька до panel_t (было wall)
-            with Locations((0, th_total/2 - panel_t/2, panel_t + roof_depth/2)):
-                Box(hw, panel_t, roof_depth, align=(align_x, Align.CENTER, Align.CENTER))
+        with stage("holder_half.roof", obj):
+            roof_depth = total_depth - panel_t
+            with BuildPart(mode=Mode.ADD):
+                # Увеличиваем толщину козырька до panel_t (было wall)
+                with Locations((0, th_total/2 - panel_t/2, panel_t + roof_depth/2)):
+                    Box(hw, panel_t, roof_depth, align=(align_x, Align.CENTER, Align.CENTER))
             
-            # 3.1 ОТВЕРСТИЯ В КОЗЫРЬКЕ (3 штуки для стяжки пластиной)
-            # Теперь центрируем по новой толщине panel_t
-            for x_off in [40.0, 90.0, 140.0]:
-                xh = x_dir * x_off
-                with Locations((xh, th_total/2 - panel_t/2, panel_t + tt + 30.0)):
-                    # Поворачиваем цилиндр вдоль оси Y (90 градусов по X)
-                    Cylinder(radius=bd/2, height=panel_t * 2, rotation=(90, 0, 0), mode=Mode.SUBTRACT)
-
-            # 3.2 ФИКСИРУЮЩАЯ ПЛАНКА (Прямая, во всю ширину)
-            bar_h, bar_t = 12.0, 18.0
-            # Размещаем планку вплотную к утолщенному козырьку
-            with BuildPart(mode=Mode.ADD) as bar_obj:
-                with Locations((0, th_total/2 - panel_t - bar_h/2, panel_t + tt + bar_t/2)):
-                    Box(hw, bar_h, bar_t, align=(align_x, Align.CENTER, Align.CENTER))
-                # Скругляем внутреннее ребро
-                inner_edge = bar_obj.edges().filter_by(Axis.X).sort_by(Axis.Y)[0:2].sort_by(Axis.Z)[0]
-                fillet(inner_edge, radius=5.0)
+                # 3.1 ОТВЕРСТИЯ В КОЗЫРЬКЕ (3 штуки для стяжки пластиной)
+                # Теперь центрируем по новой толщине panel_t
+                cuts = []
+                for x_off in [40.0, 90.0, 140.0]:
+                    xh = x_dir * x_off
+                    with Locations((xh, th_total/2 - panel_t/2, panel_t + tt + 30.0)):
+                        # Поворачиваем цилиндр вдоль оси Y (90 градусов по X)
+                        cuts.append(Cylinder(radius=bd/2, height=panel_t * 2, rotation=(90, 0, 0),
+                                             mode=_tool_mode(Mode.SUBTRACT, batched)))
+                _apply_tools([], cuts, batched)
+
+                # 3.2 ФИКСИРУЮЩАЯ ПЛАНКА (Прямая, во всю ширину)
+                bar_h, bar_t = 12.0, 18.0
+                # Размещаем планку вплотную к утолщенному козырьку
+                with BuildPart(mode=Mode.ADD) as bar_obj:
+                    with Locations((0, th_total/2 - panel_t - bar_h/2, panel_t + tt + bar_t/2)):
+                        Box(hw, bar_h, bar_t, align=(align_x, Align.CENTER, Align.CENTER))
+                    # Скругляем внутреннее ребро
+                    inner_edge = bar_obj.edges().filter_by(Axis.X).sort_by(Axis.Y)[0:2].sort_by(Axis.Z)[0]
+                    fillet(inner_edge, radius=5.0)
 
         # 4. Направляющие пазы
         # Верх паза для прижатия 205мм (фиксируем относительно низа)
-        slot_height = 72.0 # (th + 68.0) - wall - th_min при исходных параметрах
-        slot_bottom = -th_total/2 
-        slot_top = slot_bottom + slot_height
+        with stage("holder_half.slots", obj):
+            slot_height = 72.0 # (th + 68.0) - wall - th_min при исходных параметрах
+            slot_bottom = -th_total/2 
+            slot_top = slot_bottom + slot_height
         
-        with Locations((0, (slot_top + slot_bottom)/2, panel_t - st/2)):
-            Box(sw/2 + 1, slot_top - slot_bottom, st + 0.5, align=(align_x, Align.CENTER, Align.CENTER), mode=Mode.SUBTRACT)
-        with Locations((0, (slot_top + slot_bottom)/2, panel_t/2)):
-            Box(55, slot_top - slot_bottom, panel_t + 2, align=(align_x, Align.CENTER, Align.CENTER), mode=Mode.SUBTRACT)
+            cuts = []
+            with Locations((0, (slot_top + slot_bottom)/2, panel_t - st/2)):
+                cuts.append(Box(sw/2 + 1, slot_top - slot_bottom, st + 0.5, align=(align_x, Align.CENTER, Align.CENTER),
+                                mode=_tool_mode(Mode.SUBTRACT, batched)))
+            with Locations((0, (slot_top + slot_bottom)/2, panel_t/2)):
+                cuts.append(Box(55, slot_top - slot_bottom, panel_t + 2, align=(align_x, Align.CENTER, Align.CENTER),
+                                mode=_tool_mode(Mode.SUBTRACT, batched)))
+            _apply_tools([], cuts, batched)
         
         # 5. Отверстия под адаптер (теперь 6 на каждую половину, итого 12)
         # 5.1 Отверстия соответствуют VESA (центральные на X=hdx/2, Y=+/-hdy/2)
-        hdx = params.get("adapter_hole_dist_x", 100.0)
-        hdy = params.get("adapter_hole_dist_y", 100.0)
-        hds = params.get("adapter_hole_step_x", 50.0)
+        with stage("holder_half.nut_pockets", obj):
+            hdx = params.get("adapter_hole_dist_x", 100.0)
+            hdy = params.get("adapter_hole_dist_y", 100.0)
+            hds = params.get("adapter_hole_step_x", 50.0)
         
-        for x_off in [hdx/2, hdx/2 + hds, hdx/2 + hds * 2]:
-            xh = x_dir * x_off
-            for yh in [-hdy/2, hdy/2]:
-                with Locations((xh, yh, 0)):
-                    # Сквозное отверстие
-                    Cylinder(radius=bd/2, height=panel_t, align=(Align.CENTER, Align.CENTER, Align.MIN), mode=Mode.SUBTRACT)
-                    # Гнездо под гайку на лицевой стороне
-                    with BuildSketch(Plane.XY.offset(panel_t)) as s:
-                        with Locations((xh, yh)): RegularPolygon(radius=nut_r, side_count=6)
-                    extrude(amount=-4.0, mode=Mode.SUBTRACT)
+            cuts = []
+            for x_off in [hdx/2, hdx/2 + hds, hdx/2 + hds * 2]:
+                xh = x_dir * x_off
+                for yh in [-hdy/2, hdy/2]:
+                    with Locations((xh, yh, 0)):
+                        # Сквозное отверстие
+                        cuts.append(Cylinder(radius=bd/2, height=panel_t, align=(Align.CENTER, Align.CENTER, Align.MIN),
+                                             mode=_tool_mode(Mode.SUBTRACT, batched)))
+                        # Гнездо под гайку на лицевой стороне
+                        with BuildSketch(Plane.XY.offset(panel_t), mode=_tool_mode(Mode.ADD, batched)) as s:
+                            with Locations((xh, yh)): RegularPolygon(radius=nut_r, side_count=6)
+                        if batched:
+                            cuts.append(extrude(s.sketch, amount=-4.0, mode=Mode.PRIVATE))
+                        else:
+                            extrude(amount=-4.0, mode=Mode.SUBTRACT)
+            _apply_tools([], cuts, batched)
 
         # 6. ВЕРТИКАЛЬНЫЕ ШИПЫ (X=0) - Соединение лево-право
         # Добавляем шипы ДО разрезания. 
-        roof_depth = total_depth - panel_t
-        roof_y = th_total/2 - panel_t/2
+        with stage("holder_half.vertical_tabs", obj):
+            roof_depth = total_depth - panel_t
+            roof_y = th_total/2 - panel_t/2
         
-        v_tabs = []
-        # 1. Пазы козырька (Схема: Шип - Пропуск - Паз вдоль глубины Z)
-        # Используем ровно 1/3 глубины без зазоров для идеальной стыковки
-        seg_dz = roof_depth / 3
-        for i in [0, 2]: # i=0 (у панели), i=2 (у края козырька)
-            z_pos = panel_t + (i + 0.5) * seg_dz
-            v_tabs.append({"y": roof_y, "z": z_pos, "dy": panel_t, "dz": seg_dz})
+            v_tabs = []
+            # 1. Пазы козырька (Схема: Шип - Пропуск - Паз вдоль глубины Z)
+            # Используем ровно 1/3 глубины без зазоров для идеальной стыковки
+            seg_dz = roof_depth / 3
+            for i in [0, 2]: # i=0 (у панели), i=2 (у края козырька)
+                z_pos = panel_t + (i + 0.5) * seg_dz
+                v_tabs.append({"y": roof_y, "z": z_pos, "dy": panel_t, "dz": seg_dz})
         
-        # 2. Пазы задней панели
-        for y_pos in [120.0, 80.0, 40.0, -22.0, -60.5]:
-            v_tabs.append({"y": y_pos, "z": panel_t/2, "dy": 25.0, "dz": panel_t})
-
-        v_tab_h = 10.0
-        for i, tab in enumerate(v_tabs):
-            # Логика Male/Female
-            is_male = (i % 2 == 0) if is_left else (i % 2 != 0)
-            with Locations(Plane.YZ):
-                with Locations((tab["y"], tab["z"])):
-                    if is_male:
-                        Box(tab["dy"], tab["dz"], v_tab_h * 2, mode=Mode.ADD)
-                    else:
-                        Box(tab["dy"] + 0.04, tab["dz"] + 0.04, v_tab_h * 2 + 0.04, mode=Mode.SUBTRACT)
+            # 2. Пазы задней панели
+            for y_pos in [120.0, 80.0, 40.0, -22.0, -60.5]:
+                v_tabs.append({"y": y_pos, "z": panel_t/2, "dy": 25.0, "dz": panel_t})
+
+            v_tab_h = 10.0
+            adds, cuts = [], []
+            for i, tab in enumerate(v_tabs):
+                # Логика Male/Female
+                is_male = (i % 2 == 0) if is_left else (i % 2 != 0)
+                with Locations(Plane.YZ):
+                    with Locations((tab["y"], tab["z"])):
+                        if is_male:
+                            adds.append(Box(tab["dy"], tab["dz"], v_tab_h * 2, mode=_tool_mode(Mode.ADD, batched)))
+                        else:
+                            cuts.append(Box(tab["dy"] + 0.04, tab["dz"] + 0.04, v_tab_h * 2 + 0.04,
+                                            mode=_tool_mode(Mode.SUBTRACT, batched)))
+            _apply_tools(adds, cuts, batched)
+
+    return obj.part
+
+
+def build_holder_half(params: dict, is_left: bool = True, segment: str = "all", batched: bool = True) -> Part:
+    """Строит половину корпуса или её четверть (Top/Bottom) с шипами для сборки.
+
+    Заготовка стороны (build_holder_base) строится через build_part: при сборке
+    через PartBuilder она строится один раз и переиспользуется для всех
+    сегментов, здесь выполняются только разрез, горизонтальные шипы и скругления.
+    """
+    base = build_part(build_holder_base, params, is_left=is_left, batched=batched)
+
+    tw, th, tt = params["tablet_w"], params["tablet_h"], params["tablet_t"]
+    wall = params["wall"]
+    vd = params["visor_d"]
+
+    th_total = th + params.get("holder_padding", 68.0)
+    hw = (tw + wall * 2) / 2
+    tablet_bottom_y = th_total/2 - wall - th
+
+    st = params.get("slider_front_t", 6.0)
+    sw = params.get("slider_f_width", 140.0)
+    panel_t = wall + st
+
+    with BuildPart() as obj:
+        insert(base)
 
         # 7. ГОРИЗОНТАЛЬНОЕ РАЗДЕЛЕНИЕ (вдоль оси Y=0)
-        if segment == "top":
-            split(bisect_by=Plane.XZ, keep=Keep.TOP)
-        elif segment == "bottom":
-            split(bisect_by=Plane.XZ, keep=Keep.BOTTOM)
+        with stage("holder_half.split", obj):
+            if segment == "top":
+                split(bisect_by=Plane.XZ, keep=Keep.TOP)
+            elif segment == "bottom":
+                split(bisect_by=Plane.XZ, keep=Keep.BOTTOM)
 
         # 8. ГОРИЗОНТАЛЬНЫЕ ШИПЫ (Y=0) - Соединение верх-низ
-        h_tabs = []
-        # 1. Пазы задней панели
-        for x_pos in [30.0, 70.0, 110.0, 150.0]:
-            h_tabs.append({"x": x_pos, "z": panel_t/2, "dx": 20.0, "dz": panel_t})
+        with stage("holder_half.horizontal_tabs", obj):
+            h_tabs = []
+            # 1. Пазы задней панели
+            for x_pos in [30.0, 70.0, 110.0, 150.0]:
+                h_tabs.append({"x": x_pos, "z": panel_t/2, "dx": 20.0, "dz": panel_t})
         
-        # 2. Один паз для боковой стенки (смещен вперед на 5мм от центра профиля)
-        side_x = hw - wall/2
-        # Глубина боковой стенки на Y=0 ~ 56мм. Центр 28.0 + 5.0 = 33.0
-        h_tabs.append({"x": side_x, "z": 33.0, "dx": wall, "dz": 20.0})
-
-        h_tab_h = 10.0
-        if segment != "all":
-            for i, tab in enumerate(h_tabs):
-                xh = -tab["x"] if is_left else tab["x"]
-                # Инвертируем логику для панели (i < 4), но сохраняем для боковины (i == 4)
-                is_male = (i % 2 != 0) if segment == "bottom" else (i % 2 == 0)
-                if i == 4: # Сохраняем ориентацию бокового паза
-                    is_male = not is_male
+            # 2. Один паз для боковой стенки (смещен вперед на 5мм от центра профиля)
+            side_x = hw - wall/2
+            # Глубина боковой стенки на Y=0 ~ 56мм. Центр 28.0 + 5.0 = 33.0
+            h_tabs.append({"x": side_x, "z": 33.0, "dx": wall, "dz": 20.0})
+
+            h_tab_h = 10.0
+            if segment != "all":
+                adds, cuts = [], []
+                for i, tab in enumerate(h_tabs):
+                    xh = -tab["x"] if is_left else tab["x"]
+                    # Инвертируем логику для панели (i < 4), но сохраняем для боковины (i == 4)
+                    is_male = (i % 2 != 0) if segment == "bottom" else (i % 2 == 0)
+                    if i == 4: # Сохраняем ориентацию бокового паза
+                        is_male = not is_male
                     
-                with Locations(Plane.XZ):
-                    with Locations((xh, tab["z"])):
-                        if is_male:
-                            Box(tab["dx"], tab["dz"], h_tab_h * 2, mode=Mode.ADD)
-                        else:
-                            Box(tab["dx"] + 0.04, tab["dz"] + 0.04, h_tab_h * 2 + 0.04, mode=Mode.SUBTRACT)
+                    with Locations(Plane.XZ):
+                        with Locations((xh, tab["z"])):
+                            if is_male:
+                                adds.append(Box(tab["dx"], tab["dz"], h_tab_h * 2, mode=_tool_mode(Mode.ADD, batched)))
+                            else:
+                                cuts.append(Box(tab["dx"] + 0.04, tab["dz"] + 0.04, h_tab_h * 2 + 0.04,
+                                                mode=_tool_mode(Mode.SUBTRACT, batched)))
+                _apply_tools(adds, cuts, batched)
 
         # 9. Смягчение внешних граней (Fillet)
         # Применяем только к целой модели или очень осторожно к частям
-        if segment == "all":
-            y_top = obj.part.bounding_box().max.Y
-            def is_external(e):
-                if all(abs(v.X) < 0.05 for v in e.vertices()): return False
-                c = e.center()
-                if abs(c.Y - y_top) < 0.1: return True
-                if abs(abs(c.X) - hw) < 0.1 and c.Z > panel_t: return True
-                if abs(c.Z - (panel_t + tt + vd)) < 0.1: return True
-                if abs(c.X) > sw/2 + 10.0 and c.Z < 1.0: return True
-                return False
-
-            external_edges = [e for e in obj.edges() if is_external(e)]
-            if external_edges:
-                try: fillet(external_edges, radius=2.0)
-                except: pass
+        with stage("holder_half.external_fillet", obj):
+            if segment == "all":
+                y_top = obj.part.bounding_box().max.Y
+                def is_external(e):
+                    if all(abs(v.X) < 0.05 for v in e.vertices()): return False
+                    c = e.center()
+                    if abs(c.Y - y_top) < 0.1: return True
+                    if abs(abs(c.X) - hw) < 0.1 and c.Z > panel_t: return True
+                    if abs(c.Z - (panel_t + tt + vd)) < 0.1: return True
+                    if abs(c.X) > sw/2 + 10.0 and c.Z < 1.0: return True
+                    return False
+
+                external_edges = [e for e in obj.edges() if is_external(e)]
+                if external_edges:
+                    try: fillet(external_edges, radius=2.0)
+                    except Exception as e: warnings.warn(f"holder_half: external edge fillet failed ({e})", BuildWarning)
 
         RigidJoint("slider_start", obj.part, Location((0, tablet_bottom_y, wall)))
         RigidJoint("adapter_mount", obj.part, Location((0, 0, 0)))
@@ -0,0 +1,326 @@
+import hashlib
+import inspect
+import io
+import json
+import os
+import sys
+
+import build123d
+from build123d import Part, Compound, Location, RigidJoint, export_brep
+from OCP.BRep import BRep_Builder
+from OCP.BRepTools import BRepTools
+from OCP.TopoDS import TopoDS_Shape
+from OCP.gp import gp_Trsf
+
+_MISSING = "<missing>"
+
+
+class TrackedParams(dict):
+    """Словарь параметров, запоминающий ключи, которые прочитал построитель."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.accessed = set()
+
+    def __getitem__(self, key):
+        self.accessed.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.accessed.add(key)
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        self.accessed.add(key)
+        return super().__contains__(key)
+
+    def __iter__(self):
+        # Перебор всех ключей - зависимость от всего набора параметров
+        self.accessed.update(super().keys())
+        return super().__iter__()
+
+    def keys(self):
+        self.accessed.update(super().keys())
+        return super().keys()
+
+    def values(self):
+        self.accessed.update(super().keys())
+        return super().values()
+
+    def items(self):
+        self.accessed.update(super().keys())
+        return super().items()
+
+    def untracked(self) -> dict:
+        """Копия параметров без отметки о чтении ключей."""
+        return {k: dict.__getitem__(self, k) for k in dict.keys(self)}
+
+
+def _location_to_list(loc: Location) -> list:
+    t = loc.wrapped.Transformation()
+    return [t.Value(i, j) for i in range(1, 4) for j in range(1, 5)]
+
+
+def _location_from_list(values: list) -> Location:
+    t = gp_Trsf()
+    t.SetValues(*values)
+    return Location(t)
+
+
+def part_to_brep(part) -> tuple[bytes, dict]:
+    """Сериализует деталь: BREP геометрии + словарь джойнтов (RigidJoint)."""
+    buf = io.BytesIO()
+    export_brep(part, buf)
+    joints = {}
+    for name, joint in getattr(part, "joints", {}).items():
+        if not isinstance(joint, RigidJoint):
+            raise TypeError(f"Joint '{name}' ({type(joint).__name__}) is not serializable")
+        joints[name] = _location_to_list(joint.relative_location)
+    return buf.getvalue(), joints
+
+
+def part_from_brep(data: bytes, joints: dict) -> Part:
+    """Восстанавливает деталь из BREP и словаря джойнтов."""
+    shape = TopoDS_Shape()
+    BRepTools.Read_s(shape, io.BytesIO(data), BRep_Builder())
+    if shape.IsNull():
+        raise ValueError("Could not read BREP data")
+    part = Part(Compound.cast(shape).wrapped)
+    for name, values in joints.items():
+        RigidJoint(name, part, _location_from_list(values))
+    return part
+
+
+def _builder_id(func) -> str:
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+# Значения глобальных имен, которые входят в ключ как есть (константы модуля)
+_CONSTANT_TYPES = (bool, int, float, str, bytes, tuple, list, dict, frozenset, type(None))
+
+
+def _stable_repr(value) -> str:
+    """repr, не зависящий от процесса: порядок frozenset зависит от PYTHONHASHSEED."""
+    if isinstance(value, frozenset):
+        return "frozenset({" + ", ".join(sorted(_stable_repr(v) for v in value)) + "})"
+    if isinstance(value, tuple):
+        return "(" + ", ".join(_stable_repr(v) for v in value) + ")"
+    return repr(value)
+
+
+def _code_objects(code):
+    yield code
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            yield from _code_objects(const)
+
+
+def code_digest(func) -> str:
+    """Хэш загруженного кода построителя и функций проекта, которые он вызывает (транзитивно).
+
+    Берется байткод уже загруженных функций, а не файл на диске: деталь,
+    построенная старым кодом, не должна попасть в кэш под ключом нового
+    исходника, сохраненного во время сборки. Вложенные построители и
+    вспомогательные функции (общая заготовка, режимы инструментов) и
+    константы модуля тоже определяют геометрию и входят в хэш. Номера
+    строк в байткод не входят: правка комментариев ключ не меняет.
+    """
+    module = sys.modules[func.__module__]
+    package = module.__package__ or module.__name__
+
+    def in_project(value) -> bool:
+        name = value.__name__ if inspect.ismodule(value) else getattr(value, "__module__", None)
+        return isinstance(name, str) and (name == package or name.startswith(package + "."))
+
+    digest = hashlib.sha256()
+    seen, pending = set(), [func]
+    while pending:
+        f = pending.pop()
+        name = _builder_id(f)
+        if name in seen:
+            continue
+        seen.add(name)
+        digest.update(name.encode("utf-8"))
+        digest.update(repr((f.__defaults__, f.__kwdefaults__)).encode("utf-8"))
+        for code in _code_objects(f.__code__):
+            digest.update(code.co_code)
+            consts = tuple(c for c in code.co_consts if not inspect.iscode(c))
+            digest.update(_stable_repr((code.co_names, consts)).encode("utf-8"))
+            for global_name in code.co_names:
+                value = f.__globals__.get(global_name)
+                if isinstance(value, _CONSTANT_TYPES):
+                    digest.update(f"{global_name}={value!r}".encode("utf-8"))
+                elif not in_project(value):
+                    continue
+                elif inspect.isfunction(value):
+                    pending.append(value)
+                elif inspect.isclass(value) or inspect.ismodule(value):
+                    pending.extend(v for _, v in sorted(vars(value).items())
+                                   if inspect.isfunction(v) and in_project(v))
+    return digest.hexdigest()
+
+
+def _digest(payload) -> str:
+    data = json.dumps(payload, sort_keys=True, default=repr).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class BuildCache:
+    """Постоянный кэш построенных деталей на диске (BREP + метаданные).
+
+    Ключ записи - хэш загруженного кода построителя (с вызываемыми им
+    функциями проекта, см. code_digest), аргументов построителя и значений
+    ровно тех параметров, которые он прочитал при построении. Список
+    прочитанных ключей хранится в индексе для каждой пары (построитель, аргументы).
+    Размер кэша ограничен max_bytes, вытеснение - по давности использования (LRU).
+    """
+
+    def __init__(self, cache_dir: str = os.path.join(".cache", "parts"), max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(os.path.join(self.cache_dir, "index"), exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """Создает кэш по секции "cache" файла config.json (None, если выключен)."""
+        cfg = config.get("cache", {})
+        if not cfg.get("enabled", True):
+            return None
+        return cls(cfg.get("dir", os.path.join(".cache", "parts")),
+                   int(cfg.get("max_mb", 512)) * 1024 * 1024)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self._entries()), "bytes": self.size_bytes()}
+
+    def builder_key(self, func, kwargs: dict) -> str:
+        """Ключ пары (построитель, аргументы). Считается до сборки и передается в store:
+        после перезагрузки модулей во время сборки код в модуле уже другой."""
+        return _digest({
+            "builder": _builder_id(func),
+            "code": code_digest(func),
+            "kwargs": kwargs,
+            "build123d": getattr(build123d, "__version__", ""),
+        })
+
+    def _entry_key(self, builder_key: str, params: dict, reads) -> str:
+        subset = {k: params.get(k, _MISSING) for k in sorted(reads)}
+        return _digest({"builder": builder_key, "params": subset})
+
+    def _index_path(self, builder_key: str) -> str:
+        return os.path.join(self.cache_dir, "index", f"{builder_key}.json")
+
+    def _entry_paths(self, key: str) -> tuple[str, str]:
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.brep", f"{base}.json"
+
+    def _read_index(self, builder_key: str) -> list:
+        try:
+            with open(self._index_path(builder_key), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def reads(self, func, kwargs: dict, builder_key: str = None) -> set:
+        """Известные ключи params, от которых зависит построитель."""
+        return set(self._read_index(builder_key or self.builder_key(func, kwargs)) or [])
+
+    def load(self, func, params: dict, kwargs: dict, builder_key: str = None):
+        """Возвращает (деталь, предупреждения построителя) из кэша или None.
+
+        Предупреждения (BuildWarning) сохраняются вместе с деталью: без них
+        деталь с неудавшимся скруглением из кэша выглядела бы исправной.
+        """
+        builder_key = builder_key or self.builder_key(func, kwargs)
+        reads = self._read_index(builder_key)
+        if reads is not None:
+            brep_path, meta_path = self._entry_paths(self._entry_key(builder_key, params, reads))
+            try:
+                with open(meta_path, "r") as f:
+                    meta = json.load(f)
+                with open(brep_path, "rb") as f:
+                    part = part_from_brep(f.read(), meta["joints"])
+                # Отмечаем использование для LRU
+                os.utime(brep_path)
+                os.utime(meta_path)
+                self.hits += 1
+                return part, meta.get("warnings", [])
+            except (OSError, ValueError, KeyError):
+                pass
+        self.misses += 1
+        return None
+
+    def store(self, func, params: dict, kwargs: dict, reads, part, messages=(), builder_key: str = None):
+        """Сохраняет построенную деталь. reads - ключи params, прочитанные построителем,
+        messages - тексты предупреждений BuildWarning при ее построении, builder_key -
+        ключ, посчитанный до сборки (см. builder_key)."""
+        try:
+            data, joints = part_to_brep(part)
+        except TypeError as e:
+            print(f"Cache: skip {_builder_id(func)}: {e}")
+            return
+
+        builder_key = builder_key or self.builder_key(func, kwargs)
+        # Объединяем с уже известными зависимостями: набор прочитанных ключей
+        # может зависеть от значений параметров (ветвления в построителе)
+        known = self._read_index(builder_key) or []
+        all_reads = sorted(set(known) | set(reads))
+        key = self._entry_key(builder_key, params, all_reads)
+        brep_path, meta_path = self._entry_paths(key)
+
+        meta = {"builder": _builder_id(func), "kwargs": kwargs, "reads": sorted(reads), "joints": joints,
+                "warnings": list(messages)}
+        self._write_atomic(brep_path, data)
+        self._write_atomic(meta_path, json.dumps(meta, indent=1, default=repr).encode("utf-8"))
+        self._write_atomic(self._index_path(builder_key), json.dumps(all_reads).encode("utf-8"))
+        self._evict()
+
+    def _write_atomic(self, path: str, data: bytes):
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _entries(self) -> list:
+        """Список (время использования, размер, ключ) для всех записей."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".brep"):
+                continue
+            key = name[:-len(".brep")]
+            size = 0
+            for path in self._entry_paths(key):
+                try:
+                    size += os.path.getsize(path)
+                except OSError:
+                    pass
+            mtime = os.path.getmtime(os.path.join(self.cache_dir, name))
+            entries.append((mtime, size, key))
+        return entries
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        while entries and total > self.max_bytes:
+            _, size, key = entries.pop(0)
+            for path in self._entry_paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        for _, _, key in self._entries():
+            for path in self._entry_paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
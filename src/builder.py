@@ -0,0 +1,276 @@
+import contextvars
+import copy
+import importlib
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+from src import profiling
+from src.build_cache import BuildCache, TrackedParams, code_digest, part_to_brep, part_from_brep
+
+_MISSING = object()
+
+# PartBuilder, выполняющий текущий построитель (для вложенных build_part)
+_current_builder = contextvars.ContextVar("current_builder", default=None)
+# PartBuilder процесса-воркера: вложенные детали переиспользуются между задачами
+_worker_builder = None
+
+
+class BuildWarning(UserWarning):
+    """Нефатальная ошибка построения (например, не удалось скругление).
+
+    Построители сообщают о таких ошибках через warnings.warn(..., BuildWarning),
+    чтобы деталь все равно строилась, но проблема не терялась молча.
+    """
+
+
+def _warn(messages):
+    for message in messages:
+        warnings.warn(message, BuildWarning)
+
+
+def _memo_key(func, kwargs: dict) -> tuple:
+    return (f"{func.__module__}.{func.__qualname__}",
+            tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+
+
+def _stage_name(func, kwargs: dict) -> str:
+    args = ", ".join(f"{k}={v!r}" for k, v in kwargs.items())
+    return f"{func.__name__}({args})"
+
+
+def build_part(func, params: dict, **kwargs):
+    """Строит вложенную деталь (например, общую заготовку) внутри построителя.
+
+    Если построитель запущен через PartBuilder, вложенная деталь берется из его
+    кэшей в памяти и на диске, а ее зависимости от params добавляются к
+    зависимостям внешней детали. Иначе func просто вызывается.
+    """
+    builder = _current_builder.get()
+    if builder is None:
+        return func(params, **kwargs)
+    return builder.build(func, params, **kwargs)
+
+
+def _build_messages(caught) -> list:
+    """Тексты BuildWarning из записанных предупреждений; остальные выдаются заново."""
+    messages = []
+    for w in caught:
+        if issubclass(w.category, BuildWarning):
+            messages.append(str(w.message))
+        else:
+            warnings.warn_explicit(w.message, w.category, w.filename, w.lineno)
+    return messages
+
+
+def _run_job(module_name: str, func_name: str, params: dict, kwargs: dict, profile: bool = False,
+             cache_args: tuple = None, code: str = None):
+    """Выполняется в процессе-воркере: строит деталь и возвращает ее в виде BREP.
+
+    code - code_digest построителя в вызывающем процессе; в ответе флаг, что
+    воркер выполнил тот же код (модуль на диске мог измениться после импорта).
+    """
+    global _worker_builder
+    func = getattr(importlib.import_module(module_name), func_name)
+    if _worker_builder is None:
+        _worker_builder = PartBuilder(cache=BuildCache(*cache_args) if cache_args else None)
+    _worker_builder.begin()
+    profiler = profiling.enable() if profile else None
+    if profiler is None:
+        profiling.disable()
+    else:
+        profiler.clear()
+
+    tracked = TrackedParams(params)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", BuildWarning)
+        with profiling.stage(_stage_name(func, kwargs), source="built") as info:
+            token = _current_builder.set(_worker_builder)
+            try:
+                part = func(tracked, **kwargs)
+            finally:
+                _current_builder.reset(token)
+            if profiler is not None:
+                info.update(profiling.shape_counts(part))
+    data, joints = part_to_brep(part)
+    messages = _build_messages(caught)
+    events = profiler.events if profiler is not None else []
+    same_code = code is None or code_digest(func) == code
+    return data, joints, tracked.accessed, messages, events, same_code
+
+
+class PartBuilder:
+    """Запускает функции-построители деталей вида func(params, **kwargs).
+
+    Каждый вызов получает TrackedParams, поэтому известно, какие ключи params
+    прочитал построитель. Повторный вызов с теми же аргументами возвращает
+    прежний объект детали, если значения этих ключей не изменились.
+    При наличии BuildCache результат дополнительно берется с диска.
+    Предупреждения BuildWarning запоминаются вместе с деталью и выдаются
+    заново при каждом попадании в кэш.
+    В параллельном режиме build_many строит детали в пуле процессов.
+    """
+
+    def __init__(self, cache: BuildCache = None, parallel: bool = False, workers: int = None):
+        self.cache = cache
+        self.parallel = parallel
+        self.workers = workers if workers else os.cpu_count()
+        self._pool = None
+        # (построитель, аргументы) -> (функция, {ключ: значение}, деталь, предупреждения)
+        self._memo = {}
+        # Журнал последней сборки: (построитель, аргументы, источник)
+        self.log = []
+
+    @classmethod
+    def from_config(cls, config: dict):
+        build_cfg = config.get("build", {})
+        return cls(cache=BuildCache.from_config(config),
+                   parallel=build_cfg.get("parallel", False),
+                   workers=build_cfg.get("workers", 0))
+
+    def shutdown(self):
+        """Останавливает пул процессов (например, после перезагрузки модулей)."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            # spawn вместо fork: родительский процесс держит Qt/VTK и потоки OCCT
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def begin(self):
+        """Начинает новую сборку (очищает журнал)."""
+        self.log = []
+
+    def forget(self, module_names):
+        """Удаляет из памяти детали построителей перезагруженных модулей.
+
+        Новые функции модуля все равно не совпали бы с запомненными, а старые
+        детали только занимают память. Записи на диске не трогаются: их ключ
+        включает код построителя, поэтому измененный модуль получает новые ключи.
+        """
+        prefixes = tuple(f"{name}." for name in module_names)
+        self._memo = {key: entry for key, entry in self._memo.items() if not key[0].startswith(prefixes)}
+
+    def dependencies(self, func, **kwargs):
+        """Ключи params, прочитанные построителем при последнем вызове."""
+        entry = self._memo.get(_memo_key(func, kwargs))
+        return set(entry[1]) if entry else set()
+
+    def summary(self) -> str:
+        counts = {}
+        for _, _, source in self.log:
+            counts[source] = counts.get(source, 0) + 1
+        return ", ".join(f"{k}: {v}" for k, v in sorted(counts.items()))
+
+    def _lookup(self, func, params: dict, kwargs: dict, builder_key: str = None):
+        """Ищет готовую деталь в памяти, затем на диске. Возвращает деталь или None.
+
+        При попадании заново выдаются предупреждения, сохраненные с деталью.
+        """
+        memo_key = _memo_key(func, kwargs)
+        entry = self._memo.get(memo_key)
+        if entry is not None:
+            memo_func, deps, part, messages = entry
+            if memo_func is func and all(params.get(k, _MISSING) == v for k, v in deps.items()):
+                self.log.append((memo_key[0], kwargs, "memory"))
+                _warn(messages)
+                return part
+
+        if self.cache is not None:
+            found = self.cache.load(func, params, kwargs, builder_key)
+            if found is not None:
+                part, messages = found
+                self._remember(func, params, kwargs, self.cache.reads(func, kwargs, builder_key), part, "disk", messages)
+                _warn(messages)
+                return part
+        return None
+
+    def _remember(self, func, params: dict, kwargs: dict, reads, part, source: str, messages=()):
+        memo_key = _memo_key(func, kwargs)
+        deps = {k: copy.deepcopy(params[k]) if k in params else _MISSING for k in reads}
+        self._memo[memo_key] = (func, deps, part, list(messages))
+        self.log.append((memo_key[0], kwargs, source))
+
+    def build(self, func, params: dict, **kwargs):
+        with profiling.stage(_stage_name(func, kwargs)) as info:
+            # Ключ кэша - по коду, который сейчас будет выполнен (до сборки)
+            builder_key = self.cache.builder_key(func, kwargs) if self.cache is not None else None
+            part = self._lookup(func, params, kwargs, builder_key)
+            if part is None:
+                outer = params if isinstance(params, TrackedParams) else None
+                tracked = TrackedParams(outer.untracked() if outer is not None else params)
+                # Предупреждения вложенных деталей (в том числе из кэша) попадают
+                # и в предупреждения внешней: при ее загрузке из кэша они не теряются
+                with warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter("always", BuildWarning)
+                    token = _current_builder.set(self)
+                    try:
+                        part = func(tracked, **kwargs)
+                    finally:
+                        _current_builder.reset(token)
+                messages = _build_messages(caught)
+                _warn(messages)
+                if outer is not None:
+                    # Вложенная деталь: ее зависимости - и зависимости внешней
+                    outer.accessed.update(tracked.accessed)
+                if self.cache is not None:
+                    self.cache.store(func, params, kwargs, tracked.accessed, part, messages, builder_key)
+                self._remember(func, params, kwargs, tracked.accessed, part, "built", messages)
+            info["source"] = self.log[-1][2]
+            if profiling.active() is not None:
+                info.update(profiling.shape_counts(part))
+        return part
+
+    def build_many(self, params: dict, jobs: dict) -> dict:
+        """Строит набор деталей. jobs: {имя: (func, kwargs)} -> {имя: деталь}.
+
+        В параллельном режиме детали, которых нет в кэшах, строятся в пуле
+        процессов и возвращаются в виде BREP вместе с джойнтами.
+        """
+        if not self.parallel:
+            return {name: self.build(func, params, **kwargs) for name, (func, kwargs) in jobs.items()}
+
+        results, pending, keys = {}, {}, {}
+        for name, (func, kwargs) in jobs.items():
+            # Поиск в кэшах - отдельный этап: промахи затем строятся в воркерах
+            with profiling.stage("PartBuilder.lookup", part=_stage_name(func, kwargs)) as info:
+                keys[name] = self.cache.builder_key(func, kwargs) if self.cache is not None else None
+                part = self._lookup(func, params, kwargs, keys[name])
+                info["source"] = self.log[-1][2] if part is not None else "miss"
+            if part is not None:
+                results[name] = part
+            else:
+                pending[name] = (func, kwargs)
+
+        if pending:
+            pool = self._get_pool()
+            profiler = profiling.active()
+            # Воркеры читают тот же кэш на диске: общие заготовки вложенных
+            # деталей не строятся заново в каждом процессе
+            cache_args = (self.cache.cache_dir, self.cache.max_bytes) if self.cache is not None else None
+            futures = {name: pool.submit(_run_job, func.__module__, func.__qualname__, dict(params), kwargs,
+                                         profiler is not None, cache_args,
+                                         code_digest(func) if self.cache is not None else None)
+                       for name, (func, kwargs) in pending.items()}
+            for name, future in futures.items():
+                func, kwargs = pending[name]
+                data, joints, reads, messages, events, same_code = future.result()
+                # Предупреждения и этапы профилирования из процесса-воркера
+                # передаем вызывающему коду
+                _warn(messages)
+                if profiler is not None:
+                    profiler.merge(events)
+                part = part_from_brep(data, joints)
+                # Воркер импортировал модуль с диска: если там уже другой код,
+                # деталь не сохраняется под ключом кода этого процесса
+                if self.cache is not None and same_code:
+                    self.cache.store(func, params, kwargs, reads, part, messages, keys[name])
+                self._remember(func, params, kwargs, reads, part, "built", messages)
+                results[name] = part
+
+        return {name: results[name] for name in jobs}
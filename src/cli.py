@@ -0,0 +1,278 @@
+"""Консольный запуск сборки и экспорта без Qt/VTK.
+
+Примеры:
+    python -m src.cli build
+    python -m src.cli export --parts "Left Top" spring_slider --formats stl
+    python -m src.cli export --min-wall 1.2
+    python -m src.cli check --max-clearance 5
+    python -m src.cli plates --bed 256 256 --spacing 3
+    python -m src.cli sweep --grid tablet_t=15,17 wall=6,8 --json sweep.json
+    python -m src.cli signatures [--save]
+"""
+import time
+
+_T0 = time.perf_counter()
+
+import argparse
+import json
+import os
+import sys
+
+
+class StageTimer:
+    """Замер длительности этапов запуска (печатается в конце)."""
+
+    def __init__(self, start: float):
+        self.start = start
+        self.last = start
+        self.stages = []
+
+    def mark(self, name: str):
+        now = time.perf_counter()
+        self.stages.append((name, now - self.last))
+        self.last = now
+
+    def report(self):
+        print("\nTimings:")
+        for name, seconds in self.stages:
+            print(f"  {name:<28}{seconds * 1e3:>10.1f} ms")
+        print(f"  {'total':<28}{(self.last - self.start) * 1e3:>10.1f} ms")
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Headless build/export")
+    parser.add_argument("--project", default="tablet_holder", help="папка проекта в projects/")
+    parser.add_argument("--no-cache", action="store_true", help="не использовать кэш деталей на диске")
+    parser.add_argument("--parallel", action=argparse.BooleanOptionalAction, default=None,
+                        help="строить детали в пуле процессов (по умолчанию build.parallel из config.json)")
+    parser.add_argument("--profile", metavar="TRACE", help="замерить этапы построения и записать трассу (Chrome Trace JSON)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("build", help="собрать проект и вывести сводку по деталям")
+
+    export = sub.add_parser("export", help="собрать и экспортировать детали")
+    export.add_argument("--parts", nargs="*", help="метки или имена файлов деталей (по умолчанию все)")
+    export.add_argument("--formats", nargs="+", default=["stl", "brep"], choices=["stl", "brep", "3mf"])
+    export.add_argument("--workers", type=int, default=None, help="число потоков записи")
+    export.add_argument("--out", default="out", help="папка для результатов")
+    export.add_argument("--no-validate", action="store_true", help="не проверять меши деталей на дефекты")
+    export.add_argument("--min-wall", type=float, help="минимальная толщина стенки, мм (по умолчанию validate.min_wall)")
+
+    check = sub.add_parser("check", help="собрать и проверить пересечения и зазоры между деталями")
+    check.add_argument("--tolerance", type=float, default=0.1, help="точность тесселяции, мм")
+    check.add_argument("--max-clearance", type=float, default=10.0, help="зазоры больше этого не измеряются, мм")
+    check.add_argument("--json", metavar="FILE", help="записать отчет в JSON")
+
+    plates = sub.add_parser("plates", help="разложить детали на столы принтера и записать 3MF столов")
+    plates.add_argument("--parts", nargs="*", help="метки или имена файлов деталей (по умолчанию все)")
+    plates.add_argument("--bed", type=float, nargs=2, metavar=("X", "Y"), help="размер стола, мм (по умолчанию print.bed)")
+    plates.add_argument("--spacing", type=float, help="зазор между деталями и от края стола, мм")
+    plates.add_argument("--resolution", type=float, help="шаг растра отпечатков, мм")
+    plates.add_argument("--out", default="out/plates", help="папка для 3MF столов")
+
+    sweep = sub.add_parser("sweep", help="собрать варианты проекта с разными параметрами")
+    source = sweep.add_mutually_exclusive_group(required=True)
+    source.add_argument("--grid", nargs="+", metavar="KEY=V1,V2", help="сетка значений параметров")
+    source.add_argument("--variants", metavar="FILE", help="JSON со списком переопределений или {\"grid\": {...}}")
+    sweep.add_argument("--workers", type=int, default=None, help="число процессов (1 - последовательно)")
+    sweep.add_argument("--json", metavar="FILE", help="записать отчет в JSON")
+    sweep.add_argument("--cache", action="store_true", help="брать детали из кэша на диске (по умолчанию все строятся заново)")
+
+    signatures = sub.add_parser("signatures", help="сравнить геометрию деталей с эталонными сигнатурами")
+    signatures.add_argument("--save", action="store_true", help="записать текущие сигнатуры как эталон")
+    signatures.add_argument("--file", help="файл сигнатур (по умолчанию projects/<проект>/signatures.json)")
+    signatures.add_argument("--workers", type=int, default=1, help="число процессов сборки (1 - последовательно, 0 - по числу ядер)")
+    signatures.add_argument("--rtol", type=float, default=1e-4, help="относительный допуск объема и площади")
+    signatures.add_argument("--atol", type=float, default=1e-3, help="допуск габаритов и джойнтов, мм")
+    return parser.parse_args(argv)
+
+
+def _parse_value(text: str):
+    """Значение параметра из командной строки: JSON-литерал или строка."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _parse_grid(items) -> dict:
+    grid = {}
+    for item in items:
+        key, sep, values = item.partition("=")
+        if not sep or not key:
+            raise SystemExit(f"Bad grid item '{item}', expected KEY=V1,V2")
+        grid[key] = [_parse_value(v) for v in values.split(",")]
+    return grid
+
+
+def _sweep(args, timer) -> int:
+    from src.sweep import expand_grid, load_variants, run_sweep, format_table
+    timer.mark("import framework")
+
+    variants = expand_grid(_parse_grid(args.grid)) if args.grid else load_variants(args.variants)
+    print(f"Sweep: {len(variants)} variants of '{args.project}'")
+
+    def on_result(report):
+        status = "ok" if report["ok"] else f"FAILED ({report['error']})"
+        print(f"  {json.dumps(report['overrides'])}: {status}")
+
+    reports = run_sweep(args.project, variants, workers=args.workers,
+                        use_cache=args.cache and not args.no_cache, on_result=on_result)
+    timer.mark("sweep")
+
+    print()
+    print(format_table(reports))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=1)
+        print(f"\nReport: {args.json}")
+    failed = sum(1 for r in reports if not r["ok"])
+    print(f"\nSweep: {len(reports) - failed} ok, {failed} failed")
+    timer.report()
+    return 1 if failed else 0
+
+
+def _signatures(args, timer) -> int:
+    from src.signatures import (collect_signatures, compare_signatures, format_deviations,
+                                load_signatures, save_signatures, signature_path)
+    timer.mark("import framework")
+
+    path = args.file or signature_path(args.project)
+    actual = collect_signatures(args.project, workers=args.workers or None)
+    timer.mark("build + signatures")
+    print(f"Built {len(actual['parts'])} parts in {actual['build_seconds']:.2f} s")
+
+    if args.save:
+        save_signatures(actual, path)
+        print(f"Signatures: {path}")
+        timer.report()
+        return 0
+    if not os.path.exists(path):
+        print(f"No signatures at {path}, run with --save first")
+        return 1
+    deviations = compare_signatures(load_signatures(path), actual, args.rtol, args.atol)
+    timer.mark("compare")
+    if deviations:
+        print(format_deviations(deviations))
+        print(f"\nSignatures: {len(deviations)} deviations in "
+              f"{len({d['part'] for d in deviations})} parts (rtol={args.rtol:g}, atol={args.atol:g} mm)")
+    else:
+        print(f"Signatures: {len(actual['parts'])} parts match {path}")
+    timer.report()
+    return 1 if deviations else 0
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    timer = StageTimer(_T0)
+    if args.command == "sweep":
+        return _sweep(args, timer)
+    if args.command == "signatures":
+        return _signatures(args, timer)
+
+    # Тяжелые модули (build123d/OCP) импортируются здесь, чтобы замерить холодный старт
+    from src.project import load_config, load_assembly_class, load_project_params
+    from src.builder import PartBuilder
+    from src.export import ExportPipeline, select_parts
+    from src import profiling
+    timer.mark("import framework")
+    profiler = profiling.enable() if args.profile else None
+
+    assembly_class = load_assembly_class(args.project)
+    timer.mark(f"import project '{args.project}'")
+
+    params = load_project_params(assembly_class)
+    config = load_config()
+    if args.no_cache:
+        config["cache"] = {"enabled": False}
+    if args.parallel is not None:
+        config.setdefault("build", {})["parallel"] = args.parallel
+    builder = PartBuilder.from_config(config)
+    assembly = assembly_class(params, builder=builder)
+    timer.mark("load params")
+
+    parts = assembly.build()
+    if not isinstance(parts, list):
+        parts = [parts]
+    timer.mark("build")
+    print(f"Build: {builder.summary()}")
+
+    exit_code = 0
+    if args.command == "build":
+        for part in parts:
+            bb = part.bounding_box()
+            print(f"  {part.label:<16} volume={part.volume:>12.1f}  size=({bb.size.X:.1f}, {bb.size.Y:.1f}, {bb.size.Z:.1f})")
+
+    elif args.command == "export":
+        selected = select_parts(parts, args.parts)
+        if not selected:
+            print(f"No parts match: {args.parts}")
+            return 1
+
+        def on_export(name, fmt, path, status, seconds):
+            print(f"  {status:<10} {path} ({seconds * 1e3:.1f} ms)")
+
+        validate_cfg = load_config().get("validate", {})
+        validate = validate_cfg.get("enabled", True) and not args.no_validate
+        min_wall = args.min_wall if args.min_wall is not None else validate_cfg.get("min_wall", 0.8)
+        pipeline = ExportPipeline(args.out, args.formats, args.workers, validate=validate, min_wall=min_wall)
+        results = pipeline.run(selected, on_export)
+        written = sum(1 for r in results if r[3] == "written")
+        print(f"Export: {written} written, {len(results) - written} unchanged")
+        timer.mark("export")
+        if validate:
+            from src.validation import format_report
+            reports = list(pipeline.reports.values())
+            print(format_report(reports, min_wall))
+            bad = [r["name"] for r in reports if not r["ok"]]
+            if bad:
+                print(f"Mesh defects: {', '.join(bad)}")
+                exit_code = 1
+
+    elif args.command == "check":
+        from src.interference import check_assembly, format_report
+        results = check_assembly(parts, args.tolerance, args.max_clearance)
+        timer.mark("check")
+        print(format_report(results))
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump([{k: v for k, v in r.items() if k != "triangles"} for r in results], f, indent=1)
+        collisions = [r for r in results if r["status"] == "interference"]
+        if collisions:
+            print(f"Interference: {', '.join(r['a'] + ' / ' + r['b'] for r in collisions)}")
+            exit_code = 1
+
+    elif args.command == "plates":
+        from src.export import local_mesh, safe_label
+        from src.packing import pack, write_plates, format_plates
+        selected = select_parts(parts, args.parts)
+        print_cfg = load_config().get("print", {})
+        bed = args.bed or print_cfg.get("bed", [256, 256])
+        spacing = args.spacing if args.spacing is not None else print_cfg.get("spacing", 3.0)
+        resolution = args.resolution or print_cfg.get("resolution", 1.0)
+        meshes = [(getattr(part, "label", "") or safe_label(part, i), *local_mesh(part))
+                  for i, part in enumerate(selected)]
+        timer.mark("tessellate")
+        plates_list, unplaced = pack(meshes, bed, spacing, resolution)
+        timer.mark("pack")
+        paths = write_plates(plates_list, args.out)
+        timer.mark("write 3mf")
+        print(format_plates(plates_list, bed))
+        for path in paths:
+            print(f"  written    {path}")
+        print(f"Plates: {len(selected) - len(unplaced)} parts on {len(plates_list)} plates ({bed[0]:g} x {bed[1]:g} mm)")
+        if unplaced:
+            print(f"Too large for the bed: {', '.join(unplaced)}")
+            exit_code = 1
+
+    builder.shutdown()
+    if profiler is not None:
+        profiler.write_trace(args.profile)
+        print(f"\nProfile ({args.profile}):")
+        print(profiler.format_summary())
+    timer.report()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
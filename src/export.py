@@ -0,0 +1,263 @@
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from build123d import Location, export_brep, Mesher
+from src.mesh_cache import MeshCache, geometry_fingerprint
+from src.mesh_writer import transform_points, write_stl, write_3mf
+from src.tessellation import tessellate, location_matrix
+
+MANIFEST_FILE = "manifest.json"
+
+# Меши для экспорта по отпечатку геометрии: повторный экспорт (кнопка в окне)
+# не тесселирует неизмененные детали заново
+MESH_CACHE = MeshCache(256 * 1024 * 1024)
+
+
+def export_3mf(part, path: str):
+    """Экспорт детали в 3MF через build123d Mesher (lib3mf)."""
+    mesher = Mesher()
+    mesher.add_shape(part)
+    mesher.write(path)
+
+
+def canonical_mesh(points: np.ndarray, triangles: np.ndarray, decimals: int = 6):
+    """Треугольники в порядке, зависящем только от геометрии.
+
+    Деталь из кэша на диске (BREP) дает те же вершины, что и свежая сборка,
+    но грани идут в другом порядке: без сортировки байты STL/3MF менялись бы
+    при каждом переключении между кэшем и сборкой. Каждый треугольник
+    начинается с наименьшей вершины (обход сохраняется), треугольники
+    сортируются по вершинам. Если же OCCT триангулировал грань по-другому
+    (другие диагонали), байты все равно различаются - такие файлы отсекает
+    ключ геометрии в манифесте (см. ExportPipeline).
+    """
+    if not len(triangles):
+        return points, triangles
+    # Ранг вершины - номер ее координат среди уникальных (не зависит от порядка узлов)
+    _, rank = np.unique(np.round(points, decimals), axis=0, return_inverse=True)
+    ranks = rank.reshape(-1)[triangles]
+    shift = (np.argmin(ranks, axis=1)[:, None] + np.arange(3)) % 3
+    triangles = np.take_along_axis(triangles, shift, axis=1)
+    ranks = np.take_along_axis(ranks, shift, axis=1)
+    return points, triangles[np.lexsort(ranks.T[::-1])]
+
+
+def local_mesh(part, tolerance: float = 1e-3, angular_tolerance: float = 0.1, mesh_cache: MeshCache = None):
+    """Меш детали в ее локальных координатах: (points, triangles) из кэша или одной тесселяции.
+
+    Треугольники - в каноническом порядке (см. canonical_mesh).
+
+    Тесселяция своя, а не из кэша окна: уровни детализации окна (render.lod,
+    0.5 и 0.05 мм) грубее допуска печати по умолчанию 1e-3 мм.
+    """
+    mesh_cache = mesh_cache if mesh_cache is not None else MESH_CACHE
+    key = (geometry_fingerprint(part), tolerance, angular_tolerance, "export")
+    mesh = mesh_cache.get(key)
+    if mesh is None:
+        # Тесселируется копия в нуле: триангуляция детали на экране не трогается
+        mesh = canonical_mesh(*tessellate(part.located(Location()), tolerance, angular_tolerance))
+        mesh_cache.put(key, mesh, mesh[0].nbytes + mesh[1].nbytes)
+    return mesh
+
+
+def _export_stl(mesh, path: str):
+    write_stl(path, *mesh)
+
+
+def _export_3mf(mesh, path: str):
+    write_3mf(path, *mesh)
+
+
+# Формат -> (подпапка в out/, расширение, функция экспорта)
+EXPORTERS = {
+    "stl": ("stl", "stl", _export_stl),
+    "brep": ("brep", "brep", export_brep),
+    "3mf": ("print", "3mf", _export_3mf),
+}
+# Форматы, которые пишутся из NumPy-буферов одной тесселяции детали (points, triangles)
+MESH_FORMATS = {"stl", "3mf"}
+
+# lib3mf пишет случайные UUID объектов: для сравнения содержимого их убираем
+_UUID_ATTR = re.compile(rb'\s[\w:]*UUID="[^"]*"')
+
+
+def content_hash(path: str) -> str:
+    """SHA-256 содержимого файла; для 3MF - по распакованным частям без UUID."""
+    digest = hashlib.sha256()
+    if path.endswith(".3mf"):
+        with zipfile.ZipFile(path) as zf:
+            for name in sorted(zf.namelist()):
+                digest.update(name.encode("utf-8"))
+                digest.update(_UUID_ATTR.sub(b"", zf.read(name)))
+    else:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def safe_label(part, index: int = 0) -> str:
+    """Имя файла для детали по ее метке."""
+    label = getattr(part, "label", "") or f"part_{index}"
+    return "".join([c if c.isalnum() else "_" for c in label.lower()])
+
+
+def select_parts(parts, names=None):
+    """Оставляет детали, чьи метки (или имена файлов) есть в names."""
+    if not names:
+        return list(parts)
+    wanted = {n.lower() for n in names}
+    return [p for i, p in enumerate(parts)
+            if getattr(p, "label", "").lower() in wanted or safe_label(p, i) in wanted]
+
+
+class ExportPipeline:
+    """Экспорт деталей с параллельной записью, атомарной заменой файлов и манифестом.
+
+    Каждый файл сначала пишется во временный файл рядом с целевым. Если хэш
+    содержимого совпадает с записанным в out_dir/manifest.json и файл на месте,
+    временный файл удаляется и целевой не трогается; иначе он атомарно
+    заменяется (os.replace). Так синхронизация со слайсером/принтером видит
+    только реально изменившиеся файлы.
+
+    Кроме хэша манифест хранит ключ геометрии (отпечаток формы, положение и
+    настройки экспорта). Если ключ совпал и файл на месте, он не пишется
+    вовсе: одна и та же деталь из кэша на диске и из свежей сборки может
+    триангулироваться по-разному, но это не изменение для слайсера.
+    """
+
+    def __init__(self, out_dir: str = "out", formats=("stl", "brep"), workers: int = None,
+                 tolerance: float = 1e-3, angular_tolerance: float = 0.1, mesh_cache: MeshCache = None,
+                 validate: bool = False, min_wall: float = 0.8):
+        for fmt in formats:
+            if fmt not in EXPORTERS:
+                raise ValueError(f"Unknown export format: {fmt}")
+        self.out_dir = out_dir
+        self.formats = tuple(formats)
+        self.workers = workers if workers else min(8, os.cpu_count() or 1)
+        self.tolerance = tolerance
+        self.angular_tolerance = angular_tolerance
+        self.mesh_cache = mesh_cache if mesh_cache is not None else MESH_CACHE
+        # Проверка меша каждой детали (src.validation): отчеты по имени файла детали
+        self.validate = validate
+        self.min_wall = min_wall
+        self.reports = {}
+        self.manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+        self.manifest = self._load_manifest()
+        self._lock = threading.Lock()
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _mesh(self, part):
+        """Меш детали в мировых координатах: (points, triangles) из кэша или одной тесселяции."""
+        points, triangles = local_mesh(part, self.tolerance, self.angular_tolerance, self.mesh_cache)
+        return transform_points(points, location_matrix(part.location)), triangles
+
+    def _validate(self, part, name: str):
+        """Проверяет экспортный меш детали; отчет кэшируется вместе с мешем по отпечатку геометрии."""
+        from src.validation import validate_mesh
+
+        key = (geometry_fingerprint(part), self.tolerance, self.angular_tolerance, "validation", self.min_wall)
+        report = self.mesh_cache.get(key)
+        if report is None:
+            report = validate_mesh(*local_mesh(part, self.tolerance, self.angular_tolerance, self.mesh_cache),
+                                   self.min_wall)
+            self.mesh_cache.put(key, report, sum(a.nbytes for a in report["defects"].values()))
+        with self._lock:
+            self.reports[name] = dict(report, name=getattr(part, "label", "") or name)
+
+    def _source_key(self, part, fingerprint: str, fmt: str) -> str:
+        """Ключ геометрии файла: отпечаток формы, положение и настройки экспорта."""
+        payload = {"geometry": fingerprint, "format": fmt,
+                   # + 0.0 превращает -0.0 в 0.0: иначе JSON различает одинаковые положения
+                   "location": (np.round(location_matrix(part.location), 9) + 0.0).tolist()}
+        if fmt in MESH_FORMATS:
+            payload["tolerance"] = [self.tolerance, self.angular_tolerance]
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _export_file(self, part, name: str, fmt: str, fingerprint: str):
+        sub_dir, ext, exporter = EXPORTERS[fmt]
+        path = os.path.join(self.out_dir, sub_dir, f"{name}.{ext}")
+        rel_path = os.path.relpath(path, self.out_dir).replace(os.sep, "/")
+        tmp_path = os.path.join(self.out_dir, sub_dir, f"{name}.tmp{os.getpid()}_{threading.get_ident()}.{ext}")
+
+        t0 = time.perf_counter()
+        source = self._source_key(part, fingerprint, fmt)
+        with self._lock:
+            known = dict(self.manifest.get(rel_path, {}))
+        if known.get("source") == source and os.path.exists(path) and content_hash(path) == known.get("sha256"):
+            return name, fmt, path, "unchanged", time.perf_counter() - t0
+        try:
+            exporter(self._mesh(part) if fmt in MESH_FORMATS else part, tmp_path)
+            digest = content_hash(tmp_path)
+            if known.get("sha256") == digest and os.path.exists(path):
+                os.remove(tmp_path)
+                status = "unchanged"
+            else:
+                os.replace(tmp_path, path)
+                status = "written"
+            with self._lock:
+                self.manifest[rel_path] = {"sha256": digest, "bytes": os.path.getsize(path), "source": source}
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return name, fmt, path, status, time.perf_counter() - t0
+
+    def _export_part(self, part, name: str):
+        fingerprint = geometry_fingerprint(part)
+        # Копия без триангуляции: вывод не зависит от того, какой меш
+        # построил вьюер, и экспорт не трогает детали, показанные на экране
+        part = copy.deepcopy(part)
+        if self.validate:
+            self._validate(part, name)
+        return [self._export_file(part, name, fmt, fingerprint) for fmt in self.formats]
+
+    def run(self, parts, on_export=None) -> list:
+        """Экспортирует детали. Возвращает [(деталь, формат, путь, статус, секунды)].
+
+        on_export(name, fmt, path, status, seconds) вызывается по готовности каждого файла.
+        С validate=True отчеты проверки мешей после запуска лежат в self.reports.
+        """
+        for fmt in self.formats:
+            os.makedirs(os.path.join(self.out_dir, EXPORTERS[fmt][0]), exist_ok=True)
+
+        results = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # Одна задача на деталь: форматы одной детали пишутся последовательно,
+            # разные детали - параллельно
+            futures = [pool.submit(self._export_part, part, safe_label(part, i))
+                       for i, part in enumerate(parts)]
+            for future in futures:
+                for result in future.result():
+                    results.append(result)
+                    if on_export:
+                        on_export(*result)
+        # Отчеты проверки - в порядке деталей, а не завершения потоков
+        names = [safe_label(part, i) for i, part in enumerate(parts)]
+        self.reports = {name: self.reports[name] for name in names if name in self.reports}
+        self._save_manifest()
+        return results
+
+
+def export_parts(parts, out_dir: str = "out", formats=("stl", "brep"), on_export=None, workers: int = None) -> list:
+    """Экспортирует детали в out_dir/<подпапка>/<деталь>.<расширение> (см. ExportPipeline)."""
+    return ExportPipeline(out_dir, formats, workers).run(parts, on_export)
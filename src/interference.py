@@ -0,0 +1,342 @@
+import copy
+import itertools
+
+import numpy as np
+from build123d import Location
+
+from src.tessellation import tessellate, location_matrix
+
+
+def _dot(a, b):
+    return np.einsum("ij,ij->i", a, b)
+
+
+def _safe_div(n, d):
+    return n / np.where(d == 0, 1.0, d)
+
+
+def _box_distance(amin, amax, bmin, bmax):
+    """Расстояние между парами AABB (0, если пересекаются)."""
+    gap = np.maximum(0.0, np.maximum(amin - bmax, bmin - amax))
+    return np.sqrt((gap * gap).sum(axis=-1))
+
+
+class MeshBVH:
+    """Иерархия ограничивающих параллелепипедов (AABB) над треугольниками меша.
+
+    Узлы хранятся в массивах: границы, дети (-1 у листа), число треугольников.
+    Листья содержат не более leaf_size треугольников; их индексы лежат в
+    leaf_tris (дополнены -1).
+    """
+
+    def __init__(self, points: np.ndarray, triangles: np.ndarray, leaf_size: int = 8):
+        self.tris = points[triangles] # (M, 3, 3) - координаты вершин
+        self.leaf_size = leaf_size
+        self.tri_min = self.tris.min(axis=1)
+        self.tri_max = self.tris.max(axis=1)
+        self._build()
+
+    def __len__(self):
+        return len(self.tris)
+
+    def _build(self):
+        n = len(self.tris)
+        centroids = self.tris.mean(axis=1)
+        order = np.arange(n)
+        starts, ends, left, right = [0], [n], [-1], [-1]
+        stack = [0] if n else []
+        while stack:
+            node = stack.pop()
+            s, e = starts[node], ends[node]
+            if e - s <= self.leaf_size:
+                continue
+            # Делим по медиане центров вдоль самой длинной оси
+            idx = order[s:e]
+            c = centroids[idx]
+            axis = int(np.argmax(c.max(axis=0) - c.min(axis=0)))
+            mid = (e - s) // 2
+            order[s:e] = idx[np.argpartition(c[:, axis], mid)]
+            for cs, ce in ((s, s + mid), (s + mid, e)):
+                starts.append(cs)
+                ends.append(ce)
+                left.append(-1)
+                right.append(-1)
+            left[node], right[node] = len(starts) - 2, len(starts) - 1
+            stack.extend((left[node], right[node]))
+
+        k = len(starts)
+        self.left = np.array(left, dtype=np.int64)
+        self.right = np.array(right, dtype=np.int64)
+        self.count = np.array(ends, dtype=np.int64) - np.array(starts, dtype=np.int64)
+        self.bmin = np.empty((k, 3))
+        self.bmax = np.empty((k, 3))
+        self.leaf_tris = np.full((k, self.leaf_size), -1, dtype=np.int64)
+        # Дети создаются позже родителей: обратный порядок - снизу вверх
+        for node in range(k - 1, -1, -1):
+            if self.left[node] < 0:
+                idx = order[starts[node]:ends[node]]
+                self.leaf_tris[node, :len(idx)] = idx
+                self.bmin[node] = self.tri_min[idx].min(axis=0) if len(idx) else np.inf
+                self.bmax[node] = self.tri_max[idx].max(axis=0) if len(idx) else -np.inf
+            else:
+                l, r = self.left[node], self.right[node]
+                self.bmin[node] = np.minimum(self.bmin[l], self.bmin[r])
+                self.bmax[node] = np.maximum(self.bmax[l], self.bmax[r])
+        # Вершина любого треугольника узла: расстояние между такими точками
+        # двух узлов - верхняя оценка расстояния между их содержимым
+        self.rep = self.tris[order[starts], 0] if n else np.empty((0, 3))
+
+
+def _closest_on_triangle(p, a, b, c):
+    """Ближайшие к точкам p точки треугольников (a, b, c), все массивы (P, 3)."""
+    ab, ac = b - a, c - a
+    ap, bp, cp = p - a, p - b, p - c
+    d1, d2 = _dot(ab, ap), _dot(ac, ap)
+    d3, d4 = _dot(ab, bp), _dot(ac, bp)
+    d5, d6 = _dot(ab, cp), _dot(ac, cp)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    # Внутренность треугольника, затем ребра и вершины (последнее присваивание важнее)
+    denom = va + vb + vc
+    v, w = _safe_div(vb, denom), _safe_div(vc, denom)
+    result = a + ab * v[:, None] + ac * w[:, None]
+
+    m = (va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0)
+    t = _safe_div(d4 - d3, (d4 - d3) + (d5 - d6))
+    result = np.where(m[:, None], b + (c - b) * t[:, None], result)
+    m = (vb <= 0) & (d2 >= 0) & (d6 <= 0)
+    t = _safe_div(d2, d2 - d6)
+    result = np.where(m[:, None], a + ac * t[:, None], result)
+    m = (d6 >= 0) & (d5 <= d6)
+    result = np.where(m[:, None], c, result)
+    m = (vc <= 0) & (d1 >= 0) & (d3 <= 0)
+    t = _safe_div(d1, d1 - d3)
+    result = np.where(m[:, None], a + ab * t[:, None], result)
+    m = (d3 >= 0) & (d4 <= d3)
+    result = np.where(m[:, None], b, result)
+    m = (d1 <= 0) & (d2 <= 0)
+    result = np.where(m[:, None], a, result)
+    return result
+
+
+def _closest_on_segments(p1, q1, p2, q2):
+    """Ближайшие точки пар отрезков (p1, q1) и (p2, q2), массивы (P, 3)."""
+    d1, d2, r = q1 - p1, q2 - p2, p1 - p2
+    a, e, f = _dot(d1, d1), _dot(d2, d2), _dot(d2, r)
+    c, b = _dot(d1, r), _dot(d1, d2)
+    denom = a * e - b * b
+    s = np.where(denom > 1e-12, np.clip(_safe_div(b * f - c * e, denom), 0.0, 1.0), 0.0)
+    t = _safe_div(b * s + f, e)
+    s = np.where(t < 0, np.clip(_safe_div(-c, a), 0.0, 1.0), s)
+    s = np.where(t > 1, np.clip(_safe_div(b - c, a), 0.0, 1.0), s)
+    t = np.clip(t, 0.0, 1.0)
+    return p1 + d1 * s[:, None], p2 + d2 * t[:, None]
+
+
+def triangle_distances(ta: np.ndarray, tb: np.ndarray):
+    """Расстояния между парами непересекающихся треугольников (P, 3, 3).
+
+    Минимум достигается на паре "вершина-треугольник" или "ребро-ребро".
+    Возвращает (расстояния (P,), ближайшие точки на ta (P, 3), на tb (P, 3)).
+    """
+    best = np.full(len(ta), np.inf)
+    pa, pb = np.zeros((len(ta), 3)), np.zeros((len(ta), 3))
+
+    def update(x, y):
+        d = np.linalg.norm(x - y, axis=1)
+        m = d < best
+        best[m] = d[m]
+        pa[m], pb[m] = x[m], y[m]
+
+    for i in range(3):
+        update(ta[:, i], _closest_on_triangle(ta[:, i], tb[:, 0], tb[:, 1], tb[:, 2]))
+        update(_closest_on_triangle(tb[:, i], ta[:, 0], ta[:, 1], ta[:, 2]), tb[:, i])
+    for i, j in itertools.product(range(3), repeat=2):
+        x, y = _closest_on_segments(ta[:, i], ta[:, (i + 1) % 3], tb[:, j], tb[:, (j + 1) % 3])
+        update(x, y)
+    return best, pa, pb
+
+
+def _plane_distances(tris, other):
+    """Знаковые расстояния вершин tris до плоскостей треугольников other."""
+    n = np.cross(other[:, 1] - other[:, 0], other[:, 2] - other[:, 0])
+    n = n / np.maximum(np.linalg.norm(n, axis=1), 1e-300)[:, None]
+    return np.einsum("pij,pj->pi", tris - other[:, :1], n)
+
+
+def _line_interval(tris, dist, direction, eps):
+    """Отрезок пересечения треугольника с плоскостью другого, как интервал на прямой."""
+    lo = np.full(len(tris), np.inf)
+    hi = np.full(len(tris), -np.inf)
+    for i in range(3):
+        j = (i + 1) % 3
+        di, dj = dist[:, i], dist[:, j]
+        crossing = ((di > eps) & (dj < -eps)) | ((di < -eps) & (dj > eps))
+        point = tris[:, i] + (tris[:, j] - tris[:, i]) * _safe_div(di, di - dj)[:, None]
+        t = _dot(point, direction)
+        lo = np.where(crossing, np.minimum(lo, t), lo)
+        hi = np.where(crossing, np.maximum(hi, t), hi)
+        # Вершина на плоскости тоже лежит на прямой пересечения
+        on_plane = np.abs(di) <= eps
+        t = _dot(tris[:, i], direction)
+        lo = np.where(on_plane, np.minimum(lo, t), lo)
+        hi = np.where(on_plane, np.maximum(hi, t), hi)
+    return lo, hi
+
+
+def triangles_cross(ta: np.ndarray, tb: np.ndarray, eps: float = 1e-4) -> np.ndarray:
+    """Маска пар треугольников, пересекающихся "насквозь" (тест Меллера).
+
+    Касание (копланарные грани, вершина на грани) пересечением не считается:
+    каждый треугольник должен иметь вершины строго по обе стороны плоскости
+    другого, а их отрезки на общей прямой - перекрываться больше чем на eps.
+    """
+    da = _plane_distances(ta, tb)
+    db = _plane_distances(tb, ta)
+    cross = ((da.max(axis=1) > eps) & (da.min(axis=1) < -eps) &
+             (db.max(axis=1) > eps) & (db.min(axis=1) < -eps))
+    if not cross.any():
+        return cross
+    idx = np.flatnonzero(cross)
+    na = np.cross(ta[idx, 1] - ta[idx, 0], ta[idx, 2] - ta[idx, 0])
+    nb = np.cross(tb[idx, 1] - tb[idx, 0], tb[idx, 2] - tb[idx, 0])
+    direction = np.cross(na, nb)
+    direction = direction / np.maximum(np.linalg.norm(direction, axis=1), 1e-300)[:, None]
+    lo_a, hi_a = _line_interval(ta[idx], da[idx], direction, eps)
+    lo_b, hi_b = _line_interval(tb[idx], db[idx], direction, eps)
+    cross[idx] = np.minimum(hi_a, hi_b) - np.maximum(lo_a, lo_b) > eps
+    return cross
+
+
+def _candidate_pairs(a: MeshBVH, b: MeshBVH, max_distance: float, margin: float):
+    """Обход пары BVH "фронтом": все пары узлов уровня обрабатываются массивами.
+
+    Пары, чьи AABB дальше текущей верхней оценки минимального расстояния,
+    отбрасываются. Возвращает пары индексов треугольников и оценку.
+    """
+    bound = max_distance
+    ia, ib = np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64)
+    leaves_a, leaves_b = [], []
+    while len(ia):
+        lower = _box_distance(a.bmin[ia], a.bmax[ia], b.bmin[ib], b.bmax[ib])
+        bound = min(bound, float(np.linalg.norm(a.rep[ia] - b.rep[ib], axis=1).min()))
+        keep = lower <= bound + margin
+        ia, ib = ia[keep], ib[keep]
+
+        a_leaf, b_leaf = a.left[ia] < 0, b.left[ib] < 0
+        done = a_leaf & b_leaf
+        leaves_a.append(ia[done])
+        leaves_b.append(ib[done])
+        ia, ib, a_leaf, b_leaf = ia[~done], ib[~done], a_leaf[~done], b_leaf[~done]
+
+        # Делим узел с большим числом треугольников (лист не делится)
+        split_a = ~a_leaf & (b_leaf | (a.count[ia] >= b.count[ib]))
+        sa, sb = ia[split_a], ib[split_a]
+        oa, ob = ia[~split_a], ib[~split_a]
+        ia = np.concatenate([a.left[sa], a.right[sa], oa, oa])
+        ib = np.concatenate([sb, sb, b.left[ob], b.right[ob]])
+
+    la, lb = np.concatenate(leaves_a), np.concatenate(leaves_b)
+    size = a.leaf_size
+    ta = np.repeat(a.leaf_tris[la], size, axis=1).ravel()
+    tb = np.tile(b.leaf_tris[lb], (1, size)).ravel()
+    valid = (ta >= 0) & (tb >= 0)
+    ta, tb = ta[valid], tb[valid]
+    lower = _box_distance(a.tri_min[ta], a.tri_max[ta], b.tri_min[tb], b.tri_max[tb])
+    keep = lower <= bound + margin
+    return ta[keep], tb[keep], bound
+
+
+def check_pair(a: MeshBVH, b: MeshBVH, max_clearance: float = 10.0, contact_tol: float = 1e-3,
+               chunk: int = 200_000) -> dict:
+    """Проверяет пару мешей: сквозные пересечения и минимальный зазор.
+
+    Возвращает {"status", "distance", "points", "crossings", "triangles"}:
+    status - "interference" (грани пересекаются), "contact" (касание, зазор
+    не больше contact_tol), "clearance" (зазор до max_clearance) или "clear";
+    distance - минимальный зазор (None, если он больше max_clearance);
+    triangles - треугольники (K, 3, 3) обеих деталей в зоне пересечения.
+    """
+    result = {"status": "clear", "distance": None, "points": None, "crossings": 0,
+              "triangles": np.empty((0, 3, 3))}
+    if not len(a) or not len(b):
+        return result
+    ta_idx, tb_idx, _ = _candidate_pairs(a, b, max_clearance, contact_tol)
+
+    best, crossing = np.inf, []
+    for start in range(0, len(ta_idx), chunk):
+        ia, ib = ta_idx[start:start + chunk], tb_idx[start:start + chunk]
+        ta, tb = a.tris[ia], b.tris[ib]
+        overlap = _box_distance(a.tri_min[ia], a.tri_max[ia], b.tri_min[ib], b.tri_max[ib]) == 0
+        cross = np.zeros(len(ia), dtype=bool)
+        if overlap.any():
+            cross[overlap] = triangles_cross(ta[overlap], tb[overlap])
+        if cross.any():
+            crossing.append((ia[cross], ib[cross]))
+        dist, pa, pb = triangle_distances(ta, tb)
+        k = int(np.argmin(dist))
+        if dist[k] < best:
+            best = float(dist[k])
+            result["points"] = (pa[k].tolist(), pb[k].tolist())
+
+    if crossing:
+        ia = np.unique(np.concatenate([c[0] for c in crossing]))
+        ib = np.unique(np.concatenate([c[1] for c in crossing]))
+        result["crossings"] = int(sum(len(c[0]) for c in crossing))
+        result["triangles"] = np.concatenate([a.tris[ia], b.tris[ib]])
+        result["status"] = "interference"
+        result["distance"] = 0.0
+    elif best <= max_clearance:
+        result["distance"] = best
+        result["status"] = "contact" if best <= contact_tol else "clearance"
+    return result
+
+
+def world_mesh(shape, tolerance: float = 0.1):
+    """Тесселяция формы в мировых координатах (points, triangles).
+
+    Тесселируется независимая копия B-rep: исходную деталь в это время может
+    мешировать вьюер, а точность проверки не должна зависеть от его LOD.
+    """
+    local = copy.deepcopy(shape.located(Location()))
+    points, triangles = tessellate(local, tolerance, min(0.5, tolerance * 2))
+    m = location_matrix(shape.location)
+    return points @ m[:3, :3].T + m[:3, 3], triangles
+
+
+def check_assembly(parts, tolerance: float = 0.1, max_clearance: float = 10.0,
+                   contact_tol: float = 1e-3, on_result=None) -> list:
+    """Попарная проверка деталей сборки на пересечения и зазоры.
+
+    Детали тесселируются с точностью tolerance, поэтому зазоры на кривых
+    поверхностях известны с точностью до tolerance. Вложенность одной детали
+    целиком в другую (без пересечения граней) не обнаруживается.
+    Возвращает список словарей check_pair с полями "a", "b" (метки деталей).
+    """
+    labels = [getattr(p, "label", "") or f"part_{i}" for i, p in enumerate(parts)]
+    bvhs = [MeshBVH(*world_mesh(p, tolerance)) for p in parts]
+
+    results = []
+    for i, j in itertools.combinations(range(len(parts)), 2):
+        a, b = bvhs[i], bvhs[j]
+        # Широкая фаза: детали, чьи габариты дальше max_clearance, не проверяем
+        if len(a) and len(b) and _box_distance(a.bmin[0], a.bmax[0], b.bmin[0], b.bmax[0]) > max_clearance:
+            result = {"status": "clear", "distance": None, "points": None, "crossings": 0,
+                      "triangles": np.empty((0, 3, 3))}
+        else:
+            result = check_pair(a, b, max_clearance, contact_tol)
+        result.update(a=labels[i], b=labels[j])
+        results.append(result)
+        if on_result:
+            on_result(result)
+    return results
+
+
+def format_report(results: list) -> str:
+    lines = [f"{'part A':<16}{'part B':<16}{'status':<14}{'clearance, mm':>14}{'crossings':>11}"]
+    for r in results:
+        distance = f"{r['distance']:.3f}" if r["distance"] is not None else "-"
+        lines.append(f"{r['a']:<16}{r['b']:<16}{r['status']:<14}{distance:>14}{r['crossings']:>11}")
+    return "\n".join(lines)
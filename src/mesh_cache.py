@@ -0,0 +1,103 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def geometry_fingerprint(shape) -> str:
+    """Стабильный отпечаток геометрии формы, не зависящий от ее положения.
+
+    Строится из числа граней/ребер/вершин, площади, объема и координат
+    вершин, поэтому совпадает у одинаковых деталей из разных пересборок
+    (в отличие от hash(shape), который привязан к объекту OCCT).
+    """
+    from build123d import Location
+    from OCP.TopLoc import TopLoc_Location
+
+    # Отпечаток запоминается на самом объекте; он действителен, пока объект
+    # ссылается на тот же TShape (смена location его не меняет)
+    tshape_key = hash(shape.wrapped.Located(TopLoc_Location()))
+    cached = getattr(shape, "_fingerprint", None)
+    if cached and cached[0] == tshape_key:
+        return cached[1]
+
+    local = shape.located(Location())
+    vertices = local.vertices()
+    points = np.round(np.array([tuple(v) for v in vertices], dtype=np.float64).reshape(-1, 3), 6)
+    points = points[np.lexsort(points.T)]
+    signature = (len(local.faces()), len(local.edges()), len(vertices),
+                 round(local.area, 6), round(local.volume, 6))
+
+    digest = hashlib.sha1(repr(signature).encode("utf-8"))
+    digest.update(points.tobytes())
+    fingerprint = digest.hexdigest()
+    try:
+        shape._fingerprint = (tshape_key, fingerprint)
+    except AttributeError:
+        pass
+    return fingerprint
+
+
+def polydata_nbytes(mesh) -> int:
+    """Объем данных точек и связности PolyData в байтах."""
+    if mesh is None:
+        return 0
+    total = mesh.points.nbytes
+    for cells in (mesh.faces, mesh.lines):
+        total += cells.nbytes
+    return total
+
+
+class MeshCache:
+    """LRU-кэш мешей, ограниченный объемом данных (байты точек и связности).
+
+    Потокобезопасен: заполняется фоновой тесселяцией и читается в GUI-потоке.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # ключ -> (значение, размер)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, nbytes: int):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, nbytes)
+            self._bytes += nbytes
+            # Вытесняем самые давно использованные, но не только что добавленный
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, size) = self._entries.popitem(last=False)
+                self._bytes -= size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self._entries), "bytes": self._bytes}
@@ -0,0 +1,146 @@
+"""Потоковая запись мешей (NumPy-буферы points/triangles) в бинарный STL и 3MF.
+
+Данные пишутся порциями по chunk треугольников/вершин, поэтому память
+на запись не зависит от размера меша. 3MF повторяет раскладку файлов
+out/print/ (экспорт FreeCAD): 3D/3dmodel.model с одним объектом id="1",
+единицы - миллиметры, _rels/.rels и [Content_Types].xml. Для столов печати
+пишется несколько объектов с переносами в элементах сборки.
+"""
+import zipfile
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+
+CHUNK = 1 << 16
+
+_STL_RECORD = np.dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attr", "<u2")])
+
+_3MF_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<model unit="millimeter" xml:lang="en-US" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">\n'
+    ' <metadata name="Application">{application}</metadata>\n'
+    ' <resources>\n'
+)
+_3MF_OBJECT = (
+    '  <object id="{id}"{name} type="model">\n'
+    '   <mesh>\n'
+    '    <vertices>\n'
+)
+_3MF_MIDDLE = (
+    '    </vertices>\n'
+    '    <triangles>\n'
+)
+_3MF_OBJECT_END = (
+    '    </triangles>\n'
+    '   </mesh>\n'
+    '  </object>\n'
+)
+_3MF_BUILD = (
+    ' </resources>\n'
+    ' <build>\n'
+)
+_3MF_ITEM = '  <item objectid="{id}" transform="{transform}" />\n'
+_3MF_FOOTER = (
+    ' </build>\n'
+    '</model>\n'
+)
+_3MF_RELS = (
+    "<?xml version='1.0' encoding='UTF-8'?>\n"
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\n'
+    ' <Relationship Target="/3D/3dmodel.model" Id="rel0" '
+    'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel" />\n'
+    '</Relationships>\n'
+)
+_3MF_CONTENT_TYPES = (
+    "<?xml version='1.0' encoding='UTF-8'?>\n"
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\n'
+    ' <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>\n'
+    ' <Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>\n'
+    '</Types>\n'
+)
+_VERTEX = '     <vertex x="%.9g" y="%.9g" z="%.9g" />\n'
+_TRIANGLE = '     <triangle v1="%d" v2="%d" v3="%d" />\n'
+# Фиксированная дата записей архива: одинаковый меш дает одинаковые байты
+_ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+def transform_points(points: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Применяет матрицу 4x4 (например, tessellation.location_matrix) к точкам (N, 3)."""
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def weld(points: np.ndarray, triangles: np.ndarray, decimals: int = 6):
+    """Сливает совпадающие вершины (у граней OCCT свои копии узлов на общих ребрах).
+
+    Возвращает (points, triangles) без дубликатов вершин и вырожденных треугольников.
+    """
+    if not len(points):
+        return points, triangles
+    _, first, inverse = np.unique(np.round(points, decimals), axis=0, return_index=True, return_inverse=True)
+    triangles = inverse.reshape(-1)[triangles]
+    keep = (triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) & (triangles[:, 0] != triangles[:, 2])
+    return points[first], triangles[keep]
+
+
+def write_stl(path: str, points: np.ndarray, triangles: np.ndarray, header: str = "", chunk: int = CHUNK):
+    """Бинарный STL: 80 байт заголовка, число треугольников, записи по 50 байт."""
+    with open(path, "wb") as f:
+        f.write(header.encode("ascii", "replace")[:80].ljust(80, b"\0"))
+        f.write(np.uint32(len(triangles)).tobytes())
+        for start in range(0, len(triangles), chunk):
+            corners = points[triangles[start:start + chunk]] # (n, 3, 3)
+            normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+            lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+            np.divide(normals, lengths, out=normals, where=lengths > 0)
+            records = np.zeros(len(corners), dtype=_STL_RECORD)
+            records["normal"] = normals
+            records["vertices"] = corners
+            f.write(records.tobytes())
+
+
+def _3mf_transform(matrix) -> str:
+    """Матрица 4x4 (столбцы-векторы) в атрибут transform 3MF: m00 m01 m02 ... m30 m31 m32 (строки-векторы)."""
+    if matrix is None:
+        matrix = np.eye(4)
+    values = np.vstack([matrix[:3, :3].T, matrix[:3, 3]]).ravel().tolist()
+    return " ".join("%.9g" % v for v in values)
+
+
+def write_3mf(path: str, points: np.ndarray, triangles: np.ndarray, application: str = "Python CAD",
+              chunk: int = CHUNK):
+    """3MF с одним объектом (вершины сливаются, см. weld) в раскладке out/print/."""
+    write_3mf_objects(path, [(None, points, triangles, None)], application, chunk)
+
+
+def write_3mf_objects(path: str, objects, application: str = "Python CAD", chunk: int = CHUNK):
+    """3MF с несколькими объектами (например, стол печати, см. src.packing).
+
+    objects - [(имя или None, points, triangles, transform 4x4 или None)]:
+    объект i получает id=i+1 и элемент сборки с переносом transform.
+    """
+    objects = [(name, *weld(points, triangles), transform) for name, points, triangles, transform in objects]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        info = zipfile.ZipInfo("3D/3dmodel.model", _ZIP_DATE)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with zf.open(info, "w") as f:
+            f.write(_3MF_HEADER.format(application=application).encode("utf-8"))
+            for index, (name, points, triangles, _) in enumerate(objects, 1):
+                name_attr = f" name={quoteattr(name)}" if name else ""
+                f.write(_3MF_OBJECT.format(id=index, name=name_attr).encode("utf-8"))
+                for start in range(0, len(points), chunk):
+                    block = points[start:start + chunk]
+                    # Одна операция форматирования на порцию вместо цикла по вершинам
+                    f.write(((_VERTEX * len(block)) % tuple(block.ravel().tolist())).encode("ascii"))
+                f.write(_3MF_MIDDLE.encode("ascii"))
+                for start in range(0, len(triangles), chunk):
+                    block = triangles[start:start + chunk]
+                    f.write(((_TRIANGLE * len(block)) % tuple(block.ravel().tolist())).encode("ascii"))
+                f.write(_3MF_OBJECT_END.encode("ascii"))
+            f.write(_3MF_BUILD.encode("ascii"))
+            for index, (_, _, _, transform) in enumerate(objects, 1):
+                f.write(_3MF_ITEM.format(id=index, transform=_3mf_transform(transform)).encode("ascii"))
+            f.write(_3MF_FOOTER.encode("ascii"))
+        for name, text in (("_rels/.rels", _3MF_RELS), ("[Content_Types].xml", _3MF_CONTENT_TYPES)):
+            info = zipfile.ZipInfo(name, _ZIP_DATE)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, text)
@@ -0,0 +1,251 @@
+"""Раскладка деталей на столы принтера для печати.
+
+Каждая деталь кладется плоско: по принципу Z-Zero нижняя функциональная
+плоскость детали уже лежит в Z=0 ее локальных координат, поэтому локальная
+ориентация берется как есть, если площадь опоры на стол не заметно меньше,
+чем у другой осевой ориентации. Отпечаток детали (проекция меша на XY)
+растеризуется в битовую маску с шагом resolution и расширяется на зазор
+spacing. Детали раскладываются от больших к меньшим в самую нижнюю-левую
+свободную позицию (с поворотами на 90°) первого стола, где они помещаются;
+свободные позиции ищутся корреляцией масок через FFT. Результат - столы с
+деталями в координатах стола, которые пишутся в 3MF с несколькими объектами.
+"""
+import glob
+import math
+import os
+
+import numpy as np
+
+from src.mesh_writer import write_3mf_objects
+
+# Осевые ориентации-кандидаты (матрицы 3x3); первая - локальная (Z-Zero)
+_ORIENTATIONS = (
+    np.eye(3),
+    np.array([[1, 0, 0], [0, 0, -1], [0, 1, 0]], dtype=float), # вокруг X на +90°
+    np.array([[1, 0, 0], [0, 0, 1], [0, -1, 0]], dtype=float), # вокруг X на -90°
+    np.array([[1, 0, 0], [0, -1, 0], [0, 0, -1]], dtype=float), # вокруг X на 180°
+    np.array([[0, 0, 1], [0, 1, 0], [-1, 0, 0]], dtype=float), # вокруг Y на +90°
+    np.array([[0, 0, -1], [0, 1, 0], [1, 0, 0]], dtype=float), # вокруг Y на -90°
+)
+
+
+def contact_area(points: np.ndarray, triangles: np.ndarray, tolerance: float = 0.01) -> float:
+    """Площадь граней, лежащих на столе: смотрят вниз и находятся в минимальном Z."""
+    if not len(triangles):
+        return 0.0
+    corners = points[triangles]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    areas = np.linalg.norm(normals, axis=1)
+    on_bed = (corners[:, :, 2] < points[:, 2].min() + tolerance).all(axis=1)
+    down = normals[:, 2] < -0.999 * areas
+    return 0.5 * float(areas[on_bed & down].sum())
+
+
+def print_orientation(points: np.ndarray, triangles: np.ndarray, min_contact: float = 0.5) -> np.ndarray:
+    """Поворот 3x3 для печати детали, заданной в локальных координатах.
+
+    Локальная ориентация (Z-Zero) остается, пока ее площадь опоры не меньше
+    min_contact от лучшей осевой ориентации; иначе берется лучшая.
+    """
+    areas = [contact_area(points @ rotation.T, triangles) for rotation in _ORIENTATIONS]
+    best = int(np.argmax(areas))
+    if areas[0] >= min_contact * areas[best]:
+        return _ORIENTATIONS[0]
+    return _ORIENTATIONS[best]
+
+
+def _rotation_z(angle: float) -> np.ndarray:
+    c, s = (round(math.cos(math.radians(angle))), round(math.sin(math.radians(angle))))
+    return np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]], dtype=float)
+
+
+def footprint(points: np.ndarray, triangles: np.ndarray, resolution: float = 1.0, chunk: int = 4096) -> np.ndarray:
+    """Маска проекции меша на XY (строки - Y, столбцы - X) с началом в минимальном углу.
+
+    Пиксель занят, если его центр покрыт треугольником или в нем лежит
+    вершина (тонкие элементы не теряются). Для замкнутого меша проекцию
+    покрывают уже грани, смотрящие вверх, поэтому остальные пропускаются.
+    """
+    xy = (points[:, :2] - points[:, :2].min(axis=0)) / resolution
+    width, height = (np.floor(xy.max(axis=0)).astype(int) + 1) if len(xy) else (0, 0)
+    mask = np.zeros((height, width), dtype=bool)
+    if not len(xy):
+        return mask
+    vertex_px = np.minimum(np.floor(xy).astype(int), [width - 1, height - 1])
+    mask[vertex_px[:, 1], vertex_px[:, 0]] = True
+
+    corners = xy[triangles]
+    a, b, c = corners[:, 0], corners[:, 1], corners[:, 2]
+    doubled = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+    corners = corners[doubled > 1e-9] # вертикальные стенки проецируются в отрезки
+    # Центры пикселей i + 0.5 внутри габарита треугольника
+    lo = np.maximum(np.ceil(corners.min(axis=1) - 0.5), 0).astype(np.int64)
+    hi = np.minimum(np.floor(corners.max(axis=1) - 0.5), [width - 1, height - 1]).astype(np.int64)
+    counts = np.maximum(hi - lo + 1, 0)
+
+    for start in range(0, len(corners), chunk):
+        part = slice(start, start + chunk)
+        nx, ny = counts[part, 0], counts[part, 1]
+        total = nx * ny
+        if not total.sum():
+            continue
+        # Все пары (треугольник, пиксель габарита) одним массивом
+        tri = np.repeat(np.arange(len(total)), total)
+        local = np.arange(total.sum()) - np.repeat(np.cumsum(total) - total, total)
+        px = lo[part][tri, 0] + local % nx[tri]
+        py = lo[part][tri, 1] + local // nx[tri]
+        cx, cy = px + 0.5, py + 0.5
+        t = corners[part][tri]
+        inside = np.ones(len(tri), dtype=bool)
+        for i in range(3):
+            p, q = t[:, i], t[:, (i + 1) % 3]
+            inside &= (q[:, 0] - p[:, 0]) * (cy - p[:, 1]) - (q[:, 1] - p[:, 1]) * (cx - p[:, 0]) >= -1e-9
+        mask[py[inside], px[inside]] = True
+    return mask
+
+
+def dilate(mask: np.ndarray, radius: int) -> np.ndarray:
+    """Расширяет маску кругом радиуса radius пикселей (маска растет на radius с каждой стороны)."""
+    height, width = mask.shape
+    out = np.zeros((height + 2 * radius, width + 2 * radius), dtype=bool)
+    for dy in range(-radius, radius + 1):
+        for dx in range(-radius, radius + 1):
+            if dx * dx + dy * dy <= radius * radius:
+                out[radius + dy:radius + dy + height, radius + dx:radius + dx + width] |= mask
+    return out
+
+
+def _fft_length(n: int) -> int:
+    """Наименьшее число вида 2^a * 3^b * 5^c не меньше n (на таких длинах FFT быстрая)."""
+    best = 1 << (n - 1).bit_length()
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            length = power35
+            while length < n:
+                length *= 2
+            best = min(best, length)
+            power35 *= 3
+        power5 *= 5
+    return best
+
+
+def _fft_shape(grid) -> tuple:
+    """Размер FFT без заворота корреляции для любой маски не больше стола."""
+    return tuple(_fft_length(2 * n - 1) for n in grid)
+
+
+def _free_positions(occupied_spectrum, candidate, grid, shape) -> np.ndarray:
+    """Булева сетка (y, x): маска, положенная углом в (y, x), не задевает занятые пиксели."""
+    h, w = candidate["mask"].shape
+    # Корреляция = свертка с перевернутой маской; считаем в частотной области
+    overlap = np.fft.irfft2(occupied_spectrum * candidate["spectrum"], shape)
+    return overlap[h - 1:grid[0], w - 1:grid[1]] < 0.5
+
+
+def _candidates(name, points, triangles, spacing, resolution, angles, shape):
+    """Варианты укладки детали: для каждого угла поворота вокруг Z (кратного 90°) - меш и маски.
+
+    Отпечаток растеризуется один раз и поворачивается как массив; меш
+    поворачивается вместе с растром, так что угол растра остается в нуле.
+    """
+    points = points @ print_orientation(points, triangles).T
+    points = points - points.min(axis=0) # низ в Z=0, минимальный угол в начале координат
+    raw = footprint(points, triangles, resolution)
+    box = np.array([[0.0, 0.0, 0.0], [raw.shape[1] * resolution, raw.shape[0] * resolution, 0.0]])
+    radius = max(0, math.ceil(spacing / resolution))
+    result = []
+    for angle in angles:
+        rotation = _rotation_z(angle)
+        rotated = np.rot90(raw, -(angle // 90) % 4)
+        mask = dilate(rotated, radius)
+        result.append({"name": name, "angle": angle, "triangles": triangles,
+                       "points": points @ rotation.T - (box @ rotation.T).min(axis=0),
+                       "footprint": rotated, "mask": mask, "radius": radius,
+                       "spectrum": np.fft.rfft2(mask[::-1, ::-1].astype(float), shape)})
+    return result
+
+
+def pack(meshes, bed=(256.0, 256.0), spacing: float = 3.0, resolution: float = 1.0,
+         angles=(0, 90, 180, 270)):
+    """Раскладывает детали на минимальное число столов размером bed (X, Y), мм.
+
+    meshes - [(имя, points, triangles)] в локальных координатах деталей,
+    angles - допустимые повороты вокруг Z (кратные 90°).
+    spacing - зазор между деталями и от края стола, мм. Возвращает
+    (plates, unplaced): plates - список столов, стол - список укладок
+    {"name", "angle", "offset", "points", "triangles", "transform"}, где
+    points - меш в ориентации печати с углом растра отпечатка в нуле, а
+    transform (4x4) переносит его на место на столе; unplaced - имена
+    деталей, которые не помещаются на пустой стол.
+    """
+    grid = (int(bed[1] // resolution), int(bed[0] // resolution))
+    shape = _fft_shape(grid)
+    items = [_candidates(name, points, triangles, spacing, resolution, angles, shape)
+             for name, points, triangles in meshes]
+    # Сначала крупные: мелкие детали потом заполняют промежутки
+    items.sort(key=lambda candidates: -int(candidates[0]["footprint"].sum()))
+
+    plates, occupied, spectra, unplaced = [], [], [], []
+    for candidates in items:
+        fits = [c for c in candidates if c["mask"].shape[0] <= grid[0] and c["mask"].shape[1] <= grid[1]]
+        if not fits:
+            unplaced.append(candidates[0]["name"])
+            continue
+        for index in range(len(plates) + 1):
+            if index == len(plates):
+                plates.append([])
+                occupied.append(np.zeros(grid, dtype=bool))
+                spectra.append(np.fft.rfft2(occupied[-1].astype(float), shape))
+            best = None
+            for candidate in fits:
+                free = _free_positions(spectra[index], candidate, grid, shape)
+                ys, xs = np.nonzero(free) # порядок строк: первая позиция - нижняя-левая
+                if not len(ys):
+                    continue
+                h, w = candidate["mask"].shape
+                score = (ys[0] + h, xs[0] + w)
+                if best is None or score < best[0]:
+                    best = (score, candidate, int(ys[0]), int(xs[0]))
+            if best is not None:
+                break
+        _, candidate, y, x = best
+        r = candidate["radius"]
+        raw = candidate["footprint"]
+        occupied[index][y + r:y + r + raw.shape[0], x + r:x + r + raw.shape[1]] |= raw
+        spectra[index] = np.fft.rfft2(occupied[index].astype(float), shape)
+        offset = ((x + r) * resolution, (y + r) * resolution)
+        transform = np.eye(4)
+        transform[:2, 3] = offset
+        plates[index].append({"name": candidate["name"], "angle": candidate["angle"], "offset": offset,
+                              "points": candidate["points"], "triangles": candidate["triangles"],
+                              "transform": transform})
+    return plates, unplaced
+
+
+def write_plates(plates, out_dir: str, application: str = "Python CAD") -> list:
+    """Пишет столы в out_dir/plate_<n>.3mf (старые файлы столов удаляются). Возвращает пути."""
+    os.makedirs(out_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(out_dir, "plate_*.3mf")):
+        os.remove(stale)
+    paths = []
+    for number, plate in enumerate(plates, 1):
+        path = os.path.join(out_dir, f"plate_{number}.3mf")
+        write_3mf_objects(path, [(p["name"], p["points"], p["triangles"], p["transform"]) for p in plate],
+                          application)
+        paths.append(path)
+    return paths
+
+
+def format_plates(plates, bed) -> str:
+    """Сводка раскладки: детали на каждом столе, их поворот, место и заполнение стола."""
+    lines = []
+    for number, plate in enumerate(plates, 1):
+        area = sum(float(np.ptp(p["points"][:, 0]) * np.ptp(p["points"][:, 1])) for p in plate)
+        lines.append(f"Plate {number}: {len(plate)} parts, {100 * area / (bed[0] * bed[1]):.0f}% of bed (bounding boxes)")
+        for p in plate:
+            size = np.ptp(p["points"], axis=0)
+            lines.append(f"  {p['name']:<16} rot={p['angle']:>3}°  at=({p['offset'][0]:.0f}, {p['offset'][1]:.0f})"
+                         f"  size=({size[0]:.1f}, {size[1]:.1f}, {size[2]:.1f})")
+    return "\n".join(lines)
@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Активный профилировщик процесса (None - профилирование выключено)
+_active = None
+
+
+class Profiler:
+    """Журнал этапов построения: время и число граней/ребер результата.
+
+    События хранятся в формате Chrome Trace ("X" - завершенный интервал),
+    поэтому трассу можно открыть в chrome://tracing, Perfetto или speedscope
+    как flame graph. Вложенные этапы одного потока отображаются стеком.
+    """
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def record(self, name: str, start_us: float, dur_us: float, args: dict = None):
+        event = {"name": name, "ph": "X", "ts": start_us, "dur": dur_us,
+                 "pid": os.getpid(), "tid": threading.get_ident(), "args": args or {}}
+        with self._lock:
+            self.events.append(event)
+
+    def merge(self, events: list):
+        """Добавляет события, записанные в другом процессе (воркере пула)."""
+        with self._lock:
+            self.events.extend(events)
+
+    def clear(self):
+        with self._lock:
+            self.events = []
+
+    def summary(self) -> list:
+        """[(этап, число вызовов, суммарные секунды)] по убыванию времени."""
+        totals = {}
+        with self._lock:
+            for event in self.events:
+                count, total = totals.get(event["name"], (0, 0.0))
+                totals[event["name"]] = (count + 1, total + event["dur"] / 1e6)
+        return sorted(((name, count, total) for name, (count, total) in totals.items()),
+                      key=lambda item: -item[2])
+
+    def format_summary(self, limit: int = None) -> str:
+        lines = [f"{'stage':<56}{'calls':>6}{'time, ms':>12}"]
+        for name, count, total in self.summary()[:limit]:
+            lines.append(f"{name:<56}{count:>6}{total * 1e3:>12.1f}")
+        return "\n".join(lines)
+
+    def write_trace(self, path: str):
+        """Записывает трассу в формате Chrome Trace Event (JSON)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            data = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+
+def enable() -> Profiler:
+    """Включает профилирование в текущем процессе и возвращает профилировщик."""
+    global _active
+    if _active is None:
+        _active = Profiler()
+    return _active
+
+
+def disable():
+    global _active
+    _active = None
+
+
+def active() -> Profiler:
+    """Текущий профилировщик или None."""
+    return _active
+
+
+def shape_counts(target) -> dict:
+    """Число граней и ребер формы (или результата BuildPart)."""
+    shape = getattr(target, "part", target)
+    try:
+        return {"faces": len(shape.faces()), "edges": len(shape.edges())}
+    except Exception:
+        return {}
+
+
+@contextmanager
+def stage(name: str, target=None, **args):
+    """Замеряет этап построения, если профилирование включено.
+
+    target - BuildPart или Shape: после этапа в событие записывается число
+    граней и ребер результата (подсчет не входит во время этапа).
+    Возвращает словарь args события, его можно дополнить внутри этапа.
+    """
+    profiler = _active
+    if profiler is None:
+        yield args
+        return
+    start = time.time_ns() / 1e3
+    t0 = time.perf_counter()
+    try:
+        yield args
+    finally:
+        dur = (time.perf_counter() - t0) * 1e6
+        if target is not None:
+            args.update(shape_counts(target))
+        profiler.record(name, start, dur, args)
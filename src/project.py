@@ -0,0 +1,97 @@
+import importlib
+import inspect
+import json
+import os
+import sys
+
+CONFIG_FILE = "config.json"
+
+
+def load_config(path: str = CONFIG_FILE) -> dict:
+    """Читает config.json приложения (пустой словарь, если файла нет)."""
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except:
+            pass
+    return {}
+
+
+def project_dir(assembly_class) -> str:
+    """Папка проекта - там, где определен класс сборки."""
+    return os.path.dirname(sys.modules[assembly_class.__module__].__file__)
+
+
+def load_project_params(assembly_class) -> dict:
+    """Загружает параметры проекта из params.json в папке проекта."""
+    try:
+        params_path = os.path.join(project_dir(assembly_class), "params.json")
+        if os.path.exists(params_path):
+            with open(params_path, "r") as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"Warning: Could not load project params: {e}")
+    return {}
+
+
+def load_assembly_class(name: str):
+    """Возвращает ProjectAssembly проекта projects/<name>."""
+    module = importlib.import_module(f"projects.{name}")
+    return module.ProjectAssembly
+
+
+def _project_modules(package: str) -> dict:
+    """{имя: модуль} для загруженных модулей пакета проекта (включая сам пакет)."""
+    return {name: module for name, module in list(sys.modules.items())
+            if (name == package or name.startswith(package + ".")) and getattr(module, "__file__", None)}
+
+
+def _references(module, names: set) -> set:
+    """Модули из names, на которые ссылаются глобальные имена module."""
+    found = set()
+    for value in vars(module).values():
+        name = value.__name__ if inspect.ismodule(value) else getattr(value, "__module__", None)
+        if name in names and name != module.__name__:
+            found.add(name)
+    return found
+
+
+def reload_project(assembly_class, changed_paths) -> tuple:
+    """Перезагружает измененные модули проекта и модули, которые от них зависят.
+
+    Зависимые модули (например, assembly.py, импортирующий построитель через
+    from .holder_half import ...) перезагружаются после своих зависимостей,
+    иначе они продолжили бы ссылаться на старые функции.
+    Возвращает (класс сборки после перезагрузки, [имена перезагруженных модулей]).
+    """
+    package = sys.modules[assembly_class.__module__].__package__
+    modules = _project_modules(package)
+    paths = {os.path.abspath(p) for p in changed_paths}
+    affected = {name for name, m in modules.items() if os.path.abspath(m.__file__) in paths}
+
+    # Замыкание по обратным зависимостям
+    while True:
+        dependents = {name for name, m in modules.items() if name not in affected and _references(m, affected)}
+        if not dependents:
+            break
+        affected |= dependents
+
+    # Зависимости перезагружаются раньше зависящих от них модулей
+    order, visiting = [], set()
+
+    def visit(name):
+        if name in order or name in visiting:
+            return
+        visiting.add(name)
+        for dep in sorted(_references(modules[name], affected)):
+            visit(dep)
+        order.append(name)
+
+    for name in sorted(affected):
+        visit(name)
+    for name in order:
+        importlib.reload(modules[name])
+
+    new_class = getattr(sys.modules[assembly_class.__module__], assembly_class.__name__)
+    return new_class, order
@@ -0,0 +1,111 @@
+import time
+from collections import deque
+
+import numpy as np
+
+
+class QualityManager:
+    """Качество рендера в зависимости от взаимодействия с камерой.
+
+    В покое включены SSAO и заданное сглаживание (SSAA); пока пользователь
+    вращает или зумирует камеру, тяжелые проходы отключаются (можно оставить
+    дешевое сглаживание interactive_anti_aliasing), после остановки полное
+    качество возвращается. Заодно замеряет время каждого кадра.
+    """
+
+    def __init__(self, plotter, ssao_radius: float = 15.0, anti_aliasing: str = "ssaa",
+                 interactive_anti_aliasing: str = None, adaptive: bool = True, history: int = 600):
+        self.plotter = plotter
+        self.ssao_radius = ssao_radius
+        # SSAA (Super Sampling) лучше всего убирает пикселизацию на High-DPI мониторах
+        self.anti_aliasing = anti_aliasing
+        self.interactive_anti_aliasing = interactive_anti_aliasing
+        self.adaptive = adaptive
+        self.interactive = False
+        # Подписчики на смену режима: callback(interactive) (например, быстрые ребра)
+        self.listeners = []
+
+        # Время кадров (секунды): все последние и кадры текущего/последнего взаимодействия
+        self.frame_times = deque(maxlen=history)
+        self.interaction_times = []
+        self._frame_start = None
+        render_window = plotter.render_window
+        render_window.AddObserver("StartEvent", self._on_frame_start)
+        render_window.AddObserver("EndEvent", self._on_frame_end)
+
+        self._apply(full=True)
+
+    @classmethod
+    def from_config(cls, plotter, quality: dict = None):
+        """Создает менеджер по секции render.quality из config.json."""
+        quality = quality if quality else {}
+        return cls(plotter, quality.get("ssao_radius", 15.0), quality.get("anti_aliasing", "ssaa"),
+                   quality.get("interactive_anti_aliasing"), quality.get("adaptive", True))
+
+    def _apply(self, full: bool):
+        if self.ssao_radius and full:
+            self.plotter.enable_ssao(radius=self.ssao_radius)
+        else:
+            self.plotter.disable_ssao()
+        anti_aliasing = self.anti_aliasing if full else self.interactive_anti_aliasing
+        self.plotter.disable_anti_aliasing()
+        if anti_aliasing:
+            self.plotter.enable_anti_aliasing(anti_aliasing)
+
+    def set_interactive(self, active: bool):
+        """Начало (True) или конец (False) взаимодействия; рендер вызывает владелец сцены."""
+        if active:
+            self.interaction_times = []
+        if active == self.interactive:
+            return
+        self.interactive = active
+        if self.adaptive:
+            self._apply(full=not active)
+        for callback in self.listeners:
+            callback(active)
+
+    def _on_frame_start(self, *args):
+        self._frame_start = time.perf_counter()
+
+    def _on_frame_end(self, *args):
+        if self._frame_start is None:
+            return
+        seconds = time.perf_counter() - self._frame_start
+        self._frame_start = None
+        self.frame_times.append(seconds)
+        if self.interactive:
+            self.interaction_times.append(seconds)
+
+    @staticmethod
+    def frame_stats(times) -> dict:
+        """Среднее/медиана/95-й перцентиль времени кадра (мс) и FPS по среднему."""
+        if not len(times):
+            return {"frames": 0, "mean_ms": 0.0, "median_ms": 0.0, "p95_ms": 0.0, "fps": 0.0}
+        ms = np.asarray(times) * 1e3
+        mean = float(ms.mean())
+        return {"frames": len(ms), "mean_ms": mean, "median_ms": float(np.median(ms)),
+                "p95_ms": float(np.percentile(ms, 95)), "fps": 1e3 / mean if mean > 0 else 0.0}
+
+    def run_camera_path(self, frames: int = 36, azimuth: float = 360.0, elevation: float = 0.0,
+                        interactive: bool = True) -> list:
+        """Облет камеры по сценарию (в т.ч. offscreen): frames кадров с равным шагом.
+
+        С interactive=True кадры рисуются в режиме взаимодействия, как при
+        вращении мышью. Возвращает время каждого кадра в секундах.
+        """
+        camera = self.plotter.camera
+        render_window = self.plotter.render_window
+        times = []
+        self.set_interactive(interactive)
+        try:
+            render_window.Render() # Первый кадр после смены проходов не считаем
+            for _ in range(frames):
+                camera.Azimuth(azimuth / frames)
+                camera.Elevation(elevation / frames)
+                camera.OrthogonalizeViewUp()
+                t0 = time.perf_counter()
+                render_window.Render()
+                times.append(time.perf_counter() - t0)
+        finally:
+            self.set_interactive(False)
+        return times
@@ -1,16 +1,59 @@
+import copy
+import json
+import math
+import os
 import pyvista as pv
 import numpy as np
-from build123d import Shape, Compound
+from src.mesh_cache import MeshCache, geometry_fingerprint, polydata_nbytes
+from src.quality import QualityManager
+
+# build123d/OCP (src.tessellation) импортируются в методах: окно со снимком сцены
+# показывается до того, как ядро CAD загрузится в фоне
 
 class CADRenderer:
     """Класс, отвечающий исключительно за визуализацию геометрии в PyVista."""
     
-    def __init__(self, plotter):
+    def __init__(self, plotter, mesh_cache_mb: int = 256, lod: dict = None, fast_edges: bool = True,
+                 quality: dict = None):
         self.plotter = plotter
         self.setup_scene()
+        # SSAO и сглаживание: полное качество в покое, облегченное во время вращения камеры
+        self.quality = QualityManager.from_config(self.plotter, quality)
         self.first_render = True
-        self._mesh_cache = {} # Кэш для мешей, чтобы не пересчитывать их постоянно
-        self._actor_count = 0
+        # Кэш мешей и ребер по отпечатку геометрии, ограничен по объему данных
+        self.mesh_cache = MeshCache(mesh_cache_mb * 1024 * 1024)
+        # Модель сцены: ключ детали -> {"geometry", "matrix", "color", "actors",
+        # "shape", "tolerance" (точность показанного меша), "size" (диагональ)}
+        self._scene = {}
+        self._frame_keys = set()
+        # Инстансинг: детали с одинаковой геометрией (разные Location) используют
+        # общие мапперы - меш загружается в GPU один раз, у акторов свои матрицы.
+        # Отпечаток геометрии -> {"mapper", "edge_mapper", "edge_prop", "keys", "nbytes"}
+        self._instances = {}
+        # Акторы подсветки проверки пересечений (в мировых координатах)
+        self._check_actors = []
+        # Акторы подсветки дефектов мешей (src.validation), по матрицам деталей
+        self._validation_actors = []
+
+        # Уровни детализации: грубый меш сразу после пересборки, точный - в фоне
+        lod = lod if lod else {}
+        self.coarse_tolerance = lod.get("coarse_tolerance", 0.5)
+        self.fine_tolerance = lod.get("fine_tolerance", 0.05)
+        self.coarse_angular = lod.get("coarse_angular", 0.5)
+        self.fine_angular = lod.get("fine_angular", 0.1)
+        self.max_tolerance_scale = lod.get("max_scale", 8.0)
+
+        # Подписчики на начало/конец взаимодействия с камерой
+        self.on_interaction_start = []
+        self.on_interaction_end = []
+        self._hook_interaction()
+
+        # Быстрые ребра: пока камера движется, ребра рисуются тонкими линиями без трубок
+        self.fast_edges = fast_edges
+        self._edges_fast = False
+        self.quality.listeners.append(self.set_fast_edges)
+        self.on_interaction_start.append(lambda: self.quality.set_interactive(True))
+        self.on_interaction_end.append(self._end_interaction)
 
     def setup_scene(self):
         """Настройка освещения и фона."""
@@ -24,12 +67,18 @@ class CADRenderer:
         positions = [(100, 100, 150), (-100, 100, 150), (0, -100, -100)]
         for pos in positions:
             self.plotter.add_light(pv.Light(position=pos, intensity=1.1))
-        
-        self.plotter.enable_ssao(radius=15)
-        # SSAA (Super Sampling) лучше всего убирает пикселизацию на High-DPI мониторах
-        self.plotter.enable_anti_aliasing("ssaa") 
         self.plotter.add_axes()
 
+    def _hook_interaction(self):
+        """Подписывается на события VTK начала/окончания вращения или зума камеры."""
+        iren = getattr(self.plotter, "iren", None)
+        if iren is None:
+            return
+        iren.add_observer("StartInteractionEvent",
+                          lambda *args: [cb() for cb in self.on_interaction_start])
+        iren.add_observer("EndInteractionEvent",
+                          lambda *args: [cb() for cb in self.on_interaction_end])
+
     def get_gpu_info(self):
         """Получает имя GPU из отчета VTK."""
         try:
@@ -43,36 +92,236 @@ class CADRenderer:
 
     def clear(self):
         """Очищает сцену."""
+        self._scene.clear()
+        self._instances.clear()
+        self._check_actors = []
+        self._validation_actors = []
         for name in list(self.plotter.renderer.actors.keys()):
             if name != "axes":
                 self.plotter.remove_actor(name)
 
-    def _to_pyvista_mesh(self, shape: Shape, tolerance: float = 0.1):
-        """Конвертирует форму build123d в PolyData с кэшированием."""
-        # Используем hash геометрии как ключ
-        shape_hash = hash(shape)
-        if shape_hash in self._mesh_cache:
-            return self._mesh_cache[shape_hash]
-
-        verts, triangles = shape.tessellate(tolerance)
-        points = np.array([[v.X, v.Y, v.Z] for v in verts])
-        faces = []
-        for tri in triangles:
-            faces.append(3)
-            faces.extend(tri)
-        
-        mesh = pv.PolyData(points, np.array(faces))
-        self._mesh_cache[shape_hash] = mesh
+    def _geometry_key(self, shape):
+        """Ключ геометрии формы без учета ее положения (Location)."""
+        return geometry_fingerprint(shape)
+
+    def _tessellate(self, shape, tolerance: float, isolated: bool = False):
+        """Меш и ребра B-rep формы (в локальных координатах) за одну триангуляцию; оба кладутся в кэш."""
+        from build123d import Location
+        from src.tessellation import tessellate, to_vtk_faces, to_vtk_lines
+
+        local = shape.located(Location())
+        if isolated:
+            # Независимая копия B-rep: триангуляция OCCT хранится в самой форме,
+            # а исходную деталь в это время может тесселировать поток сборки
+            local = copy.deepcopy(local)
+        # Ребра B-rep берутся из той же триангуляции, поэтому точно лежат на меше
+        points, triangles, segments = tessellate(local, tolerance, self._angular_tolerance(tolerance), edges=True)
+        mesh = pv.PolyData(points, to_vtk_faces(triangles))
+        edges = pv.PolyData(points, lines=to_vtk_lines(segments)).clean() # Только узлы ребер
+        geometry = self._geometry_key(shape)
+        self.mesh_cache.put((geometry, tolerance), mesh, polydata_nbytes(mesh))
+        self.mesh_cache.put((geometry, tolerance, "edges"), edges, polydata_nbytes(edges))
+        return mesh, edges
+
+    def _to_pyvista_mesh(self, shape, tolerance: float = 0.1, isolated: bool = False):
+        """Конвертирует форму build123d в PolyData (в локальных координатах) с кэшированием."""
+        mesh = self.mesh_cache.get((self._geometry_key(shape), tolerance))
+        if mesh is None:
+            mesh, _ = self._tessellate(shape, tolerance, isolated)
         return mesh
 
-    def render_shape(self, shape: Shape, name: str = None, color=None):
-        """Рендерит одиночный Shape (Part) или рекурсивно обходит Compound."""
-        self._actor_count += 1
+    def _feature_edges(self, shape, tolerance: float = 0.1, isolated: bool = False):
+        """Ребра B-rep формы, дискретизированные вместе с мешем (с кэшированием)."""
+        edges = self.mesh_cache.get((self._geometry_key(shape), tolerance, "edges"))
+        if edges is None:
+            _, edges = self._tessellate(shape, tolerance, isolated)
+        return edges
+
+    def set_fast_edges(self, fast: bool):
+        """Переключает ребра между быстрым режимом (линии в 1 px) и обычным (трубки)."""
+        if not self.fast_edges or fast == self._edges_fast:
+            return
+        self._edges_fast = fast
+        actors = self.plotter.renderer.actors
+        props = {}
+        for entry in self._scene.values():
+            for name in entry["actors"][1:]:
+                if name in actors:
+                    props[id(actors[name].prop)] = actors[name].prop # У экземпляров свойство общее
+        for prop in props.values():
+            prop.render_lines_as_tubes = not fast
+            prop.line_width = 1.0 if fast else 2.0
+
+    def _end_interaction(self):
+        """Камера остановилась: кадр в полном качестве."""
+        self.quality.set_interactive(False)
+        self.plotter.render()
+
+    def prepare_meshes(self, shapes, should_stop=None):
+        """Заранее тесселирует формы и считает ребра, заполняя кэши.
+
+        Не создает акторов, поэтому может вызываться из фонового потока;
+        последующий update_scene в GUI-потоке берет готовые меши из кэша.
+        """
+        from build123d import Compound
+
+        stack = list(shapes) if isinstance(shapes, (list, tuple)) else [shapes]
+        while stack:
+            if should_stop and should_stop():
+                return
+            shape = stack.pop()
+            if isinstance(shape, Compound) and getattr(shape, "color", None) is None:
+                try:
+                    stack.extend(shape)
+                    continue
+                except:
+                    pass
+            try:
+                self._to_pyvista_mesh(shape, self.coarse_tolerance)
+                self._feature_edges(shape, self.coarse_tolerance)
+            except Exception:
+                pass
+
+    def _visible_height(self) -> float:
+        """Высота видимой области (в мировых единицах) в фокальной плоскости камеры."""
+        camera = self.plotter.camera
+        if camera.parallel_projection:
+            return 2.0 * camera.parallel_scale
+        return 2.0 * camera.distance * math.tan(math.radians(camera.view_angle) / 2.0)
+
+    def _angular_tolerance(self, tolerance: float) -> float:
+        """Угловой допуск, согласованный с линейным: грубее меш - грубее и дуги."""
+        angular = self.fine_angular * tolerance / self.fine_tolerance
+        return min(max(angular, self.fine_angular), self.coarse_angular)
+
+    def _lod_tolerance(self, size: float) -> float:
+        """Точность тесселяции для детали с диагональю size с учетом ее размера на экране.
+
+        Чем меньше деталь на экране, тем грубее допуск (шагами x2, чтобы ключи
+        кэша не менялись при каждом небольшом зуме).
+        """
+        screen_fraction = size / max(self._visible_height(), 1e-9)
+        scale = 1.0 / max(screen_fraction, 1e-9)
+        scale = min(max(scale, 1.0), self.max_tolerance_scale)
+        return self.fine_tolerance * 2.0 ** math.floor(math.log2(scale))
+
+    def refine_requests(self):
+        """Список (ключ сцены, форма, допуск) для деталей, которым нужен более точный меш.
+
+        Экземпляры одной геометрии делят меш, поэтому запрос один на геометрию
+        (с допуском для экземпляра, который крупнее всех на экране).
+        """
+        requests = {}
+        for key, entry in self._scene.items():
+            if entry["shape"] is None:
+                continue # Деталь из снимка сцены: форма появится после сборки
+            size = entry["size"]
+            tolerance = self._lod_tolerance(size)
+            if tolerance < entry["tolerance"] * 0.99:
+                request = requests.get(entry["geometry"])
+                if request is None or tolerance < request[2]:
+                    requests[entry["geometry"]] = (key, entry["shape"], tolerance)
+        return list(requests.values())
+
+    def compute_meshes(self, requests, should_stop=None):
+        """Тесселирует формы для refine_requests (можно вызывать из фонового потока)."""
+        results = []
+        for key, shape, tolerance in requests:
+            if should_stop and should_stop():
+                break
+            try:
+                mesh = self._to_pyvista_mesh(shape, tolerance, isolated=True)
+                edges = self._feature_edges(shape, tolerance, isolated=True)
+                results.append((key, self._geometry_key(shape), tolerance, mesh, edges))
+            except Exception:
+                pass
+        return results
+
+    def apply_meshes(self, results):
+        """Подменяет меши акторов на уточненные (GUI-поток)."""
+        actors = self.plotter.renderer.actors
+        changed = False
+        for key, geometry, tolerance, mesh, edges in results:
+            entry = self._scene.get(key)
+            if not entry or entry["geometry"] != geometry or tolerance >= entry["tolerance"]:
+                continue # Деталь уже пересобрана или показана точнее
+            shared = self._instances.get(geometry)
+            if shared is not None:
+                # Общие мапперы: меш меняется сразу у всех экземпляров
+                shared["mapper"].SetInputData(mesh)
+                if shared["edge_mapper"] is not None:
+                    shared["edge_mapper"].SetInputData(edges)
+                shared["nbytes"] = polydata_nbytes(mesh) + polydata_nbytes(edges)
+                for instance_key in shared["keys"]:
+                    self._scene[instance_key]["tolerance"] = tolerance
+            else:
+                names = entry["actors"]
+                if names and names[0] in actors:
+                    actors[names[0]].mapper.SetInputData(mesh)
+                if len(names) > 1 and names[1] in actors:
+                    actors[names[1]].mapper.SetInputData(edges)
+                entry["tolerance"] = tolerance
+            changed = True
+        if changed:
+            self.plotter.render()
+
+    def _remove_entry(self, key):
+        entry = self._scene.pop(key, None)
+        if entry:
+            for name in entry["actors"]:
+                self.plotter.remove_actor(name, render=False)
+            shared = self._instances.get(entry["geometry"])
+            if shared is not None:
+                shared["keys"].discard(key)
+                if not shared["keys"]:
+                    del self._instances[entry["geometry"]]
+
+    def instancing_stats(self) -> dict:
+        """Сколько деталей показано через общие меши и сколько данных не загружено в GPU повторно."""
+        instances = sum(len(shared["keys"]) for shared in self._instances.values())
+        saved = sum((len(shared["keys"]) - 1) * shared["nbytes"] for shared in self._instances.values())
+        return {"parts": instances, "meshes": len(self._instances), "saved_bytes": saved}
+
+    def _add_instance(self, shared, actor_name: str, render_color, matrix) -> list:
+        """Акторы еще одного экземпляра геометрии на общих мапперах."""
+        first = self._scene[next(iter(shared["keys"]))]
+        prop = self.plotter.renderer.actors[first["actors"][0]].prop.copy()
+        prop.color = render_color
+        actor = pv.Actor(mapper=shared["mapper"], prop=prop)
+        actor.user_matrix = matrix
+        self.plotter.add_actor(actor, name=actor_name, render=False)
+        names = [actor_name]
+        if shared["edge_mapper"] is not None:
+            edge_actor = pv.Actor(mapper=shared["edge_mapper"], prop=shared["edge_prop"])
+            edge_actor.user_matrix = matrix
+            self.plotter.add_actor(edge_actor, name=f"{actor_name}_e", render=False)
+            names.append(f"{actor_name}_e")
+        return names
+
+    def _scene_key(self, shape, name: str = None):
+        """Уникальный в пределах кадра ключ сцены: метка детали (или путь в Compound)."""
+        key = getattr(shape, "label", None) or name or f"Part_{len(self._frame_keys) + 1}"
+        base, n = key, 1
+        while key in self._frame_keys:
+            n += 1
+            key = f"{base}#{n}"
+        self._frame_keys.add(key)
+        return key
+
+    def render_shape(self, shape, name: str = None, color=None):
+        """Рендерит одиночный Shape (Part) или рекурсивно обходит Compound.
+
+        Акторы переиспользуются между кадрами: если геометрия детали с тем же
+        ключом сцены не изменилась, обновляется только матрица положения и цвет.
+        """
+        from build123d import Compound
+        from src.tessellation import location_matrix
+
         actor_names = []
         
         # 1. Получаем текущие свойства
-        obj_label = getattr(shape, "label", name if name else f"Part_{self._actor_count}")
-        obj_color = getattr(shape, "color", color)
+        obj_key = self._scene_key(shape, name)
+        obj_color = getattr(shape, "color", None) or color
         
         # 2. Если это Compound и у него НЕТ своего цвета - идем вглубь.
         is_compound = isinstance(shape, Compound)
@@ -80,7 +329,7 @@ class CADRenderer:
         if is_compound and obj_color is None:
             try:
                 for i, child in enumerate(shape):
-                    child_name = f"{obj_label}_{i}"
+                    child_name = f"{obj_key}_{i}"
                     actor_names.extend(self.render_shape(child, child_name, obj_color))
                 return actor_names
             except:
@@ -89,55 +338,270 @@ class CADRenderer:
         # 3. Рендерим геометрию
         try:
             final_color = obj_color if obj_color else "#ffffff"
-            mesh = self._to_pyvista_mesh(shape)
-            
-            if mesh.n_points == 0:
-                return actor_names
-
             if hasattr(final_color, "to_tuple"):
                 render_color = final_color.to_tuple()
-            else:
+            elif isinstance(final_color, str):
                 render_color = final_color
-            
-            actor_name = f"actor_{self._actor_count}"
-            
-            self.plotter.add_mesh(
-                mesh, color=render_color, name=actor_name, 
-                pbr=True, metallic=0.0, roughness=0.5,
-                show_edges=False
-            )
-            actor_names.append(actor_name)
-            
-            edges = mesh.extract_feature_edges(feature_angle=30)
-            if edges.n_cells > 0:
-                edge_actor_name = f"{actor_name}_e"
-                self.plotter.add_mesh(
-                    edges, color="#111111", 
-                    line_width=2.0, 
-                    render_lines_as_tubes=True, 
-                    name=edge_actor_name
-                )
-                actor_names.append(edge_actor_name)
+            else:
+                render_color = tuple(final_color) # build123d.Color новых версий (RGBA)
+
+            geometry = self._geometry_key(shape)
+            matrix = location_matrix(shape.location)
+            entry = self._scene.get(obj_key)
+
+            if entry and entry["geometry"] == geometry:
+                # Геометрия та же: только положение и цвет
+                actors = self.plotter.renderer.actors
+                entry["shape"] = shape
+                if not np.array_equal(entry["matrix"], matrix):
+                    for actor_name in entry["actors"]:
+                        actors[actor_name].user_matrix = matrix
+                    entry["matrix"] = matrix
+                if entry["color"] != render_color and entry["actors"]:
+                    actors[entry["actors"][0]].prop.color = render_color
+                    entry["color"] = render_color
+                return list(entry["actors"])
+
+            # Новая или измененная геометрия: пересоздаем акторы этой детали
+            self._remove_entry(obj_key)
+            if geometry in self._instances:
+                actor_names.extend(self._add_part(obj_key, geometry, None, None, matrix, render_color, shape=shape))
+                return actor_names
+            tolerance = self.coarse_tolerance
+            mesh = self._to_pyvista_mesh(shape, tolerance)
+            if mesh.n_points == 0:
+                return actor_names
+            edges = self._feature_edges(shape, tolerance)
+            actor_names.extend(self._add_part(obj_key, geometry, mesh, edges, matrix, render_color, tolerance, shape))
                 
         except Exception as e:
-            pass
+            print(f"Render Error ({obj_key}): {e}")
         
         return actor_names
 
+    def _add_part(self, obj_key: str, geometry: str, mesh, edges, matrix, render_color,
+                  tolerance: float = None, shape=None) -> list:
+        """Создает акторы детали и запись сцены. Возвращает имена акторов.
+
+        Если такая геометрия уже на сцене в другом положении, добавляется
+        экземпляр на ее мапперах (mesh/edges не нужны).
+        """
+        actor_names = []
+        shared = self._instances.get(geometry)
+        if shared is not None:
+            first = self._scene[next(iter(shared["keys"]))]
+            actor_names.extend(self._add_instance(shared, obj_key, render_color, matrix))
+            shared["keys"].add(obj_key)
+            self._scene[obj_key] = dict(first, matrix=matrix, color=render_color,
+                                        actors=list(actor_names), shape=shape)
+            return actor_names
+
+        actor = self.plotter.add_mesh(
+            mesh, color=render_color, name=obj_key,
+            pbr=True, metallic=0.0, roughness=0.5,
+            show_edges=False, render=False
+        )
+        actor.user_matrix = matrix
+        actor_names.append(obj_key)
+        shared = {"mapper": actor.mapper, "edge_mapper": None, "edge_prop": None,
+                  "keys": {obj_key}, "nbytes": polydata_nbytes(mesh)}
+
+        if edges is not None and edges.n_cells > 0:
+            edge_actor_name = f"{obj_key}_e"
+            edge_actor = self.plotter.add_mesh(
+                edges, color="#111111",
+                line_width=1.0 if self._edges_fast else 2.0,
+                render_lines_as_tubes=not self._edges_fast,
+                name=edge_actor_name, render=False
+            )
+            edge_actor.user_matrix = matrix
+            actor_names.append(edge_actor_name)
+            shared.update(edge_mapper=edge_actor.mapper, edge_prop=edge_actor.prop)
+            shared["nbytes"] += polydata_nbytes(edges)
+
+        self._scene[obj_key] = {
+            "geometry": geometry, "matrix": matrix,
+            "color": render_color, "actors": list(actor_names),
+            "shape": shape, "tolerance": tolerance, "size": mesh.length,
+        }
+        self._instances[geometry] = shared
+        return actor_names
+
+    def save_snapshot(self, path: str):
+        """Сохраняет показанные грубые меши сцены на диск (для быстрого старта окна)."""
+        arrays, parts = {}, []
+        for key, entry in self._scene.items():
+            tolerance = entry["tolerance"] if entry["shape"] is None else self.coarse_tolerance
+            mesh = self.mesh_cache.get((entry["geometry"], tolerance))
+            edges = self.mesh_cache.get((entry["geometry"], tolerance, "edges"))
+            if mesh is None:
+                return # Меш вытеснен из кэша - снимок был бы неполным
+            i = len(parts)
+            arrays[f"points_{i}"], arrays[f"faces_{i}"] = mesh.points, mesh.faces
+            if edges is not None:
+                arrays[f"edge_points_{i}"], arrays[f"lines_{i}"] = edges.points, edges.lines
+            color = entry["color"]
+            parts.append({"key": key, "geometry": entry["geometry"], "tolerance": tolerance,
+                          "matrix": entry["matrix"].tolist(),
+                          "color": color if isinstance(color, str) else list(color)})
+        arrays["parts"] = np.array(json.dumps(parts))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    def show_snapshot(self, path: str) -> list:
+        """Показывает сцену из save_snapshot, пока идет первая сборка. Возвращает ключи деталей.
+
+        Меши снимка кладутся в кэш под отпечатками геометрии: если деталь
+        не изменилась, сборка подхватит их без тесселяции и без новых акторов.
+        """
+        if not os.path.exists(path):
+            return []
+        with np.load(path) as data:
+            parts = json.loads(str(data["parts"]))
+            keys = []
+            for i, part in enumerate(parts):
+                mesh = pv.PolyData(data[f"points_{i}"], data[f"faces_{i}"])
+                edges = None
+                if f"lines_{i}" in data:
+                    edges = pv.PolyData(data[f"edge_points_{i}"], lines=data[f"lines_{i}"])
+                geometry, tolerance = part["geometry"], part["tolerance"]
+                self.mesh_cache.put((geometry, tolerance), mesh, polydata_nbytes(mesh))
+                if edges is not None:
+                    self.mesh_cache.put((geometry, tolerance, "edges"), edges, polydata_nbytes(edges))
+                color = part["color"] if isinstance(part["color"], str) else tuple(part["color"])
+                self._add_part(part["key"], geometry, mesh, edges, np.array(part["matrix"]), color, tolerance)
+                keys.append(part["key"])
+        self.plotter.render()
+        if self.first_render:
+            self.plotter.view_isometric()
+            self.first_render = False
+        return keys
+
+    def show_interference(self, results):
+        """Подсвечивает результаты src.interference.check_assembly.
+
+        Треугольники в зонах пересечения - красным поверх деталей,
+        минимальный зазор между близкими деталями - желтым отрезком.
+        """
+        from src.tessellation import to_vtk_faces
+
+        self.clear_interference(render=False)
+        for i, result in enumerate(results):
+            name = f"_check_{i}"
+            triangles = result.get("triangles")
+            if triangles is not None and len(triangles):
+                mesh = pv.PolyData(triangles.reshape(-1, 3), to_vtk_faces(np.arange(len(triangles) * 3).reshape(-1, 3)))
+                actor = self.plotter.add_mesh(mesh, color="#e74c3c", name=name, show_edges=True,
+                                              edge_color="#7b241c", render=False)
+                # Смещение полигонов: подсветка рисуется поверх совпадающих граней детали
+                actor.mapper.SetRelativeCoincidentTopologyPolygonOffsetParameters(-2, -2)
+            elif result.get("status") == "clearance" and result.get("points"):
+                self.plotter.add_mesh(pv.Line(*result["points"]), color="#f1c40f", line_width=4.0,
+                                      render_lines_as_tubes=True, name=name, render=False)
+            else:
+                continue
+            self._check_actors.append(name)
+        self.plotter.render()
+
+    def clear_interference(self, render: bool = True):
+        for name in self._check_actors:
+            self.plotter.remove_actor(name, render=False)
+        self._check_actors = []
+        if render:
+            self.plotter.render()
+
+    def validation_requests(self):
+        """Список (отпечаток геометрии, допуск, меш) показанных мешей: по одному на геометрию."""
+        requests = []
+        for geometry, shared in self._instances.items():
+            entry = self._scene[next(iter(shared["keys"]))]
+            requests.append((geometry, entry["tolerance"], pv.wrap(shared["mapper"].GetInput())))
+        return requests
+
+    def validate_meshes(self, requests, min_wall: float = 0.8, should_stop=None) -> dict:
+        """Проверяет меши из validation_requests (можно вызывать из фонового потока).
+
+        Отчеты кэшируются по геометрии и допуску: после пересборки заново
+        проверяются только измененные детали. Возвращает {отпечаток: отчет}.
+        """
+        from src.validation import validate_mesh
+
+        reports = {}
+        for geometry, tolerance, mesh in requests:
+            if should_stop and should_stop():
+                break
+            key = (geometry, tolerance, "validation", min_wall)
+            report = self.mesh_cache.get(key)
+            if report is None:
+                report = validate_mesh(mesh.points, mesh.faces.reshape(-1, 4)[:, 1:], min_wall)
+                self.mesh_cache.put(key, report, sum(a.nbytes for a in report["defects"].values()))
+            reports[geometry] = report
+        return reports
+
+    def show_validation(self, reports) -> list:
+        """Подсвечивает дефекты мешей из validate_meshes на деталях сцены.
+
+        Открытые и неманифолдные ребра - пурпурным, самопересечения - красным,
+        тонкие стенки - оранжевым. Возвращает [(ключ детали, отчет)] показанных деталей.
+        """
+        from src.tessellation import to_vtk_faces, to_vtk_lines
+
+        self.clear_validation(render=False)
+        shown = []
+        for key, entry in self._scene.items():
+            report = reports.get(entry["geometry"])
+            if report is None:
+                continue
+            shown.append((key, report))
+            defects = report["defects"]
+            overlays = []
+            n = len(defects["edges"])
+            if n:
+                lines = pv.PolyData(defects["edges"].reshape(-1, 3), lines=to_vtk_lines(np.arange(n * 2).reshape(-1, 2)))
+                overlays.append((lines, dict(color="#d81b60", line_width=4.0, render_lines_as_tubes=True)))
+            for name, color in (("triangles", "#e74c3c"), ("thin", "#f39c12")):
+                n = len(defects[name])
+                if n:
+                    mesh = pv.PolyData(defects[name].reshape(-1, 3), to_vtk_faces(np.arange(n * 3).reshape(-1, 3)))
+                    overlays.append((mesh, dict(color=color, show_edges=True)))
+            for mesh, style in overlays:
+                name = f"_validation_{len(self._validation_actors)}"
+                actor = self.plotter.add_mesh(mesh, name=name, render=False, **style)
+                actor.user_matrix = entry["matrix"]
+                # Смещение полигонов: подсветка рисуется поверх совпадающих граней детали
+                actor.mapper.SetRelativeCoincidentTopologyPolygonOffsetParameters(-2, -2)
+                self._validation_actors.append(name)
+        self.plotter.render()
+        return shown
+
+    def clear_validation(self, render: bool = True):
+        for name in self._validation_actors:
+            self.plotter.remove_actor(name, render=False)
+        self._validation_actors = []
+        if render:
+            self.plotter.render()
+
     def update_scene(self, shapes):
-        """Обновляет всю сцену. Возвращает список списков имен акторов для каждого входного объекта."""
-        self.clear()
-        self._actor_count = 0
+        """Обновляет сцену инкрементально. Возвращает список списков имен акторов для каждого входного объекта.
+
+        Неизмененные детали сохраняют свои акторы, перемещенные получают новую
+        матрицу положения, заново загружается только измененная геометрия.
+        """
+        self._frame_keys = set()
         all_actor_groups = []
-        
-        if len(self._mesh_cache) > 500:
-            self._mesh_cache.clear()
             
         if isinstance(shapes, (list, tuple)):
             for shape in shapes:
                 all_actor_groups.append(self.render_shape(shape))
         elif shapes:
             all_actor_groups.append(self.render_shape(shapes))
+
+        # Удаляем детали, которых больше нет в сцене
+        for key in list(self._scene.keys()):
+            if key not in self._frame_keys:
+                self._remove_entry(key)
             
         self.plotter.render()
         if hasattr(self.plotter, "update"):
@@ -0,0 +1,178 @@
+"""Сигнатуры геометрии деталей для регрессионной проверки построителей.
+
+Рефакторинг построителя (логика шипов/пазов, порядок разрезов) может тихо
+изменить геометрию. Вместо сравнения STL каждая деталь сборки сводится к
+компактной сигнатуре: объем, площадь, габариты, число граней/ребер/вершин,
+положения джойнтов и хэш прореженного облака точек (вершины тесселяции,
+округленные до вокселей). Эталон для текущих params.json хранится в
+projects/<проект>/signatures.json; сравнение заново строит все детали
+(без кэша на диске, по умолчанию последовательно) и сообщает отклонения
+сверх допусков.
+"""
+import hashlib
+import json
+import os
+import time
+import warnings
+
+import numpy as np
+
+SIGNATURE_FILE = "signatures.json"
+
+# Сдвиг сетки вокселей: вершины с "круглыми" координатами (частые в CAD) не
+# попадают на границу вокселя, где шум в последнем знаке менял бы хэш
+_GRID_OFFSET = 0.3183
+
+
+def _round(values, digits: int = 6):
+    return [round(float(v), digits) for v in values]
+
+
+def cloud_hash(points: np.ndarray, voxel: float = 1.0) -> dict:
+    """Хэш облака точек, прореженного до занятых вокселей размером voxel, мм."""
+    voxels = np.unique(np.floor(points / voxel + _GRID_OFFSET).astype(np.int64), axis=0)
+    return {"voxel": voxel, "count": len(voxels),
+            "hash": hashlib.sha256(np.ascontiguousarray(voxels).tobytes()).hexdigest()[:16]}
+
+
+def part_signature(part, tolerance: float = 0.1, voxel: float = 1.0) -> dict:
+    """Сигнатура детали в координатах сборки (с учетом ее Location)."""
+    from src.interference import world_mesh
+    from src.tessellation import location_matrix
+
+    bb = part.bounding_box()
+    valid = part.is_valid
+    points, _ = world_mesh(part, tolerance)
+    return {
+        "volume": round(part.volume, 6),
+        "area": round(part.area, 6),
+        "bbox_min": _round([bb.min.X, bb.min.Y, bb.min.Z]),
+        "bbox_max": _round([bb.max.X, bb.max.Y, bb.max.Z]),
+        "faces": len(part.faces()),
+        "edges": len(part.edges()),
+        "vertices": len(part.vertices()),
+        "solids": len(part.solids()),
+        "valid": valid() if callable(valid) else valid,
+        # Джойнты - в локальных координатах детали: матрица 3x4 построчно
+        "joints": {name: _round(location_matrix(joint.relative_location)[:3].ravel())
+                   for name, joint in sorted(getattr(part, "joints", {}).items())},
+        "cloud": cloud_hash(points, voxel),
+    }
+
+
+def params_digest(params: dict) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def collect_signatures(project: str, workers: int = 1, tolerance: float = 0.1, voxel: float = 1.0) -> dict:
+    """Строит все детали проекта заново и считает их сигнатуры.
+
+    workers=1 - последовательно в этом процессе, иначе детали строятся
+    в пуле процессов PartBuilder (None - по числу ядер). Для нескольких
+    деталей пул медленнее: запуск процессов и импорт build123d в каждом
+    дороже самого построения. Кэш деталей на диске не используется:
+    проверяется построение, а не содержимое кэша.
+    """
+    from src.builder import BuildWarning, PartBuilder
+    from src.project import load_assembly_class, load_project_params
+
+    assembly_class = load_assembly_class(project)
+    params = load_project_params(assembly_class)
+    builder = PartBuilder(parallel=workers != 1, workers=workers)
+    try:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", BuildWarning)
+            t0 = time.perf_counter()
+            parts = assembly_class(params, builder=builder).build()
+            seconds = time.perf_counter() - t0
+    finally:
+        builder.shutdown()
+    if not isinstance(parts, list):
+        parts = [parts]
+    return {
+        "project": project,
+        "params": params_digest(params),
+        "tolerance": tolerance,
+        "warnings": sorted(str(w.message) for w in caught if issubclass(w.category, BuildWarning)),
+        "parts": {getattr(p, "label", "") or f"part_{i}": part_signature(p, tolerance, voxel)
+                  for i, p in enumerate(parts)},
+        "build_seconds": round(seconds, 3),
+    }
+
+
+def signature_path(project: str) -> str:
+    from src.project import load_assembly_class, project_dir
+    return os.path.join(project_dir(load_assembly_class(project)), SIGNATURE_FILE)
+
+
+def save_signatures(signatures: dict, path: str):
+    with open(path, "w") as f:
+        json.dump({k: v for k, v in signatures.items() if k != "build_seconds"}, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def load_signatures(path: str) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _deviation(part: str, field: str, expected, actual) -> dict:
+    return {"part": part, "field": field, "expected": expected, "actual": actual}
+
+
+def compare_signatures(expected: dict, actual: dict, rtol: float = 1e-4, atol: float = 1e-3) -> list:
+    """Отклонения actual от эталона expected: [{"part", "field", "expected", "actual"}].
+
+    Объем и площадь сравниваются с относительным допуском rtol, габариты и
+    джойнты - с абсолютным atol (мм), счетчики топологии, валидность и
+    облако точек - точно. Хэш облака ловит перенос элементов, не меняющий
+    объем, площадь и габариты (например, отверстий на той же грани):
+    по одному числу вокселей такой перенос не виден.
+    """
+    deviations = []
+    if expected.get("params") != actual.get("params"):
+        deviations.append(_deviation("-", "params.json", expected.get("params"), actual.get("params")))
+    if expected.get("warnings", []) != actual.get("warnings", []):
+        deviations.append(_deviation("-", "warnings", expected.get("warnings", []), actual.get("warnings", [])))
+
+    names = list(expected["parts"]) + [name for name in actual["parts"] if name not in expected["parts"]]
+    for name in names:
+        exp, act = expected["parts"].get(name), actual["parts"].get(name)
+        if exp is None or act is None:
+            deviations.append(_deviation(name, "part", "present" if exp else "missing", "present" if act else "missing"))
+            continue
+        for field in ("volume", "area"):
+            if not np.isclose(act[field], exp[field], rtol=rtol, atol=0.0):
+                deviations.append(_deviation(name, field, exp[field], act[field]))
+        for field in ("bbox_min", "bbox_max"):
+            if not np.allclose(act[field], exp[field], rtol=0.0, atol=atol):
+                deviations.append(_deviation(name, field, exp[field], act[field]))
+        for field in ("faces", "edges", "vertices", "solids", "valid"):
+            if act[field] != exp[field]:
+                deviations.append(_deviation(name, field, exp[field], act[field]))
+        for joint in sorted(set(exp["joints"]) | set(act["joints"])):
+            a, e = act["joints"].get(joint), exp["joints"].get(joint)
+            if a is None or e is None or not np.allclose(a, e, rtol=0.0, atol=atol):
+                deviations.append(_deviation(name, f"joint {joint}", e, a))
+        if act["cloud"] != exp["cloud"]:
+            deviations.append(_deviation(name, "point cloud", exp["cloud"], act["cloud"]))
+    return deviations
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    if isinstance(value, list) and all(isinstance(v, (int, float)) for v in value):
+        # Габариты - точки, джойнты - матрица 3x4: для джойнта показывается перенос
+        return "(" + ", ".join(f"{v:.3f}" for v in (value[3::4] if len(value) == 12 else value)) + ")"
+    if isinstance(value, dict) and "hash" in value:
+        return f"{value['hash']} ({value['count']} voxels)"
+    return str(value)
+
+
+def format_deviations(deviations: list) -> str:
+    lines = [f"{'part':<16}{'field':<24}{'expected':<32}actual"]
+    for d in deviations:
+        lines.append(f"{d['part']:<16}{d['field']:<24}{_format_value(d['expected']):<31} "
+                     f"{_format_value(d['actual'])}")
+    return "\n".join(lines)
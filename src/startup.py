@@ -0,0 +1,61 @@
+"""Замер холодного старта окна: этапы до первого кадра и время тяжелых импортов.
+
+Модуль без зависимостей, импортируется первым в main.py. Отметки ставятся
+всегда (это дешево), отчет печатается, если он запрошен (--startup-report),
+после первого кадра с живой сборкой. Для разбивки по каждому модулю
+используйте python -X importtime main.py.
+"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_T0 = time.perf_counter()
+_lock = threading.Lock()
+_events = [] # (начало, длительность, имя, поток); для отметок длительность 0
+requested = False
+_reported = False
+
+
+def elapsed() -> float:
+    """Секунды с импорта модуля (примерно - с запуска процесса)."""
+    return time.perf_counter() - _T0
+
+
+def mark(name: str):
+    """Отметка этапа старта; повторные отметки с тем же именем игнорируются."""
+    with _lock:
+        if all(event[2] != name for event in _events):
+            _events.append((elapsed(), 0.0, name, threading.current_thread().name))
+
+
+@contextmanager
+def timed(name: str):
+    """Замер блока (обычно импорта): with startup.timed("import build123d"): ..."""
+    start = elapsed()
+    try:
+        yield
+    finally:
+        with _lock:
+            _events.append((start, elapsed() - start, name, threading.current_thread().name))
+
+
+def format_report() -> str:
+    """Таблица в духе -X importtime: смещение от старта, длительность, этап."""
+    lines = [f"{'startup: offset [ms]':>20} | {'duration [ms]':>13} | stage"]
+    with _lock:
+        events = sorted(_events)
+    for start, duration, name, thread in events:
+        where = "" if thread == "MainThread" else f"  ({thread})"
+        duration_text = f"{duration * 1e3:>13.1f}" if duration else f"{'':>13}"
+        lines.append(f"{start * 1e3:>20.1f} | {duration_text} | {name}{where}")
+    return "\n".join(lines)
+
+
+def finish(name: str = "first live frame"):
+    """Последняя отметка старта; печатает отчет, если он запрошен."""
+    global _reported
+    mark(name)
+    if requested and not _reported:
+        _reported = True
+        print(format_report(), file=sys.stderr)
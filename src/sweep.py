@@ -0,0 +1,108 @@
+import itertools
+import json
+import multiprocessing
+import time
+import traceback
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+
+def expand_grid(grid: dict) -> list:
+    """Декартово произведение значений: {"a": [1, 2], "b": [3]} -> [{"a": 1, "b": 3}, {"a": 2, "b": 3}]."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _is_valid(shape) -> bool:
+    valid = shape.is_valid
+    return valid() if callable(valid) else valid
+
+
+def run_variant(project: str, overrides: dict, use_cache: bool = False) -> dict:
+    """Строит один вариант проекта с переопределенными параметрами и возвращает отчет."""
+    from src.builder import PartBuilder, BuildWarning
+    from src.build_cache import BuildCache
+    from src.project import load_assembly_class, load_config, load_project_params
+
+    report = {"overrides": overrides, "ok": False, "seconds": None, "parts": [], "warnings": [], "error": None}
+    try:
+        assembly_class = load_assembly_class(project)
+        params = load_project_params(assembly_class)
+        unknown = sorted(set(overrides) - set(params))
+        if unknown:
+            report["warnings"].append(f"unknown params: {', '.join(unknown)}")
+        params.update(overrides)
+
+        builder = PartBuilder(cache=BuildCache.from_config(load_config()) if use_cache else None)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", BuildWarning)
+            t0 = time.perf_counter()
+            parts = assembly_class(params, builder=builder).build()
+            report["seconds"] = time.perf_counter() - t0
+        report["warnings"] += [str(w.message) for w in caught if issubclass(w.category, BuildWarning)]
+
+        for part in parts:
+            bb = part.bounding_box()
+            report["parts"].append({
+                "label": part.label,
+                "volume": part.volume,
+                "bbox_min": [bb.min.X, bb.min.Y, bb.min.Z],
+                "bbox_max": [bb.max.X, bb.max.Y, bb.max.Z],
+                "valid": _is_valid(part),
+            })
+        report["ok"] = all(p["valid"] and p["volume"] > 0 for p in report["parts"])
+        if not report["ok"]:
+            report["error"] = "invalid or empty part geometry"
+    except Exception as e:
+        report["error"] = f"{type(e).__name__}: {e}"
+        report["traceback"] = traceback.format_exc()
+    return report
+
+
+def run_sweep(project: str, variants: list, workers: int = None, use_cache: bool = False, on_result=None) -> list:
+    """Строит варианты параллельно в процессах. Возвращает отчеты в порядке variants."""
+    if workers == 1:
+        reports = []
+        for overrides in variants:
+            reports.append(run_variant(project, overrides, use_cache))
+            if on_result:
+                on_result(reports[-1])
+        return reports
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [pool.submit(run_variant, project, overrides, use_cache) for overrides in variants]
+        reports = []
+        for future in futures:
+            reports.append(future.result())
+            if on_result:
+                on_result(reports[-1])
+    return reports
+
+
+def format_table(reports: list) -> str:
+    """Текстовая таблица: строка на деталь каждого варианта."""
+    lines = [f"{'variant':<40}{'time, s':>9}  {'part':<16}{'volume':>12}  {'size (x, y, z)':<24}status"]
+    for report in reports:
+        variant = ", ".join(f"{k}={v}" for k, v in report["overrides"].items()) or "(base)"
+        seconds = f"{report['seconds']:.2f}" if report["seconds"] is not None else "-"
+        if not report["parts"]:
+            lines.append(f"{variant:<40}{seconds:>9}  FAILED: {report['error']}")
+        for part in report["parts"]:
+            size = [hi - lo for lo, hi in zip(part["bbox_min"], part["bbox_max"])]
+            status = "ok" if part["valid"] and part["volume"] > 0 else "INVALID"
+            lines.append(f"{variant:<40}{seconds:>9}  {part['label']:<16}{part['volume']:>12.1f}  "
+                         f"{'(%.1f, %.1f, %.1f)' % tuple(size):<24}{status}")
+            variant, seconds = "", ""
+        for message in report["warnings"]:
+            lines.append(f"{'':<49}  warning: {message}")
+    return "\n".join(lines)
+
+
+def load_variants(path: str) -> list:
+    """Читает варианты из JSON: список словарей или {"grid": {...}}."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return expand_grid(data["grid"]) if "grid" in data else [data]
+    return data
@@ -0,0 +1,124 @@
+from itertools import chain
+
+import numpy as np
+from build123d import Shape
+from build123d.topology import downcast
+from OCP.BRep import BRep_Tool
+from OCP.TopAbs import TopAbs_EDGE, TopAbs_FACE, TopAbs_FORWARD, TopAbs_REVERSED
+from OCP.TopExp import TopExp_Explorer
+from OCP.TopLoc import TopLoc_Location
+from OCP.TopoDS import TopoDS
+
+
+def _trsf_matrix(trsf):
+    """Возвращает матрицу 3x4 преобразования gp_Trsf (поворот + перенос)."""
+    return np.array([[trsf.Value(i, j) for j in range(1, 5)] for i in range(1, 4)])
+
+
+def location_matrix(location) -> np.ndarray:
+    """Возвращает матрицу 4x4 для build123d Location."""
+    m = np.eye(4)
+    m[:3, :] = _trsf_matrix(location.wrapped.Transformation())
+    return m
+
+
+def tessellate(shape: Shape, tolerance: float = 0.1, angular_tolerance: float = 0.1, edges: bool = False):
+    """Триангулирует форму сразу в массивы NumPy.
+
+    Возвращает кортеж (points, triangles): points - float64 (N, 3),
+    triangles - int64 (M, 3) с индексами в points. Узлы каждой грани читаются
+    из триангуляции OCCT напрямую, без промежуточных объектов Vector.
+
+    Массивы Poly_Triangulation в OCP не отдают буфер (MapNodeArray,
+    InternalNodes и InternalTriangles читаются тоже поэлементно и не
+    быстрее), поэтому узлы и треугольники читаются одним np.fromiter на
+    грань: около 1 мкс на элемент, 50-90 мс на сборку против ~300 мс на
+    саму триангуляцию shape.mesh.
+
+    С edges=True возвращает (points, triangles, segments): segments - int64
+    (K, 2), отрезки ребер B-rep из полигонов ребер на триангуляции граней
+    (индексы в те же points). Швы и вырожденные ребра пропускаются.
+    """
+    shape.mesh(tolerance, angular_tolerance)
+
+    point_blocks, tri_blocks, segment_blocks = [], [], []
+    offset = 0
+    seen = set()
+    explorer = TopExp_Explorer(shape.wrapped, TopAbs_FACE)
+    while explorer.More():
+        face = downcast(explorer.Current())
+        explorer.Next()
+
+        loc = TopLoc_Location()
+        poly = BRep_Tool.Triangulation_s(face, loc)
+        if poly is None:
+            continue
+
+        n_nodes, n_tris = poly.NbNodes(), poly.NbTriangles()
+        nodes = np.fromiter(
+            chain.from_iterable(poly.Node(i).Coord() for i in range(1, n_nodes + 1)),
+            dtype=np.float64, count=n_nodes * 3,
+        ).reshape(-1, 3)
+        if not loc.IsIdentity():
+            m = _trsf_matrix(loc.Transformation())
+            nodes = nodes @ m[:, :3].T + m[:, 3]
+
+        tris = np.fromiter(
+            chain.from_iterable(poly.Triangle(i).Get() for i in range(1, n_tris + 1)),
+            dtype=np.int64, count=n_tris * 3,
+        ).reshape(-1, 3)
+        if face.Orientation() == TopAbs_REVERSED:
+            tris = tris[:, [0, 2, 1]]
+
+        if edges:
+            segment_blocks.extend(_face_edge_segments(face, poly, loc, seen, offset - 1))
+
+        point_blocks.append(nodes)
+        tri_blocks.append(tris + (offset - 1))
+        offset += n_nodes
+
+    if not point_blocks:
+        result = (np.empty((0, 3), dtype=np.float64), np.empty((0, 3), dtype=np.int64))
+    else:
+        result = (np.concatenate(point_blocks), np.concatenate(tri_blocks))
+    if edges:
+        segments = np.concatenate(segment_blocks) if segment_blocks else np.empty((0, 2), dtype=np.int64)
+        result += (segments,)
+    return result
+
+
+def _face_edge_segments(face, poly, loc, seen: set, offset: int) -> list:
+    """Отрезки еще не встреченных ребер грани (индексы узлов ее триангуляции + offset)."""
+    blocks = []
+    explorer = TopExp_Explorer(face, TopAbs_EDGE)
+    while explorer.More():
+        edge = TopoDS.Edge(explorer.Current())
+        explorer.Next()
+        key = hash(edge.Oriented(TopAbs_FORWARD))
+        if key in seen or BRep_Tool.Degenerated_s(edge) or BRep_Tool.IsClosed_s(edge, face):
+            continue # Ребро уже взято с соседней грани, вырождено или это шов
+        polygon = BRep_Tool.PolygonOnTriangulation_s(edge, poly, loc)
+        if polygon is None:
+            continue
+        seen.add(key)
+        nodes = polygon.Nodes()
+        n = polygon.NbNodes()
+        indices = np.fromiter((nodes.Value(i) for i in range(1, n + 1)), dtype=np.int64, count=n) + offset
+        blocks.append(np.column_stack([indices[:-1], indices[1:]]))
+    return blocks
+
+
+def to_vtk_lines(segments: np.ndarray) -> np.ndarray:
+    """Упаковывает отрезки (M, 2) в формат ячеек VTK [2, i, j, 2, ...]."""
+    lines = np.empty((len(segments), 3), dtype=np.int64)
+    lines[:, 0] = 2
+    lines[:, 1:] = segments
+    return lines.ravel()
+
+
+def to_vtk_faces(triangles: np.ndarray) -> np.ndarray:
+    """Упаковывает треугольники (M, 3) в формат ячеек VTK [3, i, j, k, 3, ...]."""
+    faces = np.empty((len(triangles), 4), dtype=np.int64)
+    faces[:, 0] = 3
+    faces[:, 1:] = triangles
+    return faces.ravel()
@@ -1,31 +1,46 @@
 import json
 import os
-import sys
 from PySide6.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, 
                              QTreeWidget, QTreeWidgetItem, QHeaderView, QSplitter,
-                             QPushButton)
-from PySide6.QtCore import Qt
+                             QPushButton, QLabel, QProgressBar)
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QKeySequence, QShortcut
 from pyvistaqt import QtInteractor
 from src.renderer import CADRenderer
-from build123d import Shape, Compound, export_stl, export_brep
-
-CONFIG_FILE = "config.json"
+from src.worker import ProjectLoadThread, BuildThread, RefineThread, CheckThread, ExportThread, ValidateThread
+from src.project import CONFIG_FILE, load_config, load_project_params, project_dir, reload_project
+from src.watcher import ProjectWatcher
+from src import profiling, startup
 
 class CADMainWindow(QMainWindow):
     def __init__(self, assembly_class):
+        """assembly_class - класс сборки проекта или имя проекта в projects/.
+
+        По имени проект (вместе с build123d/OCP) загружается в фоне, а окно
+        до этого показывает снимок сцены последней сборки с диска.
+        """
         super().__init__()
         self.setWindowTitle("Python CAD")
         
         # Load Application Config
-        self.config = self._load_config()
+        self.config = load_config()
         width = self.config.get("app", {}).get("window_width", 1280)
         height = self.config.get("app", {}).get("window_height", 800)
         self.resize(width, height)
         
-        # Initialize Project
-        self.assembly_class = assembly_class
-        self.params = self._load_project_params(assembly_class)
-        self.assembly = assembly_class(self.params)
+        # Initialize Project (сборка создается в _on_project_loaded)
+        if isinstance(assembly_class, str):
+            self.project_name = assembly_class
+        else:
+            self.project_name = assembly_class.__module__.split(".")[1]
+        self.assembly_class = None
+        self.params = {}
+        self.assembly = None
+
+        # Профилирование этапов построения (по умолчанию выключено)
+        profile_cfg = self.config.get("profile", {})
+        self.profiler = profiling.enable() if profile_cfg.get("enabled", False) else None
+        self.trace_path = profile_cfg.get("trace", "out/trace.json")
         
         # Layout
         central_widget = QWidget()
@@ -46,11 +61,21 @@ class CADMainWindow(QMainWindow):
         self.tree_widget.itemChanged.connect(self._on_item_changed)
         left_layout.addWidget(self.tree_widget)
 
-        self.export_button = QPushButton("Export All (STL + BREP)")
+        self.rebuild_button = QPushButton("Rebuild (F5)")
+        self.rebuild_button.clicked.connect(self.refresh_view)
+        left_layout.addWidget(self.rebuild_button)
+        QShortcut(QKeySequence("F5"), self, activated=self.refresh_view)
+
+        self.export_button = QPushButton("Export All (STL + BREP + 3MF)")
         self.export_button.clicked.connect(self.export_parts)
         self.export_button.setStyleSheet("background-color: #2e7d32; color: white; font-weight: bold; padding: 5px;")
         left_layout.addWidget(self.export_button)
 
+        self.check_button = QPushButton("Check Interference")
+        self.check_button.clicked.connect(self.check_interference)
+        self.check_button.setEnabled(False)
+        left_layout.addWidget(self.check_button)
+
         left_panel.setFixedWidth(300)
         splitter.addWidget(left_panel)
         
@@ -60,67 +85,125 @@ class CADMainWindow(QMainWindow):
         splitter.setSizes([300, 980])
         
         # Renderer
-        self.renderer = CADRenderer(self.interactor)
-        
-        # Build and Show
-        self.refresh_view()
-        self._restore_camera()
+        render_cfg = self.config.get("render", {})
+        self.renderer = CADRenderer(self.interactor, render_cfg.get("mesh_cache_mb", 256),
+                                    render_cfg.get("lod", {}), render_cfg.get("fast_edges", True),
+                                    render_cfg.get("quality", {}))
 
-    def export_parts(self):
-        """Экспортирует все детали сборки в форматы STL и BREP."""
-        try:
-            stl_dir = os.path.join("out", "stl")
-            brep_dir = os.path.join("out", "brep")
-            os.makedirs(stl_dir, exist_ok=True)
-            os.makedirs(brep_dir, exist_ok=True)
-            
-            parts = self.assembly.build()
-            if not isinstance(parts, list):
-                parts = [parts]
-                
-            for i, part in enumerate(parts):
-                label = getattr(part, "label", f"part_{i}")
-                safe_label = "".join([c if c.isalnum() else "_" for c in label.lower()])
-                
-                # Export STL
-                stl_path = os.path.join(stl_dir, f"{safe_label}.stl")
-                export_stl(part, stl_path)
-                
-                # Export BREP
-                brep_path = os.path.join(brep_dir, f"{safe_label}.brep")
-                export_brep(part, brep_path)
-                
-                print(f"Exported: {safe_label} (STL & BREP)")
-                
-            print(f"Successfully exported to {stl_dir}/ and {brep_dir}/")
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            print(f"Export Error: {e}")
+        # LOD: точные меши строятся в фоне, когда камера неподвижна idle_ms
+        self._refine_thread = None
+        self._refine_again = False
+        self._refine_timer = QTimer(self)
+        self._refine_timer.setSingleShot(True)
+        self._refine_timer.setInterval(render_cfg.get("lod", {}).get("idle_ms", 300))
+        self._refine_timer.timeout.connect(self._start_refine)
+        self.renderer.on_interaction_start.append(self._refine_timer.stop)
+        self.renderer.on_interaction_end.append(self._refine_timer.start)
+        self.renderer.on_interaction_end.append(self._show_frame_time)
+
+        # Status Bar: состояние фоновой пересборки
+        self.status_label = QLabel("Ready")
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0) # Неопределенный прогресс ("бегущая" полоса)
+        self.progress_bar.setMaximumWidth(150)
+        self.progress_bar.hide()
+        self.timings_label = QLabel()
+        self.timings_label.hide()
+        self.frame_label = QLabel() # Время кадра во время последнего вращения камеры
+        self.statusBar().addWidget(self.status_label, 1)
+        self.statusBar().addPermanentWidget(self.frame_label)
+        self.statusBar().addPermanentWidget(self.timings_label)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+
+        # Фоновая пересборка: одновременно работает не более одного потока,
+        # новый запрос во время сборки прерывает текущую и ставит повтор в очередь
+        self._build_generation = 0
+        self._parts_generation = 0 # Поколение сборки, детали которой показаны
+        self._build_thread = None
+        self._rebuild_pending = False
+        self._parts = []
+        self._check_thread = None
+        self._export_thread = None
+        # Проверка мешей на дефекты: в фоне после каждой сборки, с подсветкой на сцене
+        self.validate_cfg = self.config.get("validate", {})
+        self._validate_thread = None
+        self._validate_again = False
+        self._load_thread = None
+        self._reset_pool = False
+        self._reloaded_modules = []
+        self._pending_reload = [] # Изменения, пришедшие во время сборки
+        self.watcher = None
 
-    def _load_project_params(self, assembly_class):
-        """Загружает параметры проекта из params.json в папке проекта."""
+        # Снимок сцены последней сборки: показывается сразу, до загрузки проекта
+        self.snapshot_path = os.path.join(render_cfg.get("snapshot_dir", ".cache/scene"), f"{self.project_name}.npz")
         try:
-            # Пытаемся найти params.json в той же папке, где определен класс сборки
-            module_path = sys.modules[assembly_class.__module__].__file__
-            project_dir = os.path.dirname(module_path)
-            params_path = os.path.join(project_dir, "params.json")
-            
-            if os.path.exists(params_path):
-                with open(params_path, "r") as f:
-                    return json.load(f)
+            if self.renderer.show_snapshot(self.snapshot_path):
+                self._restore_camera()
+                self.status_label.setText("Cached view, loading project...")
+                startup.mark("cached scene shown")
         except Exception as e:
-            print(f"Warning: Could not load project params: {e}")
-        return {}
+            print(f"Snapshot Error: {e}")
 
-    def _load_config(self):
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, "r") as f:
-                    return json.load(f)
-            except:
-                pass
-        return {}
+        # Load Project, Build and Show
+        if isinstance(assembly_class, str):
+            self._load_thread = ProjectLoadThread(assembly_class, self)
+            self._load_thread.loaded.connect(self._on_project_loaded)
+            self._load_thread.failed.connect(self._on_project_load_failed)
+            self._load_thread.start()
+        else:
+            self._on_project_loaded(assembly_class)
+
+    def _on_project_loaded(self, assembly_class):
+        from src.builder import PartBuilder
+
+        self._load_thread = None
+        self.assembly_class = assembly_class
+        self.params = load_project_params(assembly_class)
+        self.assembly = assembly_class(self.params, builder=PartBuilder.from_config(self.config))
+        startup.mark("project loaded")
+
+        # Горячая перезагрузка: пересборка при сохранении модулей проекта или params.json
+        watch_cfg = self.config.get("watch", {})
+        if watch_cfg.get("enabled", False):
+            self.watcher = ProjectWatcher(project_dir(assembly_class), watch_cfg.get("debounce_ms", 300), parent=self)
+            self.watcher.changed.connect(self._on_project_changed)
+
+        self.refresh_view()
+
+    def _on_project_load_failed(self, message):
+        self._load_thread = None
+        print(message)
+        self.status_label.setText("Project Load Error (see console)")
+
+    def export_parts(self):
+        """Экспортирует показанные детали сборки в форматы STL, BREP и 3MF в фоне (неизмененные файлы не перезаписываются)."""
+        if not self._parts or self._export_thread is not None:
+            return
+        thread = ExportThread(list(self._parts), "out", ("stl", "brep", "3mf"), self)
+        thread.exported.connect(self._on_part_exported)
+        thread.done.connect(self._on_export_done)
+        thread.failed.connect(self._on_export_failed)
+        thread.finished.connect(self._on_export_finished)
+        self._export_thread = thread
+        self.export_button.setEnabled(False)
+        self.status_label.setText("Exporting...")
+        thread.start()
+
+    def _on_part_exported(self, name, fmt, path, status, seconds):
+        print(f"Exported: {path} ({status})")
+        self.status_label.setText(f"Exported: {name}.{fmt} ({status})")
+
+    def _on_export_done(self, out_dir):
+        print(f"Successfully exported to {out_dir}/")
+        self.status_label.setText(f"Exported to {out_dir}/")
+
+    def _on_export_failed(self, message):
+        print(message)
+        self.status_label.setText("Export Error (see console)")
+
+    def _on_export_finished(self):
+        self._export_thread = None
+        self.export_button.setEnabled(self._build_thread is None)
 
     def _save_config(self):
         # Save window size
@@ -149,33 +232,248 @@ class CADMainWindow(QMainWindow):
             self.interactor.render()
 
     def refresh_view(self):
-        """Перестраивает модель и обновляет дерево."""
+        """Запускает пересборку модели в фоне; результат применяется в _on_build_done."""
+        if self.assembly is None:
+            return # Проект еще загружается - сборка начнется после загрузки
+        self._build_generation += 1
+        if self._build_thread is not None and self._build_thread.isRunning():
+            # Сборку OCCT нельзя прервать на середине: просим поток остановиться
+            # на ближайшей контрольной точке и перезапускаемся после его завершения
+            self._build_thread.requestInterruption()
+            self._rebuild_pending = True
+            self.status_label.setText("Rebuild queued...")
+            return
+        self._start_build()
+
+    def _start_build(self):
+        self._rebuild_pending = False
+        self._refine_timer.stop()
+        if self._refine_thread is not None:
+            self._refine_thread.requestInterruption()
+        if self.profiler is not None:
+            self.profiler.clear()
+        if self._reset_pool:
+            # Процессы пула и память сборщика держат старые версии модулей проекта; сборка сейчас не идет
+            self._reset_pool = False
+            self.assembly.builder.shutdown()
+            self.assembly.builder.forget(self._reloaded_modules)
+            self._reloaded_modules = []
+        thread = BuildThread(self._build_generation, self.assembly, self.renderer, self)
+        thread.progress.connect(self._on_build_progress)
+        thread.built.connect(self._on_build_done)
+        thread.failed.connect(self._on_build_failed)
+        thread.finished.connect(self._on_build_thread_finished)
+        self._build_thread = thread
+        self.export_button.setEnabled(False)
+        self.progress_bar.show()
+        thread.start()
+
+    def _on_project_changed(self, paths):
+        """Перезагружает измененные модули проекта и params.json и пересобирает модель.
+
+        Сборщик (с кешем деталей) сохраняется: заново строятся только детали
+        с измененным кодом (ключ кеша на диске включает загруженный код
+        построителя и вызываемых им функций проекта) и детали, чьи
+        используемые параметры изменились. Во время сборки перезагрузка
+        откладывается до ее завершения: поток сборки выполняет старый код
+        на том же сборщике, и его результат записался бы в кеш под ключом
+        нового кода.
+        """
+        if self._build_thread is not None and self._build_thread.isRunning():
+            self._pending_reload = list(dict.fromkeys(self._pending_reload + list(paths)))
+            self._build_thread.requestInterruption()
+            self.status_label.setText("Reload queued...")
+            return
+        modules = [p for p in paths if p.endswith(".py")]
         try:
-            # 1. Build (теперь возвращает список деталей)
-            parts = self.assembly.build()
-            if not isinstance(parts, list):
-                parts = [parts]
-            
-            # 2. Render and get actor names
+            if modules:
+                self.assembly_class, reloaded = reload_project(self.assembly_class, modules)
+                print(f"Reloaded: {', '.join(reloaded)}")
+                self._reloaded_modules.extend(reloaded)
+                self._reset_pool = True
+            params = load_project_params(self.assembly_class)
+            if params: # Пустой словарь - params.json недописан или с ошибкой
+                self.params = params
+            self.assembly = self.assembly_class(self.params, builder=self.assembly.builder)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            self.status_label.setText("Reload Error (see console)")
+            return
+        self.refresh_view()
+
+    def _on_build_progress(self, generation, text):
+        if generation == self._build_generation:
+            self.status_label.setText(text)
+
+    def _on_build_failed(self, generation, message):
+        print(message)
+        if generation == self._build_generation:
+            self.status_label.setText("Build Error (see console)")
+
+    def _on_build_thread_finished(self):
+        self._build_thread = None
+        if self._pending_reload:
+            paths, self._pending_reload = self._pending_reload, []
+            self._on_project_changed(paths) # Запускает сборку, если перезагрузка удалась
+        if self._build_thread is None and self._rebuild_pending:
+            self._start_build()
+        if self._build_thread is not None:
+            return
+        self.export_button.setEnabled(self._export_thread is None)
+        self.progress_bar.hide()
+
+    def _on_build_done(self, generation, parts):
+        """Применяет результат сборки (GUI-поток): замена акторов и дерева."""
+        if generation != self._build_generation:
+            return # Результат устарел - уже запрошена более новая сборка
+        try:
+            builder = getattr(self.assembly, "builder", None)
+            if builder is not None:
+                print(f"Build: {builder.summary()}")
+            print(f"Mesh cache: {self.renderer.mesh_cache.stats()}")
+            self.status_label.setText(f"Ready: {len(parts)} parts")
+            self._parts = parts
+            self._parts_generation = generation
+            self.renderer.clear_interference(render=False) # Подсветка относится к прежней геометрии
+            self.renderer.clear_validation(render=False)
+            self.check_button.setEnabled(self._check_thread is None)
+            if self.profiler is not None:
+                self._show_timings()
+
+            # 2. Render and get actor names (меши уже подготовлены в фоне)
+            first = self.renderer.first_render
             actor_groups = self.renderer.update_scene(parts)
+            instancing = self.renderer.instancing_stats()
+            if instancing["parts"] > instancing["meshes"]:
+                print(f"Instancing: {instancing['parts']} parts share {instancing['meshes']} meshes, "
+                      f"{instancing['saved_bytes'] / 1024:.0f} KiB not uploaded twice")
+            if first:
+                self._restore_camera()
+            self._refine_timer.start()
+            self._start_validation()
             
-            # 3. Update Tree
+            # 3. Update Tree (точечно: существующие элементы сохраняются вместе с галочками)
             self.tree_widget.blockSignals(True) # Предотвращаем срабатывание при заполнении
-            self.tree_widget.clear()
-            for i, part in enumerate(parts):
-                item = self._populate_tree(part, self.tree_widget.invisibleRootItem())
-                if item and i < len(actor_groups):
-                    # Сохраняем список имен акторов в элементе дерева
-                    item.setData(0, Qt.UserRole, actor_groups[i])
-                    item.setCheckState(0, Qt.Checked)
+            self._update_tree(parts, actor_groups)
             self.tree_widget.expandAll()
             self.tree_widget.blockSignals(False)
+
+            self.renderer.save_snapshot(self.snapshot_path)
+            startup.finish()
             
         except Exception as e:
             import traceback
             traceback.print_exc()
             print(f"Build Error: {e}")
 
+    def _show_timings(self):
+        """Сводка профилирования: самый долгий этап в строке состояния, таблица в подсказке."""
+        stages = [s for s in self.profiler.summary() if not s[0].startswith("PartBuilder.")]
+        if not stages:
+            return
+        self.profiler.write_trace(self.trace_path)
+        # Этапы внутри построителей названы "<модуль>.<этап>" - они информативнее,
+        # чем время детали целиком
+        name, _, seconds = next((s for s in stages if "." in s[0]), stages[0])
+        self.timings_label.setText(f"Slowest stage: {name} {seconds * 1e3:.0f} ms")
+        self.timings_label.setToolTip(f"<pre>{self.profiler.format_summary(20)}</pre>Trace: {self.trace_path}")
+        self.timings_label.show()
+        print(self.profiler.format_summary())
+
+    def check_interference(self):
+        """Проверяет пересечения и зазоры между деталями в фоне и подсвечивает их."""
+        if not self._parts or self._check_thread is not None:
+            return
+        check_cfg = self.config.get("check", {})
+        thread = CheckThread(self._parts_generation, list(self._parts), check_cfg.get("tolerance", 0.1),
+                             check_cfg.get("max_clearance", 10.0), self)
+        thread.checked.connect(self._on_check_done)
+        thread.failed.connect(lambda message: print(message))
+        thread.finished.connect(self._on_check_finished)
+        self._check_thread = thread
+        self.check_button.setEnabled(False)
+        self.status_label.setText("Checking interference...")
+        thread.start()
+
+    def _on_check_done(self, generation, results):
+        from src.interference import format_report
+        print(format_report(results))
+        if generation != self._parts_generation:
+            # Пока шла проверка, показана новая сборка: детали из кеша могут
+            # быть теми же объектами, но с другим положением
+            return
+        self.renderer.show_interference(results)
+        collisions = [r for r in results if r["status"] == "interference"]
+        if collisions:
+            pairs = ", ".join(f"{r['a']} / {r['b']}" for r in collisions)
+            self.status_label.setText(f"Interference: {pairs}")
+        else:
+            gaps = [r["distance"] for r in results if r["status"] == "clearance"]
+            clearance = f", min clearance {min(gaps):.2f} mm" if gaps else ""
+            self.status_label.setText(f"No interference{clearance}")
+
+    def _start_validation(self):
+        """Проверяет показанные меши на дефекты в фоне (повторно проверяются только измененные)."""
+        if not self.validate_cfg.get("enabled", True):
+            return
+        if self._validate_thread is not None:
+            self._validate_again = True # Сцена обновилась во время проверки
+            return
+        self._validate_again = False
+        thread = ValidateThread(self.renderer, self.renderer.validation_requests(),
+                                self.validate_cfg.get("min_wall", 0.8), self)
+        thread.validated.connect(self._on_validation_done)
+        thread.finished.connect(self._on_validation_finished)
+        self._validate_thread = thread
+        thread.start()
+
+    def _on_validation_done(self, reports):
+        from src.validation import format_report
+        shown = self.renderer.show_validation(reports)
+        bad = [dict(report, name=key) for key, report in shown if not report["ok"]]
+        if bad:
+            print(format_report(bad, self.validate_cfg.get("min_wall", 0.8)))
+            self.status_label.setText(f"{self.status_label.text()}; mesh defects: {', '.join(r['name'] for r in bad)}")
+
+    def _on_validation_finished(self):
+        self._validate_thread = None
+        if self._validate_again:
+            self._start_validation()
+
+    def _on_check_finished(self):
+        self._check_thread = None
+        self.check_button.setEnabled(bool(self._parts))
+
+    def _show_frame_time(self):
+        stats = self.renderer.quality.frame_stats(self.renderer.quality.interaction_times)
+        if stats["frames"]:
+            self.frame_label.setText(f"{stats['mean_ms']:.1f} ms/frame ({stats['fps']:.0f} FPS)")
+            self.frame_label.setToolTip(f"{stats['frames']} frames, median {stats['median_ms']:.1f} ms, "
+                                        f"p95 {stats['p95_ms']:.1f} ms")
+
+    def _start_refine(self):
+        """Запускает фоновое уточнение мешей, если камера неподвижна и сборка не идет."""
+        if self._build_thread is not None:
+            return
+        if self._refine_thread is not None:
+            self._refine_again = True # Камера сдвинулась во время уточнения
+            return
+        self._refine_again = False
+        requests = self.renderer.refine_requests()
+        if not requests:
+            return
+        thread = RefineThread(self.renderer, requests, self)
+        thread.refined.connect(self.renderer.apply_meshes)
+        thread.finished.connect(self._on_refine_finished)
+        self._refine_thread = thread
+        thread.start()
+
+    def _on_refine_finished(self):
+        self._refine_thread = None
+        if self._refine_again:
+            self._refine_timer.start()
+
     def _on_item_changed(self, item, column):
         """Обработка изменения состояния чекбокса."""
         if column == 0:
@@ -187,19 +485,58 @@ class CADMainWindow(QMainWindow):
                         self.interactor.renderer.actors[name].SetVisibility(visible)
                 self.interactor.render()
 
-    def _populate_tree(self, node, parent_item):
-        """Рекурсивно заполняет дерево. Возвращает созданный элемент."""
+    def _update_tree(self, parts, actor_groups):
+        """Синхронизирует корневые элементы дерева со списком деталей по их меткам."""
+        from build123d import Shape
+
+        root = self.tree_widget.invisibleRootItem()
+        existing = {}
+        for i in range(root.childCount()):
+            item = root.child(i)
+            existing.setdefault(item.text(0), item)
+
+        items = []
+        for i, part in enumerate(parts):
+            if not isinstance(part, Shape):
+                continue
+            item = existing.pop(getattr(part, "label", "Part"), None)
+            item = self._populate_tree(part, root, item)
+            if i < len(actor_groups):
+                # Сохраняем список имен акторов в элементе дерева
+                item.setData(0, Qt.UserRole, actor_groups[i])
+                # Скрытые пользователем детали остаются скрытыми и после пересборки
+                if item.checkState(0) != Qt.Checked:
+                    for name in actor_groups[i]:
+                        if name in self.interactor.renderer.actors:
+                            self.interactor.renderer.actors[name].SetVisibility(False)
+            items.append(item)
+
+        for item in existing.values():
+            root.removeChild(item)
+        # Порядок элементов как в списке деталей
+        for i, item in enumerate(items):
+            if root.indexOfChild(item) != i:
+                root.removeChild(item)
+                root.insertChild(i, item)
+
+    def _populate_tree(self, node, parent_item, item=None):
+        """Рекурсивно заполняет дерево. Возвращает созданный (или обновленный) элемент."""
+        from build123d import Shape, Compound
+
         if not isinstance(node, Shape):
             return None
 
         label = getattr(node, "label", "Part")
         type_name = type(node).__name__
         
-        item = QTreeWidgetItem(parent_item)
+        if item is None:
+            item = QTreeWidgetItem(parent_item)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(0, Qt.Checked)
+        else:
+            item.takeChildren()
         item.setText(0, label)
         item.setText(1, type_name)
-        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-        item.setCheckState(0, Qt.Checked)
         
         # Если это Compound (вложенный), обходим его детей
         if isinstance(node, Compound):
@@ -214,5 +551,15 @@ class CADMainWindow(QMainWindow):
 
     def closeEvent(self, event):
         self._save_config()
+        self._refine_timer.stop()
+        for thread in (self._load_thread, self._build_thread, self._refine_thread, self._check_thread,
+                       self._export_thread, self._validate_thread):
+            if thread is not None:
+                thread.requestInterruption()
+                thread.wait()
+        self._rebuild_pending = False
+        builder = getattr(self.assembly, "builder", None)
+        if builder is not None:
+            builder.shutdown()
         self.interactor.close()
         super().closeEvent(event)
\ No newline at end of file
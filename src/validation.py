@@ -0,0 +1,172 @@
+"""Проверка качества тесселяции деталей: замкнутость, многообразность, вырожденные
+треугольники, самопересечения и тонкие стенки.
+
+Неудавшееся скругление или булева операция часто не роняет построение, а дает
+форму с дырами или вывернутыми гранями, которая видна только в слайсере.
+Проверка идет по уже готовому мешу (points, triangles): вершины сливаются
+(у граней OCCT свои копии узлов на общих ребрах), ребра считаются через
+np.unique, а пары треугольников для самопересечений и тонких стенок ищутся
+в равномерной пространственной сетке (spatial hash) вместо перебора всех пар.
+"""
+import numpy as np
+
+from src.interference import triangle_distances, triangles_cross
+from src.mesh_writer import weld
+
+# Поля отчета, которые считаются дефектами (ненулевое значение - деталь не "ok")
+DEFECTS = ("open_edges", "nonmanifold_edges", "flipped_edges", "degenerate", "self_intersections", "thin_walls")
+
+
+def _edges(triangles: np.ndarray, n_points: int):
+    """Ребра меша: ключи неориентированных ребер, их кратность и согласованность ориентации."""
+    directed = np.concatenate([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]])
+    lo, hi = directed.min(axis=1), directed.max(axis=1)
+    keys, inverse, counts = np.unique(lo * n_points + hi, return_inverse=True, return_counts=True)
+    # Соседние грани с согласованными нормалями обходят общее ребро в разные стороны
+    balance = np.bincount(inverse, np.where(directed[:, 0] < directed[:, 1], 1, -1), len(keys))
+    return keys, counts, balance
+
+
+def _boxes_overlap(lo, hi, i, j, pad: float = 0.0) -> np.ndarray:
+    return ((lo[i] <= hi[j] + pad) & (lo[j] <= hi[i] + pad)).all(axis=1)
+
+
+def _hash_pairs(lo: np.ndarray, hi: np.ndarray, cell: float, max_entries: int) -> tuple:
+    """Пары (i, j), i < j, объектов с пересекающимися габаритами (lo, hi).
+
+    Кандидаты - объекты из общей ячейки равномерной сетки; размер ячейки
+    удваивается, пока число записей "объект-ячейка" больше max_entries.
+    """
+    origin = lo.min(axis=0)
+    while True:
+        cmin = np.floor((lo - origin) / cell).astype(np.int64)
+        cmax = np.floor((hi - origin) / cell).astype(np.int64)
+        spans = cmax - cmin + 1
+        total = spans.prod(axis=1)
+        if total.sum() <= max_entries:
+            break
+        cell *= 2
+    dims = cmax.max(axis=0) + 1
+    # Все пары (объект, ячейка его габарита) одним массивом
+    obj = np.repeat(np.arange(len(lo)), total)
+    local = np.arange(total.sum()) - np.repeat(np.cumsum(total) - total, total)
+    sy, sz = spans[obj, 1], spans[obj, 2]
+    ix = cmin[obj, 0] + local // (sy * sz)
+    iy = cmin[obj, 1] + (local // sz) % sy
+    iz = cmin[obj, 2] + local % sz
+    cell_id = (ix * dims[1] + iy) * dims[2] + iz
+
+    order = np.argsort(cell_id, kind="stable")
+    cell_id, obj = cell_id[order], obj[order]
+    starts = np.flatnonzero(np.r_[True, cell_id[1:] != cell_id[:-1]])
+    ends = np.r_[starts[1:], len(cell_id)]
+    group_end = np.repeat(ends, ends - starts)
+    # Каждая запись образует пары со следующими записями своей ячейки
+    following = group_end - np.arange(len(obj)) - 1
+    first = np.repeat(np.arange(len(obj)), following)
+    second = first + 1 + np.arange(following.sum()) - np.repeat(np.cumsum(following) - following, following)
+    a, b = obj[first], obj[second]
+    # Проверка габаритов по одной оси за раз: следующие оси считаются только для оставшихся пар
+    for axis in range(3):
+        lo_axis, hi_axis = lo[:, axis], hi[:, axis]
+        keep = (lo_axis[a] <= hi_axis[b]) & (lo_axis[b] <= hi_axis[a])
+        a, b, first = a[keep], b[keep], first[keep]
+    # Пара, общая для нескольких ячеек, засчитывается один раз: в ячейке
+    # с минимальным углом пересечения их габаритов
+    corner = np.maximum(cmin[a], cmin[b])
+    own = ((corner[:, 0] * dims[1] + corner[:, 1]) * dims[2] + corner[:, 2]) == cell_id[first]
+    a, b = a[own], b[own]
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+def validate_mesh(points: np.ndarray, triangles: np.ndarray, min_wall: float = 0.8,
+                  degenerate_ratio: float = 1e-6, max_entries: int = 500_000) -> dict:
+    """Проверяет меш детали (любой тесселяции: экспорт, вьюер).
+
+    Возвращает отчет {"triangles", "open_edges", "nonmanifold_edges",
+    "flipped_edges", "degenerate", "self_intersections", "thin_walls",
+    "min_wall", "watertight", "ok", "defects"}. Числа - количество ребер
+    или треугольников; min_wall - наименьшая найденная толщина стенки
+    тоньше порога min_wall (None, если таких нет; 0 - проверка выключена).
+    defects - геометрия дефектов в координатах меша для подсветки:
+    "edges" (K, 2, 3) - открытые и неманифолдные ребра, "triangles" (K, 3, 3) -
+    самопересечения, "thin" (K, 3, 3) - тонкие стенки. Треугольник считается
+    вырожденным, если его высота меньше degenerate_ratio от длины
+    наибольшей стороны.
+    """
+    points, triangles = weld(np.asarray(points, dtype=float), np.asarray(triangles, dtype=np.int64))
+    report = {"triangles": len(triangles), "open_edges": 0, "nonmanifold_edges": 0, "flipped_edges": 0,
+              "degenerate": 0, "self_intersections": 0, "thin_walls": 0, "min_wall": None,
+              "defects": {"edges": np.empty((0, 2, 3)), "triangles": np.empty((0, 3, 3)),
+                          "thin": np.empty((0, 3, 3))}}
+    if not len(triangles):
+        report.update(watertight=False, ok=False)
+        return report
+
+    keys, counts, balance = _edges(triangles, len(points))
+    report["open_edges"] = int((counts == 1).sum())
+    report["nonmanifold_edges"] = int((counts > 2).sum())
+    report["flipped_edges"] = int(((counts == 2) & (balance != 0)).sum())
+    bad = keys[counts != 2]
+    report["defects"]["edges"] = points[np.stack([bad // len(points), bad % len(points)], axis=1)]
+
+    tris = points[triangles]
+    normals = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+    doubled_area = np.linalg.norm(normals, axis=1)
+    longest = np.sqrt(np.max([((tris[:, k] - tris[:, (k + 1) % 3]) ** 2).sum(axis=1) for k in range(3)], axis=0))
+    # Высота к наибольшей стороне = удвоенная площадь / сторона
+    degenerate = doubled_area <= degenerate_ratio * longest * longest
+    report["degenerate"] = int(degenerate.sum())
+
+    # Пары кандидатов из сетки: вырожденные треугольники не проверяются (нормаль не определена)
+    valid = np.flatnonzero(~degenerate)
+    lo, hi = tris[valid].min(axis=1), tris[valid].max(axis=1)
+    normals = normals[valid] / doubled_area[valid, None]
+    # Ячейка - половина медианного размера: крупные треугольники OCCT (длинные
+    # полосы на плоских гранях) занимают несколько ячеек и не сваливают в одну всю деталь
+    cell = 0.5 * float(np.median((hi - lo).max(axis=1))) or 1.0
+    pad = max(min_wall, 0.0) / 2
+    # Габариты расширены на половину порога стенки: пары ближе min_wall по каждой оси
+    i, j = _hash_pairs(lo - pad, hi + pad, cell + 2 * pad, max_entries)
+    # Соседние по вершине треугольники касаются по построению
+    shared = (triangles[valid[i]][:, :, None] == triangles[valid[j]][:, None, :]).any(axis=(1, 2))
+    i, j = i[~shared], j[~shared]
+
+    overlap = _boxes_overlap(lo, hi, i, j)
+    ci, cj = i[overlap], j[overlap]
+    cross = triangles_cross(tris[valid[ci]], tris[valid[cj]])
+    crossing = np.unique(np.concatenate([ci[cross], cj[cross]]))
+    report["self_intersections"] = int(cross.sum())
+    report["defects"]["triangles"] = tris[valid[crossing]]
+
+    if min_wall > 0:
+        # Стенка: грани смотрят в разные стороны и каждая лежит за другой (между ними материал)
+        centers = tris[valid].mean(axis=1)
+        offset = centers[j] - centers[i]
+        wall = ((np.einsum("ij,ij->i", normals[i], normals[j]) < -0.5) &
+                (np.einsum("ij,ij->i", offset, normals[i]) < 0) &
+                (np.einsum("ij,ij->i", offset, normals[j]) > 0))
+        wi, wj = i[wall], j[wall]
+        distance, _, _ = triangle_distances(tris[valid[wi]], tris[valid[wj]])
+        thin = distance < min_wall
+        if thin.any():
+            report["min_wall"] = float(distance[thin].min())
+            thin_tris = np.unique(np.concatenate([wi[thin], wj[thin]]))
+            report["thin_walls"] = len(thin_tris)
+            report["defects"]["thin"] = tris[valid[thin_tris]]
+
+    report["watertight"] = report["open_edges"] == 0 and report["nonmanifold_edges"] == 0
+    report["ok"] = not any(report[name] for name in DEFECTS)
+    return report
+
+
+def format_report(reports: list, min_wall: float = 0.8) -> str:
+    """Таблица отчетов validate_mesh с полем "name" (метка детали)."""
+    lines = [f"{'part':<16}{'triangles':>10}{'open':>6}{'non-mf':>8}{'flipped':>9}{'degen':>7}"
+             f"{'self-x':>8}{f'wall<{min_wall:g}':>10}  status"]
+    for r in reports:
+        wall = f"{r['min_wall']:.2f}" if r["min_wall"] is not None else "-"
+        status = "ok" if r["ok"] else ("defects" if r["watertight"] else "not watertight")
+        lines.append(f"{r['name']:<16}{r['triangles']:>10}{r['open_edges']:>6}{r['nonmanifold_edges']:>8}"
+                     f"{r['flipped_edges']:>9}{r['degenerate']:>7}{r['self_intersections']:>8}{wall:>10}  {status}")
+    return "\n".join(lines)
@@ -0,0 +1,55 @@
+import os
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+
+
+class ProjectWatcher(QObject):
+    """Следит за файлами папки проекта и сообщает об изменениях одной пачкой.
+
+    Редакторы сохраняют файл несколькими событиями или заменой файла, поэтому
+    сигнал changed(list путей) отправляется, только когда debounce_ms не было
+    новых событий. Изменения определяются по времени модификации файлов.
+    """
+    changed = Signal(list)
+
+    def __init__(self, directory: str, debounce_ms: int = 300, extensions=(".py", ".json"), parent=None):
+        super().__init__(parent)
+        self.directory = os.path.abspath(directory)
+        self.extensions = tuple(extensions)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_event)
+        self._watcher.directoryChanged.connect(self._on_event)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._flush)
+        self._mtimes = self._scan()
+        self._watch()
+
+    def _scan(self) -> dict:
+        mtimes = {}
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(self.extensions) and os.path.isfile(path):
+                try:
+                    mtimes[path] = os.stat(path).st_mtime_ns
+                except OSError:
+                    pass
+        return mtimes
+
+    def _watch(self):
+        # При сохранении через замену файл выпадает из наблюдения - добавляем заново
+        watched = set(self._watcher.files()) | set(self._watcher.directories())
+        paths = [p for p in [self.directory, *self._mtimes] if p not in watched]
+        if paths:
+            self._watcher.addPaths(paths)
+
+    def _on_event(self, path):
+        self._timer.start()
+
+    def _flush(self):
+        mtimes = self._scan()
+        changed = sorted(p for p in set(mtimes) | set(self._mtimes) if mtimes.get(p) != self._mtimes.get(p))
+        self._mtimes = mtimes
+        self._watch()
+        if changed:
+            self.changed.emit(changed)
@@ -0,0 +1,157 @@
+import importlib
+import threading
+import traceback
+from PySide6.QtCore import QThread, Signal
+from src import startup
+from src.profiling import stage
+
+
+class ProjectLoadThread(QThread):
+    """Фоновая загрузка проекта: импорт build123d/OCP и модулей projects/<name>.
+
+    Окно в это время уже показано (со снимком сцены с диска).
+    """
+    loaded = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, name: str, parent=None):
+        super().__init__(parent)
+        self.name = name
+
+    def run(self):
+        threading.current_thread().name = "ProjectLoadThread" # Имя для отчета о старте
+        try:
+            # Импорт только ради прогрева: тяжелые модули загружаются здесь, а не в GUI-потоке
+            with startup.timed("import build123d"):
+                importlib.import_module("build123d")
+            with startup.timed("import src.builder, src.tessellation"):
+                importlib.import_module("src.builder")
+                importlib.import_module("src.tessellation")
+            with startup.timed(f"import projects.{self.name}"):
+                from src.project import load_assembly_class
+                assembly_class = load_assembly_class(self.name)
+            self.loaded.emit(assembly_class)
+        except Exception:
+            self.failed.emit(traceback.format_exc())
+
+
+class BuildThread(QThread):
+    """Фоновая пересборка: assembly.build() и тесселяция вне GUI-потока.
+
+    Каждый запуск помечен номером поколения (generation). Окно принимает
+    результат только последнего поколения, устаревшие результаты отбрасываются.
+    """
+    progress = Signal(int, str)
+    built = Signal(int, object)
+    failed = Signal(int, str)
+
+    def __init__(self, generation: int, assembly, renderer, parent=None):
+        super().__init__(parent)
+        self.generation = generation
+        self.assembly = assembly
+        self.renderer = renderer
+
+    def run(self):
+        try:
+            self.progress.emit(self.generation, "Building parts...")
+            parts = self.assembly.build()
+            if not isinstance(parts, list):
+                parts = [parts]
+            if self.isInterruptionRequested():
+                return
+
+            self.progress.emit(self.generation, "Tessellating...")
+            with stage("renderer.prepare_meshes"):
+                self.renderer.prepare_meshes(parts, should_stop=self.isInterruptionRequested)
+            if self.isInterruptionRequested():
+                return
+
+            self.built.emit(self.generation, parts)
+        except Exception:
+            self.failed.emit(self.generation, traceback.format_exc())
+
+
+class RefineThread(QThread):
+    """Фоновое уточнение мешей (LOD) для деталей, уже показанных в грубом виде."""
+    refined = Signal(object)
+
+    def __init__(self, renderer, requests, parent=None):
+        super().__init__(parent)
+        self.renderer = renderer
+        self.requests = requests
+
+    def run(self):
+        try:
+            results = self.renderer.compute_meshes(self.requests, should_stop=self.isInterruptionRequested)
+            if results:
+                self.refined.emit(results)
+        except Exception:
+            traceback.print_exc()
+
+
+class CheckThread(QThread):
+    """Фоновая проверка пересечений и зазоров между деталями сборки.
+
+    Помечена поколением сборки (generation), детали которой проверяются.
+    """
+    checked = Signal(int, object)
+    failed = Signal(str)
+
+    def __init__(self, generation: int, parts, tolerance: float = 0.1, max_clearance: float = 10.0, parent=None):
+        super().__init__(parent)
+        self.generation = generation
+        self.parts = parts
+        self.tolerance = tolerance
+        self.max_clearance = max_clearance
+
+    def run(self):
+        try:
+            from src.interference import check_assembly
+            self.checked.emit(self.generation, check_assembly(self.parts, self.tolerance, self.max_clearance))
+        except Exception:
+            self.failed.emit(traceback.format_exc())
+
+
+class ExportThread(QThread):
+    """Фоновый экспорт деталей (src.export) вне GUI-потока.
+
+    Экспортируются детали последней примененной сборки, без повторного
+    assembly.build(): сборщик в это время может быть занят BuildThread.
+    """
+    exported = Signal(str, str, str, str, float)
+    done = Signal(str)
+    failed = Signal(str)
+
+    def __init__(self, parts, out_dir: str = "out", formats=("stl", "brep"), parent=None):
+        super().__init__(parent)
+        self.parts = parts
+        self.out_dir = out_dir
+        self.formats = formats
+
+    def run(self):
+        try:
+            from src import export
+            export.export_parts(self.parts, self.out_dir, self.formats, on_export=self.exported.emit)
+            self.done.emit(self.out_dir)
+        except Exception:
+            self.failed.emit(traceback.format_exc())
+
+
+class ValidateThread(QThread):
+    """Фоновая проверка показанных мешей на дефекты (src.validation) после пересборки."""
+    validated = Signal(object)
+
+    def __init__(self, renderer, requests, min_wall: float = 0.8, parent=None):
+        super().__init__(parent)
+        self.renderer = renderer
+        self.requests = requests
+        self.min_wall = min_wall
+
+    def run(self):
+        try:
+            with stage("renderer.validate_meshes"):
+                reports = self.renderer.validate_meshes(self.requests, self.min_wall,
+                                                        should_stop=self.isInterruptionRequested)
+            self.validated.emit(reports)
+        except Exception:
+            traceback.print_exc()